@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
 
 setup(
     name = "ipminify",
     version = "0.1.0",
     packages = find_packages("src"),
     package_dir = { "": "src"},
+    ext_modules = [
+        # optional: if the accelerator fails to build, the pure-Python implementation is used
+        Extension("ipminify._speedups", ["src/ipminify/_speedups.c"], optional = True),
+    ],
     author = "Naftuli Kay",
     author_email = "me@naftuli.wtf",
     url = "https://github.com/naftulikay/python-ipminify",
@@ -17,7 +21,7 @@ setup(
     dependency_links = [],
     entry_points = {
         "console_scripts": [
-            # example: 'ipminify = ipminify:main'
+            'ipminify = ipminify.cli:main',
         ]
     },
 )
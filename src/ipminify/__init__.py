@@ -1,52 +1,83 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import six
+from ipminify._compat import string_types
+from ipminify.alphabet import Alphabet, current_override as _current_override, get_alphabet, using_alphabet
+from ipminify.dotted import _format as _format_dotted, parse as _parse_dotted
 
+import sys
+import threading
+import weakref
 
-class IPv4(object):
-    """An IPv4 address utility class."""
 
-    MINIFIER_ALPHABET = 'abcdefghjkmnpqrstuvwxyz23456789'
-    MINIFIER_ALPHABET_LEN = len(MINIFIER_ALPHABET)
-    MINIFIER_ALPHABET_MAP = { letter: index for index, letter in enumerate(MINIFIER_ALPHABET) }
+class _DefaultAlphabetAttribute(object):
+    """A read-only class attribute taken from the default alphabet in effect in the current context."""
 
-    @classmethod
-    def from_minified(cls, value, alphabet=None):
-        """Convert a minified string representation into an IPv4 address, optionally with a user-supplied alphabet."""
-        if value is None:
-            raise ValueError("Unable to unmarshal minified value: value is None.")
+    def __init__(self, name):
+        self.name = name
 
-        if not isinstance(value, six.string_types):
-            raise TypeError("Value must be a string.")
+    def __get__(self, instance, owner):
+        return getattr(owner.default_alphabet(), self.name)
 
-        if len(value) == 0:
-            raise ValueError("Value must contain at least one character.")
 
-        if alphabet is not None:
-            if not isinstance(alphabet, six.string_types):
-                raise TypeError("Custom alphabet must be a string type.")
+# serializes replacing the default alphabet, so that installing the lazily compiled initial alphabet never overwrites an
+# alphabet set concurrently; reads of the default never lock
+_default_lock = threading.Lock()
 
-            if len(alphabet) < 2:
-                raise ValueError("Custom alphabet must include at least two characters.")
 
-            alphabet_len, alphabet_map = len(alphabet), { letter: index for index, letter in enumerate(alphabet) }
-        else:
-            alphabet, alphabet_len, alphabet_map = IPv4.MINIFIER_ALPHABET, IPv4.MINIFIER_ALPHABET_LEN, IPv4.MINIFIER_ALPHABET_MAP
+class _LazyDefaultAlphabet(object):
+    """The initial default alphabet, compiled on first use and then replaced by a plain class attribute."""
+
+    def __init__(self, letters):
+        self.letters = letters
+
+    def __get__(self, instance, owner):
+        codec = get_alphabet(self.letters)
+
+        with _default_lock:
+            # set_default_alphabet() may have replaced this descriptor while the codec was compiled
+            if IPv4.__dict__.get('MINIFIER_CODEC') is self:
+                IPv4.MINIFIER_CODEC = codec
+
+            return IPv4.MINIFIER_CODEC
+
+
+class IPv4(object):
+    """An immutable IPv4 address utility class."""
+
+    __slots__ = ('_value', '__weakref__')
+
+    # the process-wide default alphabet, replaced as a whole so that readers never see a partial update
+    MINIFIER_CODEC = _LazyDefaultAlphabet('abcdefghjkmnpqrstuvwxyz23456789')
+
+    # views of the default alphabet in effect, kept for compatibility; read MINIFIER_CODEC or default_alphabet() once
+    # instead to see a consistent alphabet across several reads
+    MINIFIER_ALPHABET = _DefaultAlphabetAttribute('letters')
+    MINIFIER_ALPHABET_LEN = _DefaultAlphabetAttribute('base')
+    MINIFIER_ALPHABET_MAP = _DefaultAlphabetAttribute('map')
+
+    # live interned instances, keyed by integer value
+    _INTERNED = weakref.WeakValueDictionary()
+
+    @classmethod
+    def default_alphabet(cls):
+        """Return the compiled default Alphabet in effect, honoring any using_alphabet() override in this context."""
+        override = _current_override()
 
-        # do work
-        result = 0
+        return IPv4.MINIFIER_CODEC if override is None else override
 
-        for index, letter in enumerate(value):
-            if alphabet_map.get(letter, -1) < 0:
-                raise ValueError("Value contains letter not present in minifier alphabet: {}".format(letter))
+    @classmethod
+    def from_minified(cls, value, alphabet=None):
+        """Convert a minified string representation into an IPv4 address, optionally with a user-supplied alphabet or Alphabet."""
+        if value is None:
+            raise ValueError("Unable to unmarshal minified value: value is None.")
 
-            result = (result * alphabet_len) + alphabet_map[letter]
+        return IPv4._unchecked(IPv4._resolve_alphabet(alphabet).decode(value))
 
-        try:
-            return IPv4(result)
-        except ValueError as e:
-            raise ValueError("Unable to expand minified value, value is out of u32 bounds: {}".format(e))
+    @classmethod
+    def from_minified_many(cls, values, alphabet=None):
+        """Convert a sequence of minified strings into a list of integer addresses, optionally with a user-supplied alphabet."""
+        return IPv4._resolve_alphabet(alphabet).decode_many(values)
 
     @classmethod
     def from_octets(cls, octet0, octet1, octet2, octet3):
@@ -70,34 +101,64 @@ class IPv4(object):
     @classmethod
     def from_str(cls, value):
         """Construct an IPv4 address from a period-delimited string."""
-        if not isinstance(value, six.string_types):
+        if not isinstance(value, string_types):
             raise TypeError("Value {} is not a string.".format(value))
 
-        octets = value.split('.')
+        return IPv4._unchecked(_parse_dotted(value))
 
-        if len(octets) != 4:
-            raise ValueError("Invalid IPv4 address string: {}".format(value))
+    @classmethod
+    def intern(cls, value):
+        """
+        Return a shared IPv4 instance for an address given as an integer or IPv4 instance.
 
-        for index, octet in enumerate(octets):
-            try:
-                octets[index] = int(octet)
-            except ValueError as e:
-                raise ValueError("Unable to convert octet {} to an integer: {} ({})".format(index, octet, e))
+        While an interned instance is alive, interning the same address returns that same instance, so many references
+        to repeated addresses cost a single object.
+        """
+        address = value if isinstance(value, IPv4) else IPv4(value)
+
+        return IPv4._INTERNED.setdefault(address._value, address)
+
+    @classmethod
+    def minify_many(cls, values, alphabet=None, fixed_width=False):
+        """
+        Convert a sequence of integer addresses into a list of minified strings, optionally with a user-supplied alphabet
+        and left-padded to the alphabet's fixed width.
+
+        Accepts any iterable of integers, an array('I'), a NumPy integer array, or a bytes-like buffer of packed,
+        big-endian (network byte order) addresses. No IPv4 instances are created.
+        """
+        return IPv4._resolve_alphabet(alphabet).encode_many(values, fixed_width)
+
+    @classmethod
+    def _resolve_alphabet(cls, alphabet):
+        """Resolve an optional alphabet, letters, or compiled Alphabet into a compiled Alphabet."""
+        if alphabet is None:
+            override = _current_override()
+
+            return IPv4.MINIFIER_CODEC if override is None else override
+
+        return get_alphabet(alphabet)
+
+    @classmethod
+    def _unchecked(cls, value):
+        """Construct an IPv4 address from an integer already known to be an unsigned, 32-bit integer."""
+        address = object.__new__(IPv4)
+        object.__setattr__(address, '_value', value)
 
-        return IPv4.from_octets(*octets)
+        return address
 
     @classmethod
     def set_default_alphabet(cls, alphabet):
-        """Set the default alphabet globally."""
-        if not isinstance(alphabet, six.string_types):
-            raise TypeError("Alphabet must be a string, received {}".format(type(alphabet)))
+        """
+        Set the process-wide default alphabet from a string of letters or a compiled Alphabet.
 
-        if len(alphabet) < 2:
-            raise ValueError("Alphabet must contain at least two characters.")
+        The compiled alphabet is swapped in with a single assignment, so concurrent readers see either the old or the
+        new alphabet in full. To use a different alphabet in one thread or task only, see using_alphabet().
+        """
+        codec = get_alphabet(alphabet)
 
-        cls.MINIFIER_ALPHABET = alphabet
-        cls.MINIFIER_ALPHABET_LEN = len(alphabet)
-        cls.MINIFIER_ALPHABET_MAP = { letter: index for index, letter in enumerate(alphabet) }
+        with _default_lock:
+            IPv4.MINIFIER_CODEC = codec
 
     def __init__(self, value):
         """Construct an IPv4 address from an unsigned, 32-bit integer."""
@@ -107,7 +168,11 @@ class IPv4(object):
         if value < 0 or value > 0xFFFFFFFF:
             raise ValueError("IPv4 address not in range (0x00000000-0xFFFFFFFF): {}".format(hex(value)))
 
-        self._value = value
+        object.__setattr__(self, '_value', value)
+
+    def __delattr__(self, name):
+        """Prevent deleting attributes, as IPv4 addresses are immutable."""
+        raise AttributeError("IPv4 addresses are immutable.")
 
     def __eq__(self, other):
         """Test equality against another object."""
@@ -115,50 +180,50 @@ class IPv4(object):
             return self.to_int() == other.to_int()
         elif isinstance(other, int):
             return self.to_int() == other
-        elif isinstance(other, six.string_types):
+        elif isinstance(other, string_types):
+            # a valid address which does not match is compared without raising, and only invalid strings are caught
             try:
-                return self.to_int() == IPv4.from_str(other).to_int()
-            except:
+                return self._value == _parse_dotted(other)
+            except ValueError:
                 return False
         else:
             return False
 
+    def __hash__(self):
+        """Return a hash consistent with equality against integers."""
+        return hash(self._value)
+
+    def __ne__(self, other):
+        """Test inequality against another object."""
+        return not self == other
+
+    def __reduce__(self):
+        """Support pickling and copying, which cannot set attributes on immutable instances."""
+        return (IPv4, (self._value,))
+
     def __repr__(self):
         """Return an unambiguous string representation of this IPv4 address."""
         return "IPv4({})".format(self.to_str())
 
+    def __setattr__(self, name, value):
+        """Prevent setting attributes, as IPv4 addresses are immutable."""
+        raise AttributeError("IPv4 addresses are immutable.")
+
     def __str__(self):
         """Return a readable representation of this IPv4 address."""
         return self.to_str()
 
-    def minify(self, alphabet=None):
-        """Convert this IPv4 address into a minified string, optionally with a user-supplied alphabet."""
-        if alphabet is not None:
-            if not isinstance(alphabet, six.string_types):
-                raise TypeError("Alphabet must be a string.")
-
-            if len(alphabet) < 2:
-                raise ValueError("Alphabet must contain at least two characters.")
-
-            alphabet_len, alphabet_map = len(alphabet), { letter: index for index, letter in enumerate(alphabet) }
-        else:
-            alphabet, alphabet_len, alphabet_map = IPv4.MINIFIER_ALPHABET, IPv4.MINIFIER_ALPHABET_LEN, IPv4.MINIFIER_ALPHABET_MAP
-
-        # okay let's get to work
-        value = self._value
-
-        if value == 0:
-            # short-circuit
-            return alphabet[0]
-
-        result = []
-
-        while value > 0:
-            value, rem = int(value / alphabet_len), value % alphabet_len
-            result.append(alphabet[rem])
+    def minify(self, alphabet=None, fixed_width=False):
+        """
+        Convert this IPv4 address into a minified string, optionally with a user-supplied alphabet or Alphabet.
 
-        return ''.join(reversed(result))
+        If fixed_width is set, the result is left-padded with the alphabet's first letter to the width of the largest
+        address, so that with a sortable alphabet minified strings sort in address order.
+        """
+        if fixed_width:
+            return IPv4._resolve_alphabet(alphabet)._encode_fixed(self._value)
 
+        return IPv4._resolve_alphabet(alphabet)._encode(self._value)
 
     def to_int(self):
         """Return an integer representation of this IPv4 address."""
@@ -170,4 +235,61 @@ class IPv4(object):
 
     def to_str(self):
         """Convert to a period-delimited string."""
-        return '.'.join(map(lambda i: str(i), self.to_octets()))
+        return _format_dotted(self._value)
+
+
+# names loaded from submodules on first use, so that importing the package stays cheap
+_LAZY = {
+    'AddressStore': ('ipminify.store', 'AddressStore'),
+    'AddressStoreWriter': ('ipminify.store', 'AddressStoreWriter'),
+    'HostnameTemplate': ('ipminify.template', 'HostnameTemplate'),
+    'IPv4Array': ('ipminify.arrays', 'IPv4Array'),
+    'IPv4Network': ('ipminify.network', 'IPv4Network'),
+    'IPv6': ('ipminify.ipv6', 'IPv6'),
+    'MinifiedIndex': ('ipminify.index', 'MinifiedIndex'),
+    'MinifyCache': ('ipminify.cache', 'MinifyCache'),
+    'StreamRewriter': ('ipminify.aio', 'StreamRewriter'),
+    'aio': ('ipminify.aio', None),
+    'benchmark': ('ipminify.benchmark', None),
+    'cache': ('ipminify.cache', None),
+    'cli': ('ipminify.cli', None),
+    'differential': ('ipminify.differential', None),
+    'index': ('ipminify.index', None),
+    'ipv6': ('ipminify.ipv6', None),
+    'metrics': ('ipminify.metrics', None),
+    'parallel': ('ipminify.parallel', None),
+    'prefix_for': ('ipminify.network', 'prefix_for'),
+    'rewrite': ('ipminify.rewrite', None),
+    'store': ('ipminify.store', None),
+    'template': ('ipminify.template', None),
+}
+
+
+def __getattr__(name):
+    """Import lazily loaded names on first use."""
+    try:
+        module, attribute = _LAZY[name]
+    except KeyError:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    __import__(module)
+    value = sys.modules[module] if attribute is None else getattr(sys.modules[module], attribute)
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    """List the package's names, including those not yet loaded."""
+    return sorted(set(globals()) | set(_LAZY))
+
+
+# without module __getattr__, only the names the package imported before lazy loading are bound on import; the rest
+# need their submodule imported explicitly, as in 'from ipminify.store import AddressStore'
+_EAGER = ['HostnameTemplate', 'IPv4Array', 'IPv4Network', 'IPv6', 'prefix_for']
+
+
+if sys.version_info < (3, 7):
+    for _name in _EAGER:
+        __getattr__(_name)
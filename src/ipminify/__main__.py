@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify.cli import main
+
+import sys
+
+
+sys.exit(main())
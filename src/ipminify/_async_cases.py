@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Test cases written with async syntax, imported by ipminify.test only on Python versions which can compile them.
+
+from ipminify import IPv4, using_alphabet
+from ipminify.aio import FakeStream, StreamRewriter, measure
+from ipminify.alphabet import SORTABLE_ALPHABET
+from ipminify.rewrite import LineRewriter
+
+import asyncio
+import unittest
+
+
+async def minify_in_tasks(value, alphabets):
+    """Minify a value with each alphabet overriding the default in its own concurrent task."""
+    async def task(letters):
+        with using_alphabet(letters):
+            await asyncio.sleep(0)
+            return IPv4(value).minify()
+
+    return await asyncio.gather(*[task(letters) for letters in alphabets])
+
+
+class StreamRewriterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.values = [index * 0x01010101 for index in range(200)]
+        self.lines = [IPv4(value).to_str() + '\n' for value in self.values]
+        self.expected = [name + '\n' for name in IPv4.minify_many(self.values)]
+
+    def collect(self, stage, source):
+        """Run a stage over a source, returning the rewritten lines."""
+        async def run():
+            return [line async for line in stage.rewrite(source if source is not None else FakeStream(self.lines, 7))]
+
+        return asyncio.run(run())
+
+    def test_rewrite(self):
+        """Tests that lines are rewritten in order, in batches, on the loop and in an executor."""
+        for stage in (StreamRewriter(), StreamRewriter(batch_size=16, max_delay=0), StreamRewriter(batch_size=16,
+                offload_threshold=8), StreamRewriter(batch_size=1, offload_threshold=1)):
+            self.assertEqual(self.expected, self.collect(stage, None))
+
+        stage = StreamRewriter(LineRewriter(expand=True), batch_size=16)
+        self.assertEqual(self.lines, self.collect(stage, FakeStream(self.expected, 5)))
+
+        with using_alphabet(SORTABLE_ALPHABET):
+            stage = StreamRewriter(batch_size=16, offload_threshold=8)
+            self.assertEqual([name + '\n' for name in IPv4.minify_many(self.values)], self.collect(stage, None))
+
+        self.assertRaises(ValueError, StreamRewriter, batch_size=0)
+
+    def test_stream_reader(self):
+        """Tests rewriting bytes read from an asyncio.StreamReader."""
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(''.join(self.lines).encode('ascii'))
+            reader.feed_eof()
+
+            return [line async for line in StreamRewriter(batch_size=16, offload_threshold=8).rewrite(reader)]
+
+        self.assertEqual([line.encode('ascii') for line in self.expected], asyncio.run(run()))
+
+    def test_errors(self):
+        """Tests that invalid lines and errors reading the source are raised after the lines before them."""
+        received = []
+
+        async def failing():
+            for line in self.lines:
+                yield line
+
+            raise IOError("connection reset")
+
+        async def run(stage, source):
+            async for line in stage.rewrite(source):
+                received.append(line)
+
+        self.assertRaises(IOError, asyncio.run, run(StreamRewriter(batch_size=16), failing()))
+        self.assertEqual(self.expected, received)
+
+        self.assertRaises(ValueError, self.collect, StreamRewriter(), FakeStream(self.lines + ['nope\n']))
+        self.assertEqual(self.expected + ['nope\n'],
+            self.collect(StreamRewriter(LineRewriter(ignore_errors=True)), FakeStream(self.lines + ['nope\n'])))
+
+    def test_backpressure(self):
+        """Tests that reading stops once max_pending lines are queued ahead of the consumer."""
+        read = []
+
+        async def source():
+            for line in self.lines:
+                read.append(line)
+                yield line
+
+        async def run():
+            batches = StreamRewriter(batch_size=10, max_pending=20).batches(source())
+
+            first = await batches.__anext__()
+
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+            await batches.aclose()
+
+            return first
+
+        self.assertEqual(self.expected[:10], asyncio.run(run()))
+        self.assertTrue(len(read) <= 10 + 20 + 1, len(read))
+
+    def test_measure(self):
+        """Tests measuring throughput and latency over a fake stream."""
+        result = asyncio.run(measure(StreamRewriter(batch_size=16), self.lines, burst=50, interval=0))
+
+        self.assertEqual(set(['lines_per_sec', 'latency_p50', 'latency_p99', 'latency_max', 'loop_lag_max']),
+            set(result))
+        self.assertTrue(result['lines_per_sec'] > 0)
+        self.assertTrue(0 <= result['latency_p50'] <= result['latency_max'])
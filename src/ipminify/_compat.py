@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+
+import sys
+
+
+# the names ipminify used from six, defined here so importing the package imports nothing outside the standard library
+PY3 = sys.version_info[0] >= 3
+
+if PY3:
+    string_types = (str,)
+    integer_types = (int,)
+    range = range
+else:
+    string_types = (basestring,) # noqa: F821
+    integer_types = (int, long) # noqa: F821
+    range = xrange # noqa: F821
+
+# array.tobytes() is named tostring() on Python 2
+array_to_bytes = array.tobytes if PY3 else array.tostring
@@ -0,0 +1,860 @@
+/*
+ * Optional compiled accelerator for ipminify.
+ *
+ * Implements minified encoding and decoding, 128-bit minified encoding, dotted-quad parsing, and dotted-quad
+ * formatting for single values and for buffers. The pure-Python implementation remains the reference: functions here only handle the common, valid
+ * cases and return None wherever the reference would raise an error or accept a non-canonical form, so that callers
+ * can fall back to it and produce identical results and error messages.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define U32_MAX 0xFFFFFFFFULL
+#define INVALID_DIGIT 0xFF
+#define MAX_DIGITS 64
+#define MAX_WIDE_DIGITS 128
+#define MAX_DOTTED 15
+
+/* Write the minified form of value into buffer, ending at buffer + MAX_DIGITS, returning its length. */
+static Py_ssize_t
+encode_digits(uint64_t value, const Py_UCS1 *letters, uint64_t base, Py_ssize_t width, char *buffer)
+{
+    Py_ssize_t position = MAX_DIGITS;
+
+    do {
+        buffer[--position] = (char) letters[value % base];
+        value /= base;
+    } while (value > 0);
+
+    while (MAX_DIGITS - position < width) {
+        buffer[--position] = (char) letters[0];
+    }
+
+    return MAX_DIGITS - position;
+}
+
+/* Create an ASCII string from a buffer of bytes. */
+static PyObject *
+ascii_string(const char *data, Py_ssize_t length)
+{
+    PyObject *result = PyUnicode_New(length, 127);
+
+    if (result != NULL) {
+        memcpy(PyUnicode_1BYTE_DATA(result), data, length);
+    }
+
+    return result;
+}
+
+/* Validate the alphabet letters and fixed width passed to the encoders. */
+static int
+check_letters(PyObject *letters, Py_ssize_t width)
+{
+    if (!PyUnicode_Check(letters) || !PyUnicode_IS_ASCII(letters) || PyUnicode_GET_LENGTH(letters) < 2) {
+        PyErr_SetString(PyExc_ValueError, "Alphabet must be an ASCII string of at least two characters.");
+        return -1;
+    }
+
+    if (width < 0 || width > MAX_DIGITS) {
+        PyErr_SetString(PyExc_ValueError, "Width out of range.");
+        return -1;
+    }
+
+    return 0;
+}
+
+/* Acquire a buffer of native unsigned, 32-bit integers. */
+static int
+get_u32_buffer(PyObject *values, Py_buffer *view)
+{
+    const char *format;
+
+    if (PyObject_GetBuffer(values, view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0) {
+        return -1;
+    }
+
+    format = view->format != NULL ? view->format : "B";
+
+    if (format[0] == '@' || format[0] == '=') {
+        format++;
+    }
+
+    if (view->itemsize != 4 || (strcmp(format, "I") != 0 && strcmp(format, "L") != 0)) {
+        PyBuffer_Release(view);
+        PyErr_SetString(PyExc_TypeError, "Values must be a buffer of unsigned, 32-bit integers.");
+        return -1;
+    }
+
+    return 0;
+}
+
+PyDoc_STRVAR(encode_doc,
+"encode(value, letters, width)\n\n"
+"Encode a non-negative integer with an ASCII alphabet, left-padded to width letters.");
+
+static PyObject *
+speedups_encode(PyObject *self, PyObject *args)
+{
+    PyObject *value, *letters;
+    Py_ssize_t width;
+    unsigned long long number;
+    char buffer[MAX_DIGITS];
+    Py_ssize_t length;
+
+    if (!PyArg_ParseTuple(args, "OUn:encode", &value, &letters, &width) || check_letters(letters, width) < 0) {
+        return NULL;
+    }
+
+    number = PyLong_AsUnsignedLongLong(value);
+
+    if (number == (unsigned long long) -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+
+    length = encode_digits(number, PyUnicode_1BYTE_DATA(letters), PyUnicode_GET_LENGTH(letters), width, buffer);
+
+    return ascii_string(buffer + MAX_DIGITS - length, length);
+}
+
+PyDoc_STRVAR(encode_many_doc,
+"encode_many(values, letters, width)\n\n"
+"Encode a buffer of unsigned, 32-bit integers with an ASCII alphabet into a list of strings.");
+
+static PyObject *
+speedups_encode_many(PyObject *self, PyObject *args)
+{
+    PyObject *values, *letters, *result, *item;
+    Py_ssize_t width, count, index, length;
+    Py_buffer view;
+    const uint32_t *data;
+    const Py_UCS1 *alphabet;
+    uint64_t base;
+    char buffer[MAX_DIGITS];
+
+    if (!PyArg_ParseTuple(args, "OUn:encode_many", &values, &letters, &width) || check_letters(letters, width) < 0) {
+        return NULL;
+    }
+
+    if (get_u32_buffer(values, &view) < 0) {
+        return NULL;
+    }
+
+    count = view.len / 4;
+    data = (const uint32_t *) view.buf;
+    alphabet = PyUnicode_1BYTE_DATA(letters);
+    base = (uint64_t) PyUnicode_GET_LENGTH(letters);
+
+    result = PyList_New(count);
+
+    for (index = 0; result != NULL && index < count; index++) {
+        length = encode_digits(data[index], alphabet, base, width, buffer);
+        item = ascii_string(buffer + MAX_DIGITS - length, length);
+
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+
+        PyList_SET_ITEM(result, index, item);
+    }
+
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+/*
+ * Write the minified form of a 128-bit value, given as four 32-bit limbs from the most significant, into buffer, ending
+ * at buffer + MAX_WIDE_DIGITS, returning its length. The limbs are consumed.
+ */
+static Py_ssize_t
+encode_wide_digits(uint32_t *limbs, const Py_UCS1 *letters, uint64_t base, Py_ssize_t width, char *buffer)
+{
+    Py_ssize_t position = MAX_WIDE_DIGITS;
+    uint64_t remainder;
+    int top = 0, index;
+
+    while (top < 3 && limbs[top] == 0) {
+        top++;
+    }
+
+    do {
+        /* long division of the remaining limbs by the base */
+        remainder = 0;
+
+        for (index = top; index < 4; index++) {
+            remainder = (remainder << 32) | limbs[index];
+            limbs[index] = (uint32_t) (remainder / base);
+            remainder %= base;
+        }
+
+        buffer[--position] = (char) letters[remainder];
+
+        while (top < 3 && limbs[top] == 0) {
+            top++;
+        }
+    } while (limbs[top] != 0);
+
+    while (MAX_WIDE_DIGITS - position < width) {
+        buffer[--position] = (char) letters[0];
+    }
+
+    return MAX_WIDE_DIGITS - position;
+}
+
+/* Validate the alphabet letters and fixed width passed to the 128-bit encoders. */
+static int
+check_wide_letters(PyObject *letters, Py_ssize_t width)
+{
+    if (check_letters(letters, 0) < 0) {
+        return -1;
+    }
+
+    if (width < 0 || width > MAX_WIDE_DIGITS) {
+        PyErr_SetString(PyExc_ValueError, "Width out of range.");
+        return -1;
+    }
+
+    return 0;
+}
+
+PyDoc_STRVAR(encode_wide_doc,
+"encode_wide(high, low, letters, width)\n\n"
+"Encode a 128-bit integer, given as its high and low 64-bit halves, with an ASCII alphabet, left-padded to width\n"
+"letters.");
+
+static PyObject *
+speedups_encode_wide(PyObject *self, PyObject *args)
+{
+    PyObject *high, *low, *letters;
+    Py_ssize_t width, length;
+    unsigned long long halves[2];
+    uint32_t limbs[4];
+    char buffer[MAX_WIDE_DIGITS];
+
+    if (!PyArg_ParseTuple(args, "OOUn:encode_wide", &high, &low, &letters, &width)
+            || check_wide_letters(letters, width) < 0) {
+        return NULL;
+    }
+
+    halves[0] = PyLong_AsUnsignedLongLong(high);
+
+    if (halves[0] == (unsigned long long) -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+
+    halves[1] = PyLong_AsUnsignedLongLong(low);
+
+    if (halves[1] == (unsigned long long) -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+
+    limbs[0] = (uint32_t) (halves[0] >> 32);
+    limbs[1] = (uint32_t) halves[0];
+    limbs[2] = (uint32_t) (halves[1] >> 32);
+    limbs[3] = (uint32_t) halves[1];
+
+    length = encode_wide_digits(limbs, PyUnicode_1BYTE_DATA(letters), PyUnicode_GET_LENGTH(letters), width, buffer);
+
+    return ascii_string(buffer + MAX_WIDE_DIGITS - length, length);
+}
+
+PyDoc_STRVAR(encode_wide_many_doc,
+"encode_wide_many(buffer, letters, width)\n\n"
+"Encode a bytes-like buffer of packed, big-endian 128-bit integers with an ASCII alphabet into a list of strings.");
+
+static PyObject *
+speedups_encode_wide_many(PyObject *self, PyObject *args)
+{
+    PyObject *letters, *result = NULL, *item;
+    Py_ssize_t width, count, index, length;
+    Py_buffer view;
+    const unsigned char *data;
+    const Py_UCS1 *alphabet;
+    uint64_t base;
+    uint32_t limbs[4];
+    int limb;
+    char buffer[MAX_WIDE_DIGITS];
+
+    if (!PyArg_ParseTuple(args, "y*Un:encode_wide_many", &view, &letters, &width)) {
+        return NULL;
+    }
+
+    if (check_wide_letters(letters, width) < 0) {
+        goto done;
+    }
+
+    if (view.len % 16 != 0) {
+        PyErr_SetString(PyExc_ValueError, "Buffer length is not a multiple of sixteen bytes.");
+        goto done;
+    }
+
+    count = view.len / 16;
+    data = (const unsigned char *) view.buf;
+    alphabet = PyUnicode_1BYTE_DATA(letters);
+    base = (uint64_t) PyUnicode_GET_LENGTH(letters);
+
+    result = PyList_New(count);
+
+    for (index = 0; result != NULL && index < count; index++, data += 16) {
+        for (limb = 0; limb < 4; limb++) {
+            limbs[limb] = ((uint32_t) data[limb * 4] << 24) | ((uint32_t) data[limb * 4 + 1] << 16)
+                | ((uint32_t) data[limb * 4 + 2] << 8) | (uint32_t) data[limb * 4 + 3];
+        }
+
+        length = encode_wide_digits(limbs, alphabet, base, width, buffer);
+        item = ascii_string(buffer + MAX_WIDE_DIGITS - length, length);
+
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+
+        PyList_SET_ITEM(result, index, item);
+    }
+
+done:
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+/* Decode one minified string through a 256-entry digit table, returning a new reference to an int or None. */
+static PyObject *
+decode_one(PyObject *value, const unsigned char *table, uint64_t base)
+{
+    const Py_UCS1 *data;
+    Py_ssize_t length, index;
+    uint64_t result = 0;
+    unsigned char digit;
+
+    if (!PyUnicode_Check(value) || !PyUnicode_IS_ASCII(value) || PyUnicode_GET_LENGTH(value) == 0) {
+        Py_RETURN_NONE;
+    }
+
+    data = PyUnicode_1BYTE_DATA(value);
+    length = PyUnicode_GET_LENGTH(value);
+
+    for (index = 0; index < length; index++) {
+        digit = table[data[index]];
+
+        if (digit == INVALID_DIGIT) {
+            Py_RETURN_NONE;
+        }
+
+        result = result * base + digit;
+
+        if (result > U32_MAX) {
+            Py_RETURN_NONE;
+        }
+    }
+
+    return PyLong_FromUnsignedLong((unsigned long) result);
+}
+
+/* Validate the digit table and base passed to the decoders. */
+static int
+check_table(Py_ssize_t table_length, Py_ssize_t base)
+{
+    if (table_length != 256) {
+        PyErr_SetString(PyExc_ValueError, "Decode table must contain 256 entries.");
+        return -1;
+    }
+
+    if (base < 2 || base > 255) {
+        PyErr_SetString(PyExc_ValueError, "Base out of range.");
+        return -1;
+    }
+
+    return 0;
+}
+
+PyDoc_STRVAR(decode_doc,
+"decode(value, table, base)\n\n"
+"Decode an ASCII minified string into an integer using a 256-byte table of digit values, where 0xFF marks letters\n"
+"outside the alphabet. Returns None if the value is invalid or out of u32 bounds.");
+
+static PyObject *
+speedups_decode(PyObject *self, PyObject *args)
+{
+    PyObject *value;
+    const char *table;
+    Py_ssize_t table_length, base;
+
+    if (!PyArg_ParseTuple(args, "Oy#n:decode", &value, &table, &table_length, &base)
+            || check_table(table_length, base) < 0) {
+        return NULL;
+    }
+
+    return decode_one(value, (const unsigned char *) table, (uint64_t) base);
+}
+
+PyDoc_STRVAR(decode_many_doc,
+"decode_many(values, table, base)\n\n"
+"Decode a sequence of minified strings into a list of integers, with None for each invalid value.");
+
+static PyObject *
+speedups_decode_many(PyObject *self, PyObject *args)
+{
+    PyObject *values, *sequence, *result, *item;
+    const char *table;
+    Py_ssize_t table_length, base, count, index;
+
+    if (!PyArg_ParseTuple(args, "Oy#n:decode_many", &values, &table, &table_length, &base)
+            || check_table(table_length, base) < 0) {
+        return NULL;
+    }
+
+    sequence = PySequence_Fast(values, "Values must be iterable.");
+
+    if (sequence == NULL) {
+        return NULL;
+    }
+
+    count = PySequence_Fast_GET_SIZE(sequence);
+    result = PyList_New(count);
+
+    for (index = 0; result != NULL && index < count; index++) {
+        item = decode_one(PySequence_Fast_GET_ITEM(sequence, index), (const unsigned char *) table, (uint64_t) base);
+
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+
+        PyList_SET_ITEM(result, index, item);
+    }
+
+    Py_DECREF(sequence);
+
+    return result;
+}
+
+static int
+is_space(char c)
+{
+    return c == ' ' || c == '\t' || c == '\n' || c == '\r' || c == '\v' || c == '\f';
+}
+
+/* Parse a canonical dotted-quad address surrounded by optional ASCII whitespace, returning -1 if not canonical. */
+static int64_t
+parse_dotted(const char *data, Py_ssize_t length)
+{
+    Py_ssize_t start = 0, end = length, index;
+    int64_t result = 0, octet = 0;
+    int digits = 0, octets = 0;
+    char c;
+
+    while (start < end && is_space(data[start])) {
+        start++;
+    }
+
+    while (end > start && is_space(data[end - 1])) {
+        end--;
+    }
+
+    for (index = start; index < end; index++) {
+        c = data[index];
+
+        if (c == '.') {
+            if (digits == 0 || ++octets > 3) {
+                return -1;
+            }
+
+            result = (result << 8) | octet;
+            octet = 0;
+            digits = 0;
+        } else if (c >= '0' && c <= '9') {
+            /* leading zeros are not canonical */
+            if (digits > 0 && octet == 0) {
+                return -1;
+            }
+
+            octet = octet * 10 + (c - '0');
+            digits++;
+
+            if (octet > 255) {
+                return -1;
+            }
+        } else {
+            return -1;
+        }
+    }
+
+    if (digits == 0 || octets != 3) {
+        return -1;
+    }
+
+    return (result << 8) | octet;
+}
+
+/* Parse a str or bytes dotted-quad address, returning a new reference to an int or None. */
+static PyObject *
+parse_one(PyObject *value)
+{
+    const char *data;
+    Py_ssize_t length;
+    int64_t result;
+
+    if (PyUnicode_Check(value)) {
+        if (!PyUnicode_IS_ASCII(value)) {
+            Py_RETURN_NONE;
+        }
+
+        data = (const char *) PyUnicode_1BYTE_DATA(value);
+        length = PyUnicode_GET_LENGTH(value);
+    } else if (PyBytes_Check(value)) {
+        data = PyBytes_AS_STRING(value);
+        length = PyBytes_GET_SIZE(value);
+    } else {
+        Py_RETURN_NONE;
+    }
+
+    result = parse_dotted(data, length);
+
+    if (result < 0) {
+        Py_RETURN_NONE;
+    }
+
+    return PyLong_FromUnsignedLong((unsigned long) result);
+}
+
+PyDoc_STRVAR(parse_doc,
+"parse(value)\n\n"
+"Parse a canonical dotted-quad str or bytes, returning None if it is not canonical.");
+
+static PyObject *
+speedups_parse(PyObject *self, PyObject *value)
+{
+    return parse_one(value);
+}
+
+PyDoc_STRVAR(parse_many_doc,
+"parse_many(values)\n\n"
+"Parse a sequence of dotted-quad str or bytes into a list of integers, with None for each non-canonical value.");
+
+static PyObject *
+speedups_parse_many(PyObject *self, PyObject *values)
+{
+    PyObject *sequence, *result, *item;
+    Py_ssize_t count, index;
+
+    sequence = PySequence_Fast(values, "Values must be iterable.");
+
+    if (sequence == NULL) {
+        return NULL;
+    }
+
+    count = PySequence_Fast_GET_SIZE(sequence);
+    result = PyList_New(count);
+
+    for (index = 0; result != NULL && index < count; index++) {
+        item = parse_one(PySequence_Fast_GET_ITEM(sequence, index));
+
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+
+        PyList_SET_ITEM(result, index, item);
+    }
+
+    Py_DECREF(sequence);
+
+    return result;
+}
+
+PyDoc_STRVAR(parse_buffer_doc,
+"parse_buffer(buffer)\n\n"
+"Parse newline-separated dotted-quad addresses from a bytes-like buffer, skipping blank lines. Returns an array\n"
+"of unsigned, 32-bit integers, or None if any line is not canonical.");
+
+static PyObject *
+speedups_parse_buffer(PyObject *self, PyObject *args)
+{
+    Py_buffer view;
+    PyObject *result = NULL, *array_module = NULL, *output = NULL;
+    const char *data, *line, *end, *newline;
+    uint32_t *values = NULL;
+    Py_ssize_t count = 0, capacity, length, index;
+    int64_t value;
+    int blank;
+
+    if (!PyArg_ParseTuple(args, "y*:parse_buffer", &view)) {
+        return NULL;
+    }
+
+    data = (const char *) view.buf;
+    end = data + view.len;
+
+    /* at most one address per eight bytes, the shortest line being "0.0.0.0\n" */
+    capacity = view.len / 8 + 1;
+    values = PyMem_Malloc(capacity * sizeof(uint32_t));
+
+    if (values == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    for (line = data; line < end; line = newline + 1) {
+        newline = memchr(line, '\n', end - line);
+
+        if (newline == NULL) {
+            newline = end;
+        }
+
+        length = newline - line;
+        blank = 1;
+
+        for (index = 0; index < length; index++) {
+            if (!is_space(line[index])) {
+                blank = 0;
+                break;
+            }
+        }
+
+        if (blank) {
+            continue;
+        }
+
+        value = parse_dotted(line, length);
+
+        if (value < 0) {
+            result = Py_None;
+            Py_INCREF(result);
+            goto done;
+        }
+
+        if (count == capacity) {
+            /* defensive: every canonical address takes at least eight bytes with its newline */
+            result = Py_None;
+            Py_INCREF(result);
+            goto done;
+        }
+
+        values[count++] = (uint32_t) value;
+    }
+
+    array_module = PyImport_ImportModule("array");
+
+    if (array_module == NULL) {
+        goto done;
+    }
+
+    output = PyObject_CallMethod(array_module, "array", "sy#", sizeof(unsigned int) == 4 ? "I" : "L",
+        (const char *) values, count * (Py_ssize_t) sizeof(uint32_t));
+
+    result = output;
+
+done:
+    Py_XDECREF(array_module);
+    PyMem_Free(values);
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+/* Write the dotted-quad form of value into buffer, returning its length. */
+static Py_ssize_t
+format_dotted(uint32_t value, char *buffer)
+{
+    Py_ssize_t length = 0;
+    int shift;
+    unsigned int octet;
+
+    for (shift = 24; shift >= 0; shift -= 8) {
+        octet = (value >> shift) & 0xFF;
+
+        if (octet >= 100) {
+            buffer[length++] = (char) ('0' + octet / 100);
+        }
+
+        if (octet >= 10) {
+            buffer[length++] = (char) ('0' + octet / 10 % 10);
+        }
+
+        buffer[length++] = (char) ('0' + octet % 10);
+
+        if (shift > 0) {
+            buffer[length++] = '.';
+        }
+    }
+
+    return length;
+}
+
+PyDoc_STRVAR(format_doc,
+"format(value)\n\n"
+"Format an unsigned, 32-bit integer as a dotted-quad string.");
+
+static PyObject *
+speedups_format(PyObject *self, PyObject *value)
+{
+    unsigned long number = PyLong_AsUnsignedLong(value);
+    char buffer[MAX_DOTTED];
+
+    if (number == (unsigned long) -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+
+    if (number > U32_MAX) {
+        PyErr_SetString(PyExc_OverflowError, "Value out of u32 range.");
+        return NULL;
+    }
+
+    return ascii_string(buffer, format_dotted((uint32_t) number, buffer));
+}
+
+PyDoc_STRVAR(format_many_doc,
+"format_many(values)\n\n"
+"Format a buffer of unsigned, 32-bit integers as a list of dotted-quad strings.");
+
+static PyObject *
+speedups_format_many(PyObject *self, PyObject *values)
+{
+    PyObject *result, *item;
+    Py_buffer view;
+    const uint32_t *data;
+    Py_ssize_t count, index;
+    char buffer[MAX_DOTTED];
+
+    if (get_u32_buffer(values, &view) < 0) {
+        return NULL;
+    }
+
+    count = view.len / 4;
+    data = (const uint32_t *) view.buf;
+    result = PyList_New(count);
+
+    for (index = 0; result != NULL && index < count; index++) {
+        item = ascii_string(buffer, format_dotted(data[index], buffer));
+
+        if (item == NULL) {
+            Py_CLEAR(result);
+            break;
+        }
+
+        PyList_SET_ITEM(result, index, item);
+    }
+
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+/* Return the length of the dotted-quad form of value. */
+static Py_ssize_t
+dotted_length(uint32_t value)
+{
+    Py_ssize_t length = 3;
+    int shift;
+    unsigned int octet;
+
+    for (shift = 24; shift >= 0; shift -= 8) {
+        octet = (value >> shift) & 0xFF;
+        length += octet >= 100 ? 3 : octet >= 10 ? 2 : 1;
+    }
+
+    return length;
+}
+
+/* Write each value as a newline-terminated dotted quad, into an output already known to be large enough. */
+static void
+write_dotted_lines(const uint32_t *data, Py_ssize_t count, char *position)
+{
+    Py_ssize_t index;
+
+    for (index = 0; index < count; index++) {
+        position += format_dotted(data[index], position);
+        *position++ = '\n';
+    }
+}
+
+PyDoc_STRVAR(format_buffer_doc,
+"format_buffer(values, out)\n\n"
+"Format a buffer of unsigned, 32-bit integers as newline-terminated dotted-quad lines. Returns bytes if out is None,\n"
+"or writes into the writable buffer out and returns the number of bytes written, or None if out is too small.");
+
+static PyObject *
+speedups_format_buffer(PyObject *self, PyObject *args)
+{
+    PyObject *values, *out, *result = NULL;
+    Py_buffer view, output;
+    const uint32_t *data;
+    Py_ssize_t count, index, total = 0;
+
+    if (!PyArg_ParseTuple(args, "OO:format_buffer", &values, &out) || get_u32_buffer(values, &view) < 0) {
+        return NULL;
+    }
+
+    count = view.len / 4;
+    data = (const uint32_t *) view.buf;
+
+    /* measure first, so the output is written in a single pass with no resizing */
+    for (index = 0; index < count; index++) {
+        total += dotted_length(data[index]) + 1;
+    }
+
+    if (out == Py_None) {
+        result = PyBytes_FromStringAndSize(NULL, total);
+
+        if (result != NULL) {
+            write_dotted_lines(data, count, PyBytes_AS_STRING(result));
+        }
+
+        goto done;
+    }
+
+    if (PyObject_GetBuffer(out, &output, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS) < 0) {
+        PyErr_Clear();
+        PyErr_SetString(PyExc_TypeError, "Output buffer is not a writable, contiguous buffer.");
+        goto done;
+    }
+
+    if (output.len < total) {
+        result = Py_None;
+        Py_INCREF(result);
+    } else {
+        write_dotted_lines(data, count, (char *) output.buf);
+        result = PyLong_FromSsize_t(total);
+    }
+
+    PyBuffer_Release(&output);
+
+done:
+    PyBuffer_Release(&view);
+
+    return result;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"encode", speedups_encode, METH_VARARGS, encode_doc},
+    {"encode_many", speedups_encode_many, METH_VARARGS, encode_many_doc},
+    {"encode_wide", speedups_encode_wide, METH_VARARGS, encode_wide_doc},
+    {"encode_wide_many", speedups_encode_wide_many, METH_VARARGS, encode_wide_many_doc},
+    {"decode", speedups_decode, METH_VARARGS, decode_doc},
+    {"decode_many", speedups_decode_many, METH_VARARGS, decode_many_doc},
+    {"parse", speedups_parse, METH_O, parse_doc},
+    {"parse_many", speedups_parse_many, METH_O, parse_many_doc},
+    {"parse_buffer", speedups_parse_buffer, METH_VARARGS, parse_buffer_doc},
+    {"format", speedups_format, METH_O, format_doc},
+    {"format_many", speedups_format_many, METH_O, format_many_doc},
+    {"format_buffer", speedups_format_buffer, METH_VARARGS, format_buffer_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "ipminify._speedups",
+    "Optional compiled accelerator for ipminify.",
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
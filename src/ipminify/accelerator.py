@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# The compiled accelerator, ipminify._speedups, is imported on first use and used automatically when it has been built.
+# Setting the IPMINIFY_PURE environment variable to a non-empty value other than '0' forces the pure-Python reference implementation.
+
+
+# the environment variable which forces the pure-Python implementation
+ENVIRONMENT_VARIABLE = 'IPMINIFY_PURE'
+
+
+def _load():
+    """Import the compiled accelerator on first use, setting compiled and speedups."""
+    global compiled, speedups
+
+    if 'compiled' in globals():
+        return
+
+    try:
+        from ipminify import _speedups
+    except ImportError:
+        _speedups = None
+
+    # the compiled accelerator module, if built, and the module in use, or None for the pure-Python implementation
+    compiled = _speedups
+    speedups = compiled if os.environ.get(ENVIRONMENT_VARIABLE, '') in ('', '0') else None
+
+
+def __getattr__(name):
+    """Load the compiled accelerator when compiled or speedups is first read."""
+    if name in ('compiled', 'speedups'):
+        _load()
+
+        return globals()[name]
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # module __getattr__ is unavailable, so load eagerly
+    _load()
+
+
+def available():
+    """Determine whether the compiled accelerator has been built."""
+    _load()
+
+    return compiled is not None
+
+
+def enable(enabled=True):
+    """Switch between the compiled accelerator and the pure-Python implementation at runtime."""
+    global speedups
+
+    _load()
+
+    if enabled and compiled is None:
+        raise RuntimeError("The compiled accelerator is not available.")
+
+    speedups = compiled if enabled else None
+
+    # compiled alphabets bind their implementation, so recompile the cached and default alphabets
+    from ipminify import IPv4
+    from ipminify.alphabet import _compile
+
+    if hasattr(_compile, 'cache_clear'):
+        _compile.cache_clear()
+
+    IPv4.set_default_alphabet(IPv4.MINIFIER_CODEC.letters)
+
+
+def enabled():
+    """Determine whether the compiled accelerator is in use."""
+    _load()
+
+    return speedups is not None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4
+from ipminify.rewrite import LineRewriter
+
+import asyncio
+import copy
+
+
+# the maximum number of lines rewritten at a time
+DEFAULT_BATCH_SIZE = 1024
+
+# the longest a line waits, in seconds, for a batch to fill before the batch is rewritten anyway
+DEFAULT_MAX_DELAY = 0.005
+
+# batches of at least this many lines, by default only full batches, are rewritten in an executor rather than on the
+# event loop
+DEFAULT_OFFLOAD_THRESHOLD = DEFAULT_BATCH_SIZE
+
+# marks the end of the source in the queue of lines read
+_END = object()
+
+
+def _rewrite(rewriter, lines, encoding):
+    """Rewrite a batch of lines, decoding and encoding them if they were read as bytes."""
+    if encoding is None:
+        return rewriter.rewrite(lines)
+
+    return [line.encode(encoding) for line in rewriter.rewrite([line.decode(encoding) for line in lines])]
+
+
+class StreamRewriter(object):
+    """
+    An asyncio pipeline stage which rewrites lines read from an asyncio.StreamReader or any async iterable of lines.
+
+    Lines are read into a bounded queue and rewritten in micro-batches with the bulk codec: a batch is rewritten once
+    it holds batch_size lines, or once its first line has waited max_delay seconds, so bursts are amortized without
+    delaying a trickle of lines. Batches of at least offload_threshold lines are rewritten in an executor, the default
+    thread pool unless another is given, so that the event loop keeps running. When the consumer falls behind, the
+    queue fills and reading stops, which for a socket pushes back on the sender.
+
+    Lines read as bytes are decoded and rewritten lines encoded with the given encoding; lines read as strings are
+    rewritten as strings. Rewritten lines are yielded in input order.
+    """
+
+    def __init__(self, rewriter=None, batch_size=DEFAULT_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY, max_pending=None,
+            offload_threshold=DEFAULT_OFFLOAD_THRESHOLD, executor=None, encoding='utf-8'):
+        """
+        Create a stage with a LineRewriter, by default one which minifies whole lines, queueing at most max_pending
+        lines read ahead, by default four batches.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1: {}".format(batch_size))
+
+        self.rewriter = rewriter if rewriter is not None else LineRewriter()
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending if max_pending is not None else 4 * batch_size
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+        self.encoding = encoding
+
+    async def batches(self, source):
+        """Rewrite lines from a source, yielding a list of rewritten lines for each batch."""
+        loop = asyncio.get_event_loop()
+        rewriter = self._bind()
+
+        queue = asyncio.Queue(self.max_pending)
+        producer = asyncio.ensure_future(self._produce(source, queue))
+
+        try:
+            while True:
+                batch, end = await self._collect(queue, loop)
+
+                if batch:
+                    encoding = self.encoding if isinstance(batch[0], bytes) else None
+
+                    if len(batch) >= self.offload_threshold:
+                        yield await loop.run_in_executor(self.executor, _rewrite, rewriter, batch, encoding)
+                    else:
+                        yield _rewrite(rewriter, batch, encoding)
+
+                if end is _END:
+                    return
+
+                if end is not None:
+                    raise end
+        finally:
+            producer.cancel()
+
+    async def rewrite(self, source):
+        """Rewrite lines from a source, yielding each rewritten line."""
+        async for batch in self.batches(source):
+            for line in batch:
+                yield line
+
+    def _bind(self):
+        """
+        Return the rewriter with the alphabet in effect in the current context bound to it, as executor threads and
+        processes do not see context overrides.
+        """
+        if self.rewriter.alphabet is not None:
+            return self.rewriter
+
+        rewriter = copy.copy(self.rewriter)
+        rewriter.alphabet = IPv4._resolve_alphabet(None).letters
+
+        return rewriter
+
+    async def _collect(self, queue, loop):
+        """
+        Collect a batch of lines from the queue, returning it with the end of the source, an exception raised reading
+        it, or None if the source continues.
+        """
+        item = await queue.get()
+        deadline = loop.time() + self.max_delay
+        batch = []
+
+        while True:
+            if item is _END or isinstance(item, Exception):
+                return batch, item
+
+            batch.append(item)
+
+            if len(batch) >= self.batch_size:
+                return batch, None
+
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+
+                if remaining <= 0:
+                    return batch, None
+
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    return batch, None
+
+    @staticmethod
+    async def _produce(source, queue):
+        """Read lines from a source into the queue, followed by the end marker or the exception raised reading it."""
+        try:
+            async for line in source:
+                await queue.put(line)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_END)
+
+
+class FakeStream(object):
+    """
+    An in-memory async iterable of lines standing in for a network feed, delivering lines in bursts separated by an
+    interval and recording the time each line was delivered.
+    """
+
+    def __init__(self, lines, burst=1024, interval=0.001):
+        """Create a stream delivering lines burst at a time, sleeping interval seconds between bursts."""
+        self.lines = lines
+        self.burst = burst
+        self.interval = interval
+        self.times = []
+
+    async def __aiter__(self):
+        """Deliver the lines."""
+        loop = asyncio.get_event_loop()
+
+        for start in range(0, len(self.lines), self.burst):
+            for line in self.lines[start:start + self.burst]:
+                self.times.append(loop.time())
+                yield line
+
+            await asyncio.sleep(self.interval)
+
+
+async def measure(stage, lines, burst=1024, interval=0.001, tick=0.001):
+    """
+    Measure a stage rewriting lines from a FakeStream, returning the throughput in lines per second, percentiles of the
+    latency of each line in seconds, and the longest the event loop was blocked, measured by a ticker which sleeps tick
+    seconds at a time.
+    """
+    loop = asyncio.get_event_loop()
+    stream = FakeStream(lines, burst, interval)
+    lag = [0.0]
+
+    async def ticker():
+        while True:
+            before = loop.time()
+            await asyncio.sleep(tick)
+            lag[0] = max(lag[0], loop.time() - before - tick)
+
+    heartbeat = asyncio.ensure_future(ticker())
+    received = []
+
+    try:
+        start = loop.time()
+
+        async for _ in stage.rewrite(stream):
+            received.append(loop.time())
+
+        elapsed = loop.time() - start
+    finally:
+        heartbeat.cancel()
+
+    latencies = sorted(done - sent for done, sent in zip(received, stream.times))
+
+    def percentile(fraction):
+        return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] if latencies else 0.0
+
+    return {
+        'lines_per_sec': len(received) / elapsed if elapsed > 0 else float('inf'),
+        'latency_p50': percentile(0.5),
+        'latency_p99': percentile(0.99),
+        'latency_max': percentile(1.0),
+        'loop_lag_max': lag[0],
+    }
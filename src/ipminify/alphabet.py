@@ -0,0 +1,461 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from contextlib import contextmanager
+from ipminify import accelerator
+from ipminify._compat import PY3, integer_types, string_types
+from itertools import product
+
+import sys
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
+try:
+    from functools import lru_cache
+except ImportError:
+    lru_cache = None
+
+
+# array typecode for an unsigned, 32-bit integer on this platform
+_U32_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# upper bound on the number of entries in an alphabet's chunk lookup tables
+_CHUNK_TABLE_LIMIT = 4096
+
+# the digits int() understands, used to decode alphabets of up to 36 letters through a translate table
+_INT_DIGITS = b'0123456789abcdefghijklmnopqrstuvwxyz'
+
+# a byte which int() will never accept as a digit, used to mark letters not present in an alphabet
+_INVALID_DIGIT = b'!'
+
+# the number of compiled alphabets retained by get_alphabet
+CACHE_SIZE = 64
+
+# the letters of the default alphabet in code point order, for fixed-width encodings which sort in address order
+SORTABLE_ALPHABET = '23456789abcdefghjkmnpqrstuvwxyz'
+
+
+def _to_u32_array(values):
+    """Coerce a sequence of addresses into an array of unsigned, 32-bit integers, validating bounds in bulk."""
+    if isinstance(values, array) and values.typecode == _U32_TYPECODE:
+        return values
+
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        # packed buffers hold big-endian (network byte order) addresses
+        if len(values) % 4 != 0:
+            raise ValueError("Packed address buffer length is not a multiple of four bytes: {}".format(len(values)))
+
+        result = array(_U32_TYPECODE, bytes(values))
+
+        if sys.byteorder == 'little':
+            result.byteswap()
+
+        return result
+
+    try:
+        return array(_U32_TYPECODE, values)
+    except OverflowError as e:
+        raise ValueError("IPv4 address not in range (0x00000000-0xFFFFFFFF): {}".format(e))
+    except TypeError as e:
+        raise TypeError("Values must be integers: {}".format(e))
+
+
+def _is_ndarray(values):
+    """Determine whether the value is a NumPy array without importing NumPy."""
+    return type(values).__module__ == 'numpy' and hasattr(values, 'dtype')
+
+
+def _fixed_encoder(chunks, chunk, chunk_count, offset):
+    """Build a fixed-width encoder which extracts chunk_count chunks with an unrolled sequence of divisions."""
+    if chunk_count == 1:
+        def encode(value):
+            return chunks[value][offset:]
+    elif chunk_count == 2:
+        def encode(value):
+            high, low = divmod(value, chunk)
+            return (chunks[high] + chunks[low])[offset:]
+    elif chunk_count == 3:
+        def encode(value):
+            high, low = divmod(value, chunk)
+            high, middle = divmod(high, chunk)
+            return (chunks[high] + chunks[middle] + chunks[low])[offset:]
+    elif chunk_count == 4:
+        def encode(value):
+            high, low = divmod(value, chunk)
+            high, middle_low = divmod(high, chunk)
+            high, middle_high = divmod(high, chunk)
+            return (chunks[high] + chunks[middle_high] + chunks[middle_low] + chunks[low])[offset:]
+    else:
+        divisors = [chunk ** power for power in range(chunk_count - 1, -1, -1)]
+
+        def encode(value):
+            return ''.join([chunks[value // divisor % chunk] for divisor in divisors])[offset:]
+
+    return encode
+
+
+class Alphabet(object):
+    """
+    A compiled minifier alphabet.
+
+    Compiling an alphabet validates it once and precomputes the tables used to encode and decode: a letter-to-index
+    map, a 256-entry translate table for decoding, lookup tables for encoding several digits at a time, and the maximum
+    encoded width of a u32.
+
+    Fixed-width encodings are left-padded with the first letter to that width. If the alphabet is sortable, meaning
+    its letters are in code point order, fixed-width encodings sort lexicographically in address order.
+    """
+
+    def __init__(self, letters):
+        """Compile an alphabet from a string of at least two distinct letters."""
+        if not isinstance(letters, string_types):
+            raise TypeError("Alphabet must be a string, received {}".format(type(letters)))
+
+        if len(letters) < 2:
+            raise ValueError("Alphabet must contain at least two characters.")
+
+        self.letters = letters
+        self.base = len(letters)
+        self.map = { letter: index for index, letter in enumerate(letters) }
+
+        # a repeated letter would stand for two digits, so encodings could not be decoded back
+        if len(self.map) != self.base:
+            raise ValueError("Alphabet must not repeat letters: {}".format(letters))
+
+        # encode several digits per division: chunks are zero-padded, heads are the unpadded leading chunk
+        self._chunk_digits = 1
+
+        while self.base ** (self._chunk_digits + 1) <= _CHUNK_TABLE_LIMIT:
+            self._chunk_digits += 1
+
+        self._chunk = self.base ** self._chunk_digits
+        self._chunks = [''.join(digits) for digits in product(letters, repeat=self._chunk_digits)]
+        self._heads = [chunk.lstrip(letters[0]) or letters[0] for chunk in self._chunks]
+
+        # decode through bytes.translate() and int() when the alphabet fits in both
+        self._translate = None
+
+        if PY3 and self.base <= 36 and all(ord(letter) < 256 for letter in letters):
+            table = bytearray(_INVALID_DIGIT * 256)
+
+            for letter, index in self.map.items():
+                table[ord(letter)] = _INT_DIGITS[index]
+
+            self._translate = bytes(table)
+
+        self.width = len(self._encode(0xFFFFFFFF))
+        self.sortable = list(letters) == sorted(letters)
+
+        # fixed-width encoding always extracts the same number of chunks and trims the excess padding
+        chunk_count = -(-self.width // self._chunk_digits)
+
+        self._encode_fixed = _fixed_encoder(self._chunks, self._chunk, chunk_count,
+            chunk_count * self._chunk_digits - self.width)
+
+        # the 128-bit codec, compiled on first use by ipminify.ipv6
+        self._wide = None
+
+        # bind the compiled accelerator, which handles ASCII alphabets
+        self._speedups = None
+
+        if accelerator.speedups is not None and self.base < 256 and all(ord(letter) < 128 for letter in letters):
+            self._accelerate(accelerator.speedups)
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this alphabet."""
+        return "Alphabet({!r})".format(self.letters)
+
+    def __eq__(self, other):
+        """Test equality against another alphabet."""
+        return isinstance(other, Alphabet) and self.letters == other.letters
+
+    def __ne__(self, other):
+        """Test inequality against another alphabet."""
+        return not self == other
+
+    def __hash__(self):
+        """Return a hash of this alphabet's letters."""
+        return hash(self.letters)
+
+    def decode(self, value):
+        """Decode a minified string into an integer, raising a ValueError if it is not a valid u32 in this alphabet."""
+        if not isinstance(value, string_types):
+            raise TypeError("Value must be a string.")
+
+        if len(value) == 0:
+            raise ValueError("Value must contain at least one character.")
+
+        result = self._decode(value)
+
+        if result > 0xFFFFFFFF:
+            raise ValueError("Unable to expand minified value, value is out of u32 bounds: {}".format(hex(result)))
+
+        return result
+
+    def decode_many(self, values):
+        """Decode a sequence of minified strings into a list of integers."""
+        decode = self.decode
+
+        if self._speedups is not None:
+            values = values if isinstance(values, (list, tuple)) else list(values)
+            result = self._speedups.decode_many(values, self._speedups_table, self.base)
+
+            # the accelerator leaves invalid values to the reference implementation to report
+            if None in result:
+                result = [decode(value) if decoded is None else decoded for value, decoded in zip(values, result)]
+
+            return result
+
+        return [decode(value) for value in values]
+
+    def encode(self, value, fixed_width=False):
+        """Encode an unsigned, 32-bit integer into a minified string, optionally left-padded to a fixed width."""
+        if not isinstance(value, integer_types):
+            raise TypeError("Value must be an integer.")
+
+        if value < 0 or value > 0xFFFFFFFF:
+            raise ValueError("Value not in range (0x00000000-0xFFFFFFFF): {}".format(hex(value)))
+
+        if fixed_width:
+            return self._encode_fixed(value)
+
+        return self._encode(value)
+
+    def encode_many(self, values, fixed_width=False):
+        """
+        Encode a sequence of unsigned, 32-bit integers into a list of minified strings, optionally left-padded to a
+        fixed width.
+
+        Accepts any iterable of integers, an array('I'), a NumPy integer array, or a bytes-like buffer of packed,
+        big-endian (network byte order) addresses.
+        """
+        if _is_ndarray(values):
+            return self._encode_ndarray(values, fixed_width)
+
+        if self._speedups is not None:
+            return self._speedups.encode_many(_to_u32_array(values), self.letters, self.width if fixed_width else 0)
+
+        if fixed_width:
+            encode = self._encode_fixed
+
+            return [encode(value) for value in _to_u32_array(values)]
+
+        heads, chunks, chunk = self._heads, self._chunks, self._chunk
+
+        result = []
+        append = result.append
+
+        for value in _to_u32_array(values):
+            if value < chunk:
+                append(heads[value])
+                continue
+
+            value, rem = divmod(value, chunk)
+            encoded = chunks[rem]
+
+            while value >= chunk:
+                value, rem = divmod(value, chunk)
+                encoded = chunks[rem] + encoded
+
+            append(heads[value] + encoded)
+
+        return result
+
+    def _accelerate(self, speedups):
+        """Bind the compiled accelerator's encoders and decoders to this alphabet."""
+        letters, width, encode = self.letters, self.width, speedups.encode
+
+        table = bytearray(b'\xff' * 256)
+
+        for letter, index in self.map.items():
+            table[ord(letter)] = index
+
+        self._speedups = speedups
+        self._speedups_table = bytes(table)
+
+        self._encode = lambda value: encode(value, letters, 0)
+        self._encode_fixed = lambda value: encode(value, letters, width)
+
+    def _decode(self, value):
+        """Decode a string into an integer without validating its type or bounds."""
+        if self._speedups is not None:
+            result = self._speedups.decode(value, self._speedups_table, self.base)
+
+            if result is not None:
+                return result
+
+        if self._translate is not None:
+            try:
+                return int(value.encode('latin-1').translate(self._translate), self.base)
+            except ValueError:
+                # fall through to report the offending letter
+                pass
+
+        alphabet_len, alphabet_map = self.base, self.map
+        result = 0
+
+        for letter in value:
+            index = alphabet_map.get(letter, -1)
+
+            if index < 0:
+                raise ValueError("Value contains letter not present in minifier alphabet: {}".format(letter))
+
+            result = (result * alphabet_len) + index
+
+        return result
+
+    def _encode(self, value):
+        """Encode a non-negative integer without validating its type or bounds."""
+        chunk = self._chunk
+
+        if value < chunk:
+            # short-circuit
+            return self._heads[value]
+
+        chunks = self._chunks
+
+        value, rem = divmod(value, chunk)
+        result = chunks[rem]
+
+        while value >= chunk:
+            value, rem = divmod(value, chunk)
+            result = chunks[rem] + result
+
+        return self._heads[value] + result
+
+    def _encode_ndarray(self, values, fixed_width=False):
+        """Encode a NumPy integer array with vectorized digit extraction."""
+        import numpy
+
+        if values.dtype.kind not in 'ui':
+            raise TypeError("Values must be integers, received array of dtype {}".format(values.dtype))
+
+        values = values.ravel()
+
+        if values.size == 0:
+            return []
+
+        if values.dtype.kind == 'i' or values.dtype.itemsize > 4:
+            low, high = int(values.min()), int(values.max())
+
+            if low < 0 or high > 0xFFFFFFFF:
+                raise ValueError("IPv4 address not in range (0x00000000-0xFFFFFFFF): {}".format(
+                    hex(low if low < 0 else high)))
+
+        base, width = self.base, self.width
+
+        remaining = values.astype(numpy.uint64)
+        digits = numpy.empty((values.size, width), dtype=numpy.uint32)
+
+        for position in range(width - 1, -1, -1):
+            digits[:, position] = remaining % base
+            remaining //= base
+
+        # map digits to code points and reinterpret each row as a fixed-width unicode string
+        letters = numpy.array([ord(letter) for letter in self.letters], dtype=numpy.uint32)
+        padded = letters[digits].view(numpy.dtype(('U', width))).ravel().tolist()
+
+        if fixed_width:
+            return padded
+
+        lengths = numpy.ones(values.size, dtype=numpy.intp)
+
+        for power in range(1, width):
+            lengths += values >= base ** power
+
+        return [encoded[width - length:] for encoded, length in zip(padded, lengths.tolist())]
+
+
+if lru_cache is not None:
+    _compile = lru_cache(maxsize=CACHE_SIZE)(Alphabet)
+else:
+    from collections import OrderedDict
+
+    import threading
+
+    # the CACHE_SIZE most recently used alphabets, by letters, in order of use
+    _compiled = OrderedDict()
+    _compiled_lock = threading.Lock()
+
+    def _compile(letters):
+        """Compile an alphabet, reusing the most recently compiled alphabets as lru_cache does on newer versions."""
+        with _compiled_lock:
+            alphabet = _compiled.pop(letters, None)
+
+            if alphabet is not None:
+                _compiled[letters] = alphabet
+
+                return alphabet
+
+        # compiled outside the lock, keeping whichever alphabet a concurrent caller cached first
+        alphabet = Alphabet(letters)
+
+        with _compiled_lock:
+            alphabet = _compiled.setdefault(letters, alphabet)
+
+            while len(_compiled) > CACHE_SIZE:
+                _compiled.popitem(last=False)
+
+        return alphabet
+
+    _compile.cache_clear = _compiled.clear
+
+
+def get_alphabet(alphabet):
+    """Return a compiled Alphabet for an Alphabet or a string of letters, reusing recently compiled alphabets."""
+    if isinstance(alphabet, Alphabet):
+        return alphabet
+
+    if not isinstance(alphabet, string_types):
+        raise TypeError("Alphabet must be a string or an Alphabet, received {}".format(type(alphabet)))
+
+    return _compile(alphabet)
+
+
+# the alphabet overriding the default in the current context, if any; reads never lock
+if ContextVar is not None:
+    _override = ContextVar('ipminify_alphabet', default=None)
+
+    def current_override():
+        """Return the compiled Alphabet overriding the default in the current context, or None."""
+        return _override.get()
+else:
+    import threading
+
+    _override = threading.local()
+
+    def current_override():
+        """Return the compiled Alphabet overriding the default in the current thread, or None."""
+        return getattr(_override, 'alphabet', None)
+
+
+@contextmanager
+def using_alphabet(alphabet):
+    """
+    Override the default alphabet within a block, from a string of letters or a compiled Alphabet, yielding the
+    compiled Alphabet.
+
+    The override applies only to the current thread, or to the current task under asyncio, and is restored on exit.
+    Passing None restores the process-wide default within the block.
+    """
+    codec = None if alphabet is None else get_alphabet(alphabet)
+
+    if ContextVar is not None:
+        token = _override.set(codec)
+
+        try:
+            yield codec
+        finally:
+            _override.reset(token)
+    else:
+        previous = current_override()
+        _override.alphabet = codec
+
+        try:
+            yield codec
+        finally:
+            _override.alphabet = previous
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from array import array
+from ipminify import IPv4
+from ipminify._compat import array_to_bytes, integer_types
+from ipminify.alphabet import _U32_TYPECODE, _to_u32_array
+from ipminify.dotted import parse_many
+
+import sys
+
+try:
+    from collections.abc import MutableSequence
+except ImportError:
+    from collections import MutableSequence
+
+
+def _address_value(value):
+    """Return the integer value of an IPv4 instance or an unsigned, 32-bit integer."""
+    if isinstance(value, IPv4):
+        return value.to_int()
+
+    return IPv4(value).to_int()
+
+
+class IPv4Array(MutableSequence):
+    """
+    A compact, mutable sequence of IPv4 addresses.
+
+    Addresses are stored as raw unsigned, 32-bit integers in an array, four bytes each, and IPv4 instances are only
+    created when an element is accessed.
+    """
+
+    def __init__(self, values=()):
+        """Create an array from an iterable of IPv4 instances or integers, or a buffer of packed big-endian addresses."""
+        if isinstance(values, IPv4Array):
+            self._values = array(_U32_TYPECODE, values._values)
+        elif isinstance(values, (array, bytes, bytearray, memoryview)) or type(values).__module__ == 'numpy':
+            self._values = array(_U32_TYPECODE, _to_u32_array(values))
+        else:
+            self._values = array(_U32_TYPECODE, [_address_value(value) for value in values])
+
+    @classmethod
+    def from_minified(cls, values, alphabet=None):
+        """Create an array from a sequence of minified strings, optionally with a user-supplied alphabet."""
+        return cls(array(_U32_TYPECODE, IPv4.from_minified_many(values, alphabet)))
+
+    @classmethod
+    def from_str(cls, values):
+        """Create an array from a sequence of dotted-quad strings or bytes, such as lines read from a file."""
+        return cls(array(_U32_TYPECODE, parse_many(values)))
+
+    def __contains__(self, value):
+        """Test membership of an IPv4 instance or integer without materializing instances."""
+        if isinstance(value, IPv4):
+            value = value.to_int()
+        elif not isinstance(value, integer_types):
+            return False
+
+        return value in self._values
+
+    def __delitem__(self, index):
+        """Remove the address or addresses at an index or slice."""
+        del self._values[index]
+
+    def __eq__(self, other):
+        """Test equality against another array."""
+        return isinstance(other, IPv4Array) and self._values == other._values
+
+    def __getitem__(self, index):
+        """Return the IPv4 address at an index, or a new array for a slice."""
+        if isinstance(index, slice):
+            result = IPv4Array()
+            result._values = self._values[index]
+
+            return result
+
+        return IPv4._unchecked(self._values[index])
+
+    def __iter__(self):
+        """Iterate over the addresses as IPv4 instances."""
+        unchecked = IPv4._unchecked
+
+        for value in self._values:
+            yield unchecked(value)
+
+    def __len__(self):
+        """Return the number of addresses."""
+        return len(self._values)
+
+    def __ne__(self, other):
+        """Test inequality against another array."""
+        return not self == other
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this array."""
+        return "IPv4Array([{}])".format(', '.join(str(address) for address in self))
+
+    def __setitem__(self, index, value):
+        """Replace the address at an index, or the addresses in a slice."""
+        if isinstance(index, slice):
+            self._values[index] = IPv4Array(value)._values
+        else:
+            self._values[index] = _address_value(value)
+
+    def extend(self, values):
+        """Append addresses from an iterable of IPv4 instances or integers, or another IPv4Array."""
+        self._values.extend(IPv4Array(values)._values)
+
+    def insert(self, index, value):
+        """Insert an address before an index."""
+        self._values.insert(index, _address_value(value))
+
+    def minify(self, alphabet=None):
+        """Return a list of the minified addresses, optionally with a user-supplied alphabet."""
+        return IPv4.minify_many(self._values, alphabet)
+
+    def to_bytes(self):
+        """Return the addresses packed as big-endian (network byte order) bytes."""
+        if sys.byteorder == 'little':
+            values = array(_U32_TYPECODE, self._values)
+            values.byteswap()
+
+            return array_to_bytes(values)
+
+        return array_to_bytes(self._values)
+
+    @property
+    def values(self):
+        """The underlying array of unsigned, 32-bit integers."""
+        return self._values
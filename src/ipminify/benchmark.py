@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4, IPv6
+from ipminify.dotted import parse_many
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# the alphabets benchmarked, by name; None is the default alphabet
+ALPHABETS = [
+    ('default', None),
+    ('binary', '01'),
+    ('base64', 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'),
+]
+
+# the default number of addresses processed by each benchmark
+DEFAULT_SIZE = 10000
+
+# the default allowed fractional slowdown against a baseline
+DEFAULT_THRESHOLD = 0.2
+
+
+def cases(size=DEFAULT_SIZE, seed=0):
+    """
+    Build the benchmark cases over a fixed, random sample of addresses.
+
+    Returns a list of (name, function, operations) tuples, where each call of function performs the given number of
+    operations.
+    """
+    generator = random.Random(seed)
+    values = [generator.randint(0, 0xFFFFFFFF) for _ in range(size)]
+    addresses = [IPv4(value) for value in values]
+    strings = [address.to_str() for address in addresses]
+    octets = [address.to_octets() for address in addresses]
+
+    result = [
+        ('from_str', lambda: [IPv4.from_str(value) for value in strings], size),
+        ('parse_many', lambda: parse_many(strings), size),
+        ('from_octets', lambda: [IPv4.from_octets(*value) for value in octets], size),
+        ('to_str', lambda: [address.to_str() for address in addresses], size),
+        ('__eq__/IPv4', lambda: [address == address for address in addresses], size),
+        ('__eq__/int', lambda: [address == value for address, value in zip(addresses, values)], size),
+        ('__eq__/str', lambda: [address == value for address, value in zip(addresses, strings)], size),
+    ]
+
+    wide = [generator.getrandbits(128) for _ in range(size)]
+    wide_minified = IPv6.minify_many(wide)
+
+    result.extend([
+        ('ipv6/minify_many', lambda: IPv6.minify_many(wide), size),
+        ('ipv6/from_minified_many', lambda: IPv6.from_minified_many(wide_minified), size),
+    ])
+
+    for name, alphabet in ALPHABETS:
+        minified = IPv4.minify_many(values, alphabet)
+
+        result.extend([
+            ('minify/{}'.format(name), lambda alphabet=alphabet: [address.minify(alphabet) for address in addresses],
+                size),
+            ('minify_many/{}'.format(name), lambda alphabet=alphabet: IPv4.minify_many(values, alphabet), size),
+            ('from_minified/{}'.format(name),
+                lambda alphabet=alphabet, minified=minified: [IPv4.from_minified(value, alphabet) for value in minified],
+                size),
+            ('from_minified_many/{}'.format(name),
+                lambda alphabet=alphabet, minified=minified: IPv4.from_minified_many(minified, alphabet), size),
+        ])
+
+    return result
+
+
+def measure(function, operations, repeat=5):
+    """Measure a function, returning its best rate in operations per second and the peak bytes it allocated."""
+    best = min(timeit.Timer(function).repeat(repeat=repeat, number=1))
+
+    result = { 'ops_per_sec': operations / best if best > 0 else float('inf') }
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+        try:
+            function()
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def run(size=DEFAULT_SIZE, repeat=5, only=None):
+    """Run the benchmarks, optionally only those whose names contain a substring, returning JSON-serializable results."""
+    results = {}
+
+    for name, function, operations in cases(size):
+        if only is None or only in name:
+            results[name] = measure(function, operations, repeat)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'size': size,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline, returning a list of (name, current, baseline) rates for each benchmark whose
+    rate fell by more than the threshold fraction. Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+
+    for name, result in sorted(current['results'].items()):
+        expected = baseline['results'].get(name)
+
+        if expected is None:
+            continue
+
+        if result['ops_per_sec'] < expected['ops_per_sec'] * (1 - threshold):
+            regressions.append((name, result['ops_per_sec'], expected['ops_per_sec']))
+
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line, returning a non-zero exit status on regressions against a baseline."""
+    parser = argparse.ArgumentParser(prog='python -m ipminify.benchmark',
+        description="Benchmark ipminify operations, optionally checking for regressions against a stored baseline.")
+
+    parser.add_argument('-n', '--size', type=int, default=DEFAULT_SIZE,
+        help="number of addresses per benchmark (default: {})".format(DEFAULT_SIZE))
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+        help="number of timed repetitions, of which the best is kept (default: 5)")
+    parser.add_argument('-k', '--only', default=None,
+        help="only run benchmarks whose names contain this string")
+    parser.add_argument('-o', '--output', default=None,
+        help="write JSON results to this file instead of standard output")
+    parser.add_argument('-b', '--baseline', default=None,
+        help="compare against JSON results previously written to this file")
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help="allowed fractional slowdown against the baseline (default: {})".format(DEFAULT_THRESHOLD))
+
+    args = parser.parse_args(argv)
+    results = run(args.size, args.repeat, args.only)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+
+    for name, current, expected in regressions:
+        sys.stderr.write("regression: {}: {:.0f} ops/sec, baseline {:.0f} ops/sec\n".format(name, current, expected))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from ipminify import IPv4
+from ipminify._compat import integer_types
+
+import threading
+
+
+# the default maximum number of entries held, counting each direction of an address separately
+DEFAULT_SIZE = 65536
+
+
+class MinifyCache(object):
+    """
+    A bounded, thread-safe cache of minified names and the IPv4 addresses they decode to.
+
+    Entries are keyed by the alphabet's letters as well as the address or name, so changing the default alphabet, or
+    overriding it with using_alphabet(), never returns a name from another alphabet; entries for alphabets no longer
+    in use simply age out. Encoding an address also caches the decoding of its name, and decoding a name caches the
+    encoding of its address, so traffic which alternates between the two directions is served from either. Decoding
+    returns the cached IPv4 instance itself, which is immutable. When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        """Create an empty cache holding at most maxsize entries."""
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1: {}".format(maxsize))
+
+        self.maxsize = maxsize
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits, self._misses, self._evictions = 0, 0, 0
+
+    def __len__(self):
+        """Return the number of entries in this cache."""
+        return len(self._entries)
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this cache."""
+        return "MinifyCache({}/{} entries)".format(len(self._entries), self.maxsize)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits, self._misses, self._evictions = 0, 0, 0
+
+    def decode(self, value, alphabet=None):
+        """Convert a minified string into an IPv4 address, as IPv4.from_minified does, through this cache."""
+        if value is None:
+            raise ValueError("Unable to unmarshal minified value: value is None.")
+
+        codec = IPv4._resolve_alphabet(alphabet)
+        key = (value, codec.letters)
+
+        result = self._get(key)
+
+        if result is not None:
+            return result
+
+        result = IPv4._unchecked(codec.decode(value))
+        entries = [(key, result)]
+
+        # only the canonical spellings of a name are cached as encodings, not names with arbitrary leading padding
+        if value == codec._encode(result._value):
+            entries.append(((result._value, codec.letters, False), value))
+
+        if len(value) == codec.width:
+            entries.append(((result._value, codec.letters, True), value))
+
+        self._store(entries)
+
+        return result
+
+    def encode(self, address, alphabet=None, fixed_width=False):
+        """Minify an IPv4 address or unsigned, 32-bit integer, as IPv4.minify does, through this cache."""
+        value = address._value if isinstance(address, IPv4) else address
+
+        # validated as the codec would before the lookup, as 1.0 would otherwise find the entry for 1
+        if not isinstance(value, integer_types):
+            raise TypeError("Value must be an integer.")
+
+        if value < 0 or value > 0xFFFFFFFF:
+            raise ValueError("Value not in range (0x00000000-0xFFFFFFFF): {}".format(hex(value)))
+
+        codec = IPv4._resolve_alphabet(alphabet)
+        key = (value, codec.letters, bool(fixed_width))
+
+        result = self._get(key)
+
+        if result is not None:
+            return result
+
+        result = codec.encode(value, fixed_width)
+        self._store([(key, result), ((result, codec.letters), IPv4._unchecked(value))])
+
+        return result
+
+    def stats(self):
+        """Return a dictionary of the hits, misses, evictions, hit rate, and current and maximum size of this cache."""
+        with self._lock:
+            hits, misses, evictions, size = self._hits, self._misses, self._evictions, len(self._entries)
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': float(hits) / (hits + misses) if hits + misses > 0 else 0.0,
+            'size': size,
+            'maxsize': self.maxsize,
+        }
+
+    def _get(self, key):
+        """Return the entry for a key, marking it the most recently used, or None if it is not cached."""
+        # acquired and released explicitly, as a with statement costs twice as much on this path
+        self._lock.acquire()
+
+        try:
+            # popped and re-inserted to become the most recently used, as move_to_end() requires Python 3.2
+            result = self._entries.pop(key, None)
+
+            if result is None:
+                self._misses += 1
+            else:
+                self._entries[key] = result
+                self._hits += 1
+
+            return result
+        finally:
+            self._lock.release()
+
+    def _store(self, entries):
+        """Insert (key, value) pairs as the most recently used, evicting the least recently used beyond the bound."""
+        with self._lock:
+            for key, value in entries:
+                self._entries.pop(key, None)
+                self._entries[key] = value
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+
+# the cache in use by IPv4.minify and IPv4.from_minified, if enabled
+cache = None
+
+# the cached methods installed on IPv4, by name, with the methods they replaced
+_installed = {}
+
+# the methods replaced when the cache was last enabled, by name, called by cached methods left installed beneath a
+# later replacement, such as instrumentation, once the cache is disabled
+_uncached = {}
+
+
+def _minify(self, alphabet=None, fixed_width=False):
+    """Minify this address through the enabled cache."""
+    current = cache
+
+    if current is None:
+        return _uncached['minify'](self, alphabet, fixed_width)
+
+    return current.encode(self._value, alphabet, fixed_width)
+
+
+def _from_minified(cls, value, alphabet=None):
+    """Convert a minified string into an IPv4 address through the enabled cache."""
+    current = cache
+
+    if current is None:
+        return _uncached['from_minified'].__func__(cls, value, alphabet)
+
+    return current.decode(value, alphabet)
+
+
+def enable(maxsize=DEFAULT_SIZE, minify=False):
+    """
+    Route IPv4.from_minified, and IPv4.minify if requested, through a new MinifyCache holding at most maxsize entries,
+    returning the cache so that its statistics can be read. Enabling the cache again replaces it with an empty one.
+
+    Encoding a single address costs less than a cache lookup, so IPv4.minify is left uncached unless minify is set;
+    decoding costs several times more, and returns a shared instance from the cache.
+    """
+    global cache
+
+    disable()
+
+    cache = MinifyCache(maxsize)
+    replacements = {'from_minified': classmethod(_from_minified)}
+
+    if minify:
+        replacements['minify'] = _minify
+
+    for name, replacement in replacements.items():
+        original = IPv4.__dict__[name]
+
+        # a method left installed by a disabled cache is replaced as if it were the uncached method saved for it
+        if getattr(original, '__func__', original) not in (_minify, _from_minified):
+            _uncached[name] = original
+
+        _installed[name] = (replacement, _uncached[name])
+        setattr(IPv4, name, replacement)
+
+    return cache
+
+
+def disable():
+    """
+    Restore the uncached IPv4.minify and IPv4.from_minified and discard the cache, leaving any later replacement of a
+    method in place.
+    """
+    global cache
+
+    for name, (replacement, original) in _installed.items():
+        if IPv4.__dict__.get(name) is replacement:
+            setattr(IPv4, name, original)
+
+    _installed.clear()
+    cache = None
+
+
+def enabled():
+    """Determine whether the cache is enabled."""
+    return cache is not None
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from itertools import islice
+from ipminify.rewrite import LineRewriter
+from ipminify.store import AddressStoreWriter
+
+import argparse
+import multiprocessing
+import sys
+
+
+# the default number of lines rewritten per chunk
+DEFAULT_CHUNK_SIZE = 16384
+
+
+def _chunks(lines, size):
+    """Yield lists of at most size lines from an iterable of lines."""
+    lines = iter(lines)
+
+    while True:
+        chunk = list(islice(lines, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _read_lines(paths, stdin):
+    """Yield lines from each of the given paths in turn, reading standard input for no paths or for '-'."""
+    for path in paths or ['-']:
+        if path == '-':
+            for line in stdin:
+                yield line
+        else:
+            with open(path) as f:
+                for line in f:
+                    yield line
+
+
+def _map_parallel(function, chunks, jobs):
+    """Apply a function to chunks in a pool of worker processes, yielding results in order with bounded buffering."""
+    pool = multiprocessing.Pool(jobs)
+
+    try:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append(pool.apply_async(function, (chunk,)))
+
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def parser():
+    """Build the command-line argument parser."""
+    result = argparse.ArgumentParser(prog='ipminify',
+        description="Minify IPv4 addresses, one per line or in a delimited field, or expand minified addresses.")
+
+    result.add_argument('files', metavar='FILE', nargs='*',
+        help="files to read, or '-' for standard input (default: standard input)")
+    result.add_argument('-d', '--expand', action='store_true',
+        help="expand minified addresses into dotted-quad addresses instead of minifying")
+    result.add_argument('-a', '--alphabet', default=None,
+        help="use a custom minifier alphabet")
+    result.add_argument('-f', '--field', type=int, default=None,
+        help="rewrite only this 1-based field of each line")
+    result.add_argument('-t', '--delimiter', default='\t',
+        help="field delimiter used with --field (default: tab)")
+    result.add_argument('-j', '--jobs', type=int, default=1,
+        help="number of worker processes (default: 1)")
+    result.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        help="number of lines rewritten at a time (default: {})".format(DEFAULT_CHUNK_SIZE))
+    result.add_argument('--ignore-errors', action='store_true',
+        help="pass invalid addresses through unchanged instead of failing")
+    result.add_argument('--store', metavar='PATH', default=None,
+        help="pack the addresses read into a binary address store at PATH instead of writing lines; invalid "
+            "addresses are skipped with --ignore-errors")
+
+    return result
+
+
+def main(argv=None, stdin=None, stdout=None):
+    """Run the ipminify command, returning its exit status."""
+    stdin = stdin if stdin is not None else sys.stdin
+    stdout = stdout if stdout is not None else sys.stdout
+
+    args = parser().parse_args(argv)
+
+    if args.field is not None and args.field < 1:
+        parser().error("--field must be at least 1")
+
+    if args.jobs < 1 or args.chunk_size < 1:
+        parser().error("--jobs and --chunk-size must be at least 1")
+
+    try:
+        rewriter = LineRewriter(expand=args.expand, alphabet=args.alphabet,
+            field=args.field - 1 if args.field is not None else None, delimiter=args.delimiter,
+            ignore_errors=args.ignore_errors)
+
+        chunks = _chunks(_read_lines(args.files, stdin), args.chunk_size)
+        function = rewriter.values if args.store is not None else rewriter.rewrite
+
+        if args.jobs > 1:
+            results = _map_parallel(function, chunks, args.jobs)
+        else:
+            results = (function(chunk) for chunk in chunks)
+
+        if args.store is not None:
+            with AddressStoreWriter(args.store, args.alphabet) as writer:
+                for values in results:
+                    writer.write(values)
+        else:
+            for lines in results:
+                stdout.writelines(lines)
+    except (IOError, TypeError, ValueError) as e:
+        sys.stderr.write("ipminify: error: {}\n".format(e))
+        return 1
+
+    stdout.flush()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
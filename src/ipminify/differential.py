@@ -0,0 +1,544 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from ipminify import IPv4, accelerator
+from ipminify.alphabet import _U32_TYPECODE, SORTABLE_ALPHABET, Alphabet, get_alphabet
+from ipminify.dotted import format as _format_dotted, format_many, parse as _parse_dotted, parse_many
+from ipminify.parallel import _workers
+from itertools import repeat
+
+import argparse
+import json
+import random
+import sys
+import time
+
+
+# the number of u32 values
+SPACE = 1 << 32
+
+# the alphabets checked by default: the default alphabet, the smallest, a sortable one, one decoded letter by letter
+# rather than through int(), and one which only the pure-Python implementation handles
+ALPHABETS = [
+    IPv4.MINIFIER_CODEC.letters,
+    '01',
+    SORTABLE_ALPHABET,
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_',
+    u'αβγδεζηθικ',
+]
+
+# the implementations compared, in order; the first selected is the one the others must agree with
+IMPLEMENTATIONS = ('reference', 'pure', 'pure/single', 'compiled', 'compiled/single', 'numpy')
+
+# the implementations compared by default in exhaustive sweeps, where converting one value per call would take days
+BULK_IMPLEMENTATIONS = ('pure', 'compiled', 'numpy')
+
+# the number of values in each chunk of the space handed to a worker
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# the number of values sampled from each chunk in sampled mode
+DEFAULT_SAMPLES = 64
+
+# the most mismatches reported from a single chunk; all of them are counted
+MAX_REPORTED = 10
+
+
+def _reference_encode(letters, value):
+    """Encode an integer by repeated division, the definition every implementation must agree with."""
+    base = len(letters)
+    digits = []
+
+    while True:
+        value, digit = divmod(value, base)
+        digits.append(letters[digit])
+
+        if value == 0:
+            return ''.join(reversed(digits))
+
+
+def _reference_decode(letters, name):
+    """Decode a name letter by letter, raising ValueError for unknown letters and values beyond u32 bounds."""
+    base = len(letters)
+    result = 0
+
+    for letter in name:
+        index = letters.find(letter)
+
+        if index < 0:
+            raise ValueError("Value contains letter not present in minifier alphabet: {}".format(letter))
+
+        result = result * base + index
+
+    if result > 0xFFFFFFFF:
+        raise ValueError("Unable to expand minified value, value is out of u32 bounds: {}".format(hex(result)))
+
+    return result
+
+
+def _reference_format(value):
+    """Format an integer as a dotted quad octet by octet, raising ValueError beyond u32 bounds."""
+    if not 0 <= value <= 0xFFFFFFFF:
+        raise ValueError("Value is out of u32 bounds: {}".format(value))
+
+    return '{}.{}.{}.{}'.format(value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+
+def _reference_parse(string):
+    """Parse a dotted quad by converting each octet with int(), raising ValueError for anything else."""
+    octets = string.split(b'.' if isinstance(string, bytes) else '.')
+
+    if len(octets) != 4:
+        raise ValueError("Invalid IPv4 address string: {}".format(string))
+
+    result = 0
+
+    for octet in octets:
+        octet = int(octet)
+
+        if not 0 <= octet <= 0xFF:
+            raise ValueError("Octet is out of bounds: {}".format(octet))
+
+        result = (result << 8) | octet
+
+    return result
+
+
+def _compile(letters, speedups):
+    """Compile an uncached alphabet bound to an accelerator module, or to the pure-Python implementation if None."""
+    saved = accelerator.speedups
+    accelerator.speedups = speedups
+
+    try:
+        return Alphabet(letters)
+    finally:
+        accelerator.speedups = saved
+
+
+# the codecs compiled for each alphabet in this process, by letters
+_codecs = {}
+
+
+def _codecs_for(letters):
+    """Return the pure and compiled codecs for an alphabet, the latter None if the accelerator cannot handle it."""
+    if letters not in _codecs:
+        compiled = _compile(letters, accelerator.compiled) if accelerator.compiled is not None else None
+
+        _codecs[letters] = (_compile(letters, None), compiled if compiled is not None and compiled._speedups else None)
+
+    return _codecs[letters]
+
+
+def _numpy():
+    """Return the NumPy module, or None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+
+def available(letters=None):
+    """Return the names of the implementations available in this environment, for an alphabet if one is given."""
+    result = []
+
+    for name in IMPLEMENTATIONS:
+        if name.startswith('compiled'):
+            if accelerator.compiled is None or (letters is not None and _codecs_for(letters)[1] is None):
+                continue
+        elif name == 'numpy' and _numpy() is None:
+            continue
+
+        result.append(name)
+
+    return result
+
+
+def _encoders(letters, implementations):
+    """Return (name, encode) pairs, where encode(values, fixed_width) returns a list of names."""
+    pure, compiled = _codecs_for(letters)
+    numpy = _numpy()
+
+    candidates = {
+        'reference': lambda values, fixed_width: [_reference_encode(letters, value) for value in values],
+        'pure': pure.encode_many,
+        'pure/single': lambda values, fixed_width: [pure.encode(value, fixed_width) for value in values],
+        'numpy': lambda values, fixed_width: pure.encode_many(numpy.frombuffer(values, numpy.uint32), fixed_width),
+    }
+
+    if compiled is not None:
+        candidates.update({
+            'compiled': compiled.encode_many,
+            'compiled/single': lambda values, fixed_width: [compiled.encode(value, fixed_width) for value in values],
+        })
+
+    return [(name, candidates[name]) for name in implementations if name in candidates and (name != 'numpy' or numpy)]
+
+
+def _decoders(letters, implementations):
+    """Return (name, decode) pairs, where decode(names) returns a list of integers; NumPy only encodes."""
+    pure, compiled = _codecs_for(letters)
+
+    candidates = {
+        'reference': lambda names: [_reference_decode(letters, name) for name in names],
+        'pure': pure.decode_many,
+        'pure/single': lambda names: [pure.decode(name) for name in names],
+    }
+
+    if compiled is not None:
+        candidates.update({
+            'compiled': compiled.decode_many,
+            'compiled/single': lambda names: [compiled.decode(name) for name in names],
+        })
+
+    return [(name, candidates[name]) for name in implementations if name in candidates]
+
+
+def _bound(speedups, function):
+    """Wrap a function to run with an accelerator module bound, or with the pure-Python implementation if None."""
+    def call(*args):
+        saved = accelerator.speedups
+        accelerator.speedups = speedups
+
+        try:
+            return function(*args)
+        finally:
+            accelerator.speedups = saved
+
+    return call
+
+
+def _formatters(implementations):
+    """Return (name, format) pairs for the dotted-quad formatters, where format(values) returns a list of strings."""
+    candidates = {
+        'reference': lambda values: [_reference_format(value) for value in values],
+        'pure': _bound(None, format_many),
+        'pure/single': _bound(None, lambda values: [_format_dotted(value) for value in values]),
+    }
+
+    if accelerator.compiled is not None:
+        candidates.update({
+            'compiled': _bound(accelerator.compiled, format_many),
+            'compiled/single': _bound(accelerator.compiled, lambda values: [_format_dotted(value) for value in values]),
+        })
+
+    return [(name, candidates[name]) for name in implementations if name in candidates]
+
+
+def _parsers(implementations):
+    """Return (name, parse) pairs for the dotted-quad parsers, where parse(strings) returns a list of integers."""
+    candidates = {
+        'reference': lambda strings: [_reference_parse(string) for string in strings],
+        'pure': _bound(None, parse_many),
+        'pure/single': _bound(None, lambda strings: [_parse_dotted(string) for string in strings]),
+    }
+
+    if accelerator.compiled is not None:
+        candidates.update({
+            'compiled': _bound(accelerator.compiled, parse_many),
+            'compiled/single': _bound(accelerator.compiled,
+                lambda strings: [_parse_dotted(string) for string in strings]),
+        })
+
+    return [(name, candidates[name]) for name in implementations if name in candidates]
+
+
+def _variants(string):
+    """Return spellings of a dotted quad which are not canonical, accepted or rejected through int() alone."""
+    octets = string.split('.')
+
+    return [' {}\r\n'.format(string), '.'.join(['0' + octet for octet in octets]), '+' + string, string + '.0',
+        '.'.join(octets[:3] + ['256'])]
+
+
+def _edges(base):
+    """Return the values on either side of each power of a base, where the length of a name changes."""
+    result = set([0, 0xFFFFFFFF])
+    power = 1
+
+    while power <= 0xFFFFFFFF:
+        result.update(value for value in (power - 1, power, power + 1) if value <= 0xFFFFFFFF)
+        power *= base
+
+    return result
+
+
+def _values(base, start, stop, samples, seed):
+    """
+    Return the values of a chunk to check as an array: all of them, or a seeded sample together with the chunk's
+    bounds and the edges of name lengths falling inside it.
+    """
+    if samples is None or samples >= stop - start:
+        return array(_U32_TYPECODE, range(start, stop))
+
+    generator = random.Random(seed)
+
+    values = set(generator.randrange(start, stop) for _ in range(samples))
+    values.update([start, stop - 1])
+    values.update(value for value in _edges(base) if start <= value < stop)
+
+    return array(_U32_TYPECODE, sorted(values))
+
+
+def _apply(function, inputs):
+    """
+    Apply a bulk function to a sequence of inputs. If it raises, apply it to each input alone, so that one rejected
+    input does not hide the results of the others, with the name of the error in place of each rejected input's result;
+    unexpected errors such as an IndexError are recorded the same way, to be reported as mismatches.
+    """
+    try:
+        return function(inputs)
+    except Exception:
+        pass
+
+    result = []
+
+    for index in range(len(inputs)):
+        try:
+            result.extend(function(inputs[index:index + 1]))
+        except Exception as e:
+            result.append(type(e).__name__)
+
+    return result
+
+
+def check_chunk(letters, implementations, start, stop, samples=None, seed=0, dotted=False):
+    """
+    Check every selected implementation against the first over the values in [start, stop), or a sample of them,
+    for a single alphabet.
+
+    Each encoder must produce the same names, and the same names left-padded with the first letter when encoding to a
+    fixed width; each decoder must turn both back into the original values. If the chunk ends at the top of the space,
+    each decoder must also reject the first name beyond it. If dotted is set, the dotted-quad formatters must produce
+    the same strings, and reject the values beyond either end of the space, and the parsers must turn them, as text and
+    as bytes, back into the original values and agree on non-canonical spellings of the chunk's bounds; these do not
+    depend on the alphabet, so a sweep checks them with its first. Returns the number of values checked, which is zero
+    if no selected implementation handles the alphabet, the number of mismatches, and a list of at most MAX_REPORTED of
+    them as dictionaries.
+    """
+    encoders = _encoders(letters, implementations)
+    decoders = _decoders(letters, implementations)
+    formatters = _formatters(implementations) if dotted else []
+
+    # none of the selected implementations handles this alphabet, so there is nothing to compare
+    if not encoders and not formatters:
+        return 0, 0, []
+
+    pure, _ = _codecs_for(letters)
+    values = _values(pure.base, start, stop, samples, seed)
+    expected_values = values.tolist()
+    mismatches = []
+    count = [0]
+
+    def compare(implementation, operation, function, inputs, expected, alphabet=letters):
+        actual = _apply(function, inputs)
+
+        if actual == expected:
+            return
+
+        actual = actual + [None] * (len(expected) - len(actual))
+
+        for value, want, got in zip(inputs, expected, actual):
+            if want != got:
+                count[0] += 1
+
+                if len(mismatches) < MAX_REPORTED:
+                    mismatches.append({'alphabet': alphabet, 'implementation': implementation,
+                        'operation': operation, 'input': value, 'expected': want, 'actual': got})
+
+    if formatters:
+        parsers = _parsers(implementations)
+
+        baseline_name, baseline = formatters[0]
+        strings = baseline(values)
+        variants = _variants(strings[0]) + _variants(strings[-1])
+        expected_variants = _apply(parsers[0][1], variants)
+
+        for name, format_values in formatters:
+            if name != baseline_name:
+                compare(name, 'format', format_values, values, strings, None)
+
+            if start == 0:
+                compare(name, 'format/underflow', format_values, [-1], ['ValueError'], None)
+
+            if stop == SPACE:
+                compare(name, 'format/overflow', format_values, [SPACE], ['ValueError'], None)
+
+        for name, parse_strings in parsers:
+            compare(name, 'parse', parse_strings, strings, expected_values, None)
+            compare(name, 'parse/bytes', parse_strings, [string.encode('ascii') for string in strings],
+                expected_values, None)
+            compare(name, 'parse/variants', parse_strings, variants, expected_variants, None)
+
+    if not encoders:
+        return 0, count[0], mismatches
+
+    baseline_name, baseline = encoders[0]
+    names = baseline(values, False)
+
+    # mapped rather than looped, as padding each name in Python would cost more than encoding them
+    fixed = list(map(str.rjust, names, repeat(pure.width, len(names)), repeat(letters[0], len(names))))
+
+    for name, encode in encoders:
+        if name != baseline_name:
+            compare(name, 'encode', lambda values: encode(values, False), values, names)
+
+        if name != 'reference':
+            compare(name, 'encode/fixed', lambda values: encode(values, True), values, fixed)
+
+    for name, decode in decoders:
+        compare(name, 'decode', decode, names, expected_values)
+        compare(name, 'decode/fixed', decode, fixed, expected_values)
+
+        if stop == SPACE:
+            compare(name, 'decode/overflow', decode, [_reference_encode(letters, SPACE)], ['ValueError'])
+
+    return len(values), count[0], mismatches
+
+
+def _chunks(start, stop, chunk_size):
+    """Split [start, stop) into consecutive ranges of at most chunk_size values."""
+    return [(lower, min(lower + chunk_size, stop)) for lower in range(start, stop, chunk_size)]
+
+
+def _results(tasks, workers, executor):
+    """Run check_chunk over tasks, in order, in this process or with a bounded number of chunks in flight."""
+    if workers == 1 and executor is None:
+        for task in tasks:
+            yield check_chunk(*task)
+
+        return
+
+    pool = executor if executor is not None else ProcessPoolExecutor(workers)
+    pending = deque()
+
+    try:
+        for task in tasks:
+            pending.append(pool.submit(check_chunk, *task))
+
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if executor is None:
+            pool.shutdown()
+
+
+def sweep(alphabets=None, implementations=None, start=0, stop=SPACE, chunk_size=DEFAULT_CHUNK_SIZE, samples=None,
+        seed=0, workers=None, executor=None, progress=None):
+    """
+    Check the implementations against each other over [start, stop), by default the whole u32 space, for each of a
+    list of alphabets, by default ALPHABETS, and the dotted-quad formatters and parsers once.
+
+    The range is split into chunks checked in worker processes, exhaustively, or by checking samples values from each
+    chunk together with the values where the length of a name changes. Implementations default to every available one
+    when sampling, and to the bulk ones, BULK_IMPLEMENTATIONS, when exhaustive; those unable to handle an alphabet are
+    skipped for it. After each chunk, progress, if given, is called with the
+    number of values checked so far, the fraction of chunks done, and the seconds elapsed.
+
+    Returns a dictionary of the number of values checked, the seconds taken, the throughput, the number of mismatches,
+    and the first mismatches found.
+    """
+    alphabets = [get_alphabet(alphabet).letters for alphabet in (alphabets if alphabets is not None else ALPHABETS)]
+    implementations = list(implementations if implementations is not None else
+        IMPLEMENTATIONS if samples is not None else BULK_IMPLEMENTATIONS)
+    workers = _workers(workers)
+
+    unknown = [name for name in implementations if name not in IMPLEMENTATIONS]
+
+    if unknown:
+        raise ValueError("Unknown implementations: {}".format(', '.join(unknown)))
+
+    if not 0 <= start < stop <= SPACE:
+        raise ValueError("Range is not within the u32 space: [{}, {})".format(start, stop))
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1: {}".format(chunk_size))
+
+    chunks = _chunks(start, stop, chunk_size)
+    tasks = [(letters, implementations, lower, upper, samples, seed + index, position == 0)
+        for position, letters in enumerate(alphabets) for index, (lower, upper) in enumerate(chunks)]
+
+    checked, mismatch_count, mismatches = 0, 0, []
+    begin = time.time()
+
+    for done, (count, chunk_mismatches, reported) in enumerate(_results(tasks, workers, executor), 1):
+        checked += count
+        mismatch_count += chunk_mismatches
+        mismatches.extend(reported[:max(MAX_REPORTED - len(mismatches), 0)])
+
+        if progress is not None:
+            progress(checked, float(done) / len(tasks), time.time() - begin)
+
+    seconds = time.time() - begin
+
+    return {
+        'values': checked,
+        'seconds': seconds,
+        'values_per_sec': checked / seconds if seconds > 0 else float('inf'),
+        'mismatch_count': mismatch_count,
+        'mismatches': mismatches,
+    }
+
+
+def _report(stream, interval=1.0):
+    """Build a progress function writing the throughput to a stream at most once per interval seconds."""
+    last = [0.0]
+
+    def progress(checked, fraction, elapsed):
+        if elapsed - last[0] >= interval or fraction == 1:
+            last[0] = elapsed
+            stream.write("{:.1%} done, {} values checked, {:.0f} values/sec\n".format(fraction, checked,
+                checked / elapsed if elapsed > 0 else 0.0))
+            stream.flush()
+
+    return progress
+
+
+def main(argv=None):
+    """Run a sweep from the command line, returning a non-zero exit status if any implementations disagree."""
+    parser = argparse.ArgumentParser(prog='python -m ipminify.differential',
+        description="Check every available ipminify implementation against the others across the u32 space.")
+
+    parser.add_argument('--exhaustive', action='store_true',
+        help="check every value rather than a sample from each chunk")
+    parser.add_argument('-s', '--samples', type=int, default=DEFAULT_SAMPLES,
+        help="values sampled from each chunk unless exhaustive (default: {})".format(DEFAULT_SAMPLES))
+    parser.add_argument('-c', '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        help="values in each chunk handed to a worker (default: {})".format(DEFAULT_CHUNK_SIZE))
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument('-a', '--alphabet', action='append', default=None,
+        help="an alphabet to check, repeatable (default: a selection of alphabets)")
+    parser.add_argument('-i', '--implementations', default=None,
+        help="comma-separated implementations to compare, the first being the baseline (default: {}, or {} if "
+            "exhaustive)".format(','.join(IMPLEMENTATIONS), ','.join(BULK_IMPLEMENTATIONS)))
+    parser.add_argument('--start', type=int, default=0,
+        help="first value of the range to check (default: 0)")
+    parser.add_argument('--stop', type=int, default=SPACE,
+        help="end of the range to check, exclusive (default: {})".format(SPACE))
+    parser.add_argument('--seed', type=int, default=0,
+        help="seed for sampling (default: 0)")
+
+    args = parser.parse_args(argv)
+    implementations = args.implementations.split(',') if args.implementations is not None else None
+
+    result = sweep(args.alphabet, implementations, args.start, args.stop, args.chunk_size,
+        None if args.exhaustive else args.samples, args.seed, args.jobs, progress=_report(sys.stderr))
+
+    json.dump(result, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+    return 1 if result['mismatch_count'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
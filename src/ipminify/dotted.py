@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from ipminify import accelerator
+from ipminify._compat import integer_types, string_types
+
+
+# canonical octet strings and bytes mapped to their values, and the canonical string of each octet value
+_OCTETS = {}
+_OCTET_STRINGS = [str(_octet) for _octet in range(256)]
+
+for _octet in range(256):
+    _OCTETS[str(_octet)] = _octet
+    _OCTETS[str(_octet).encode('ascii')] = _octet
+
+del _octet
+
+
+def _separator(value):
+    """Return the octet separator matching the type of a string or bytes value."""
+    return b'.' if isinstance(value, bytes) else '.'
+
+
+def _parse_slow(value):
+    """Parse any dotted-quad string that int() accepts for each octet, raising ValueError with the reason if invalid."""
+    octets = value.split(_separator(value))
+
+    if len(octets) != 4:
+        raise ValueError("Invalid IPv4 address string: {}".format(value))
+
+    result = 0
+
+    for index, octet in enumerate(octets):
+        try:
+            octet = int(octet)
+        except ValueError as e:
+            raise ValueError("Unable to convert octet {} to an integer: {} ({})".format(index, octet, e))
+
+        if octet < 0 or octet > 255:
+            raise ValueError("Octet {} is out of bounds: {}".format(index, octet))
+
+        result = (result << 8) | octet
+
+    return result
+
+
+def parse(value):
+    """
+    Parse a dotted-quad string or bytes into an integer.
+
+    Canonical addresses are parsed with one split and four table lookups; anything else falls back to converting each
+    octet with int(), so exactly the same inputs are accepted and rejected either way.
+    """
+    if accelerator.speedups is not None:
+        result = accelerator.speedups.parse(value)
+
+        if result is not None:
+            return result
+
+    if isinstance(value, (bytearray, memoryview)):
+        value = bytes(value)
+    elif not isinstance(value, string_types + (bytes,)):
+        raise TypeError("Value {} is not a string.".format(value))
+
+    try:
+        octet0, octet1, octet2, octet3 = value.split(_separator(value))
+
+        return (_OCTETS[octet0] << 24) | (_OCTETS[octet1] << 16) | (_OCTETS[octet2] << 8) | _OCTETS[octet3]
+    except (KeyError, ValueError):
+        return _parse_slow(value)
+
+
+def parse_many(lines):
+    """
+    Parse an iterable of dotted-quad strings or bytes into a list of integers.
+
+    Surrounding whitespace such as line endings is ignored, so lines read from a file or sliced from an mmap can be
+    passed as they are without decoding them first.
+    """
+    if accelerator.speedups is not None:
+        lines = lines if isinstance(lines, (list, tuple)) else list(lines)
+        result = accelerator.speedups.parse_many(lines)
+
+        # the accelerator leaves non-canonical lines to the reference implementation
+        if None in result:
+            result = [parse(line.strip() if hasattr(line, 'strip') else line) if value is None else value
+                for line, value in zip(lines, result)]
+
+        return result
+
+    octets = _OCTETS
+    result = []
+    append = result.append
+
+    for line in lines:
+        try:
+            octet0, octet1, octet2, octet3 = line.strip().split(b'.' if isinstance(line, bytes) else '.')
+
+            append((octets[octet0] << 24) | (octets[octet1] << 16) | (octets[octet2] << 8) | octets[octet3])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            append(parse(line.strip() if hasattr(line, 'strip') else line))
+
+    return result
+
+
+def parse_buffer(buffer):
+    """
+    Parse a bytes-like buffer of newline-separated dotted-quad addresses into an array('I'), skipping blank lines.
+
+    The compiled accelerator parses the whole buffer without creating a string per line.
+    """
+    if accelerator.speedups is not None:
+        result = accelerator.speedups.parse_buffer(buffer)
+
+        if result is not None:
+            return result
+
+    return array('I' if array('I').itemsize == 4 else 'L',
+        parse_many([line for line in bytes(buffer).split(b'\n') if line.strip()]))
+
+
+def format(value):
+    """Format an unsigned, 32-bit integer as a dotted-quad string."""
+    if not isinstance(value, integer_types):
+        raise TypeError("Value must be an integer.")
+
+    if value < 0 or value > 0xFFFFFFFF:
+        raise ValueError("IPv4 address not in range (0x00000000-0xFFFFFFFF): {}".format(hex(value)))
+
+    return _format(value)
+
+
+def _format(value):
+    """Format an unsigned, 32-bit integer already known to be in range as a dotted-quad string."""
+    if accelerator.speedups is not None:
+        return accelerator.speedups.format(value)
+
+    strings = _OCTET_STRINGS
+
+    # one %-format of four table lookups creates no intermediate strings or tuples of octets
+    return '%s.%s.%s.%s' % (strings[value >> 24], strings[(value >> 16) & 0xFF], strings[(value >> 8) & 0xFF],
+        strings[value & 0xFF])
+
+
+def format_many(values):
+    """Format a sequence of unsigned, 32-bit integers as a list of dotted-quad strings."""
+    from ipminify.alphabet import _to_u32_array
+
+    # validate and coerce in bulk either way, so both implementations accept and reject the same values
+    values = _to_u32_array(values)
+
+    if accelerator.speedups is not None:
+        return accelerator.speedups.format_many(values)
+
+    strings = _OCTET_STRINGS
+
+    return ['%s.%s.%s.%s' % (strings[value >> 24], strings[(value >> 16) & 0xFF], strings[(value >> 8) & 0xFF],
+        strings[value & 0xFF]) for value in values]
+
+
+def format_buffer(values, out=None):
+    """
+    Format a sequence of unsigned, 32-bit integers as newline-terminated, ASCII dotted-quad lines, the inverse of
+    parse_buffer().
+
+    Returns the lines as bytes, or writes them into the writable buffer out, such as a bytearray or an mmap, and returns
+    the number of bytes written. The compiled accelerator measures the output first and writes each line directly, so
+    no string is created per address.
+    """
+    from ipminify.alphabet import _to_u32_array
+
+    values = _to_u32_array(values)
+
+    if accelerator.speedups is not None:
+        result = accelerator.speedups.format_buffer(values, out)
+    else:
+        result = ''.join([line + '\n' for line in format_many(values)]).encode('ascii')
+
+        if out is not None:
+            with memoryview(out) as view, view.cast('B') as target:
+                if target.readonly:
+                    raise TypeError("Output buffer is not a writable, contiguous buffer.")
+
+                if len(target) >= len(result):
+                    target[:len(result)] = result
+                    result = len(result)
+                else:
+                    result = None
+
+    if result is None:
+        raise ValueError("Output buffer is too small for the formatted addresses.")
+
+    return result
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from bisect import bisect_left, bisect_right
+from ipminify import IPv4
+from ipminify._compat import array_to_bytes, integer_types
+from ipminify.alphabet import _U32_TYPECODE
+from ipminify.arrays import _address_value
+
+import json
+import mmap
+import struct
+import sys
+
+
+# the magic number and format version at the start of an index file
+MAGIC = b'IPMX'
+VERSION = 2
+
+# the file header: magic, version, flags, address count, and alphabet length, followed by the alphabet in UTF-8
+_HEADER = struct.Struct('<4sHHII')
+
+# header flag set for indexes of fixed-width names
+_FIXED_WIDTH = 0x1
+
+# addresses are bucketed by their upper sixteen bits, so an exact lookup bisects a single bucket
+_BUCKET_SHIFT = 16
+_BUCKET_COUNT = 1 << (32 - _BUCKET_SHIFT)
+
+
+def _pad(length, alignment=8):
+    """Return the padding needed to align a length."""
+    return -length % alignment
+
+
+def _little_endian(values):
+    """Return the bytes of an array in little-endian order."""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    return array_to_bytes(values)
+
+
+def _view(buffer, offset, typecode, count):
+    """Return a read-only sequence of count little-endian integers of a typecode at an offset into a buffer."""
+    size = array(typecode).itemsize * count
+    view = memoryview(buffer)[offset:offset + size]
+
+    if sys.byteorder != 'little':
+        # the file is little-endian, so big-endian hosts copy and swap instead of mapping
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+
+        return values
+
+    return view.cast(typecode)
+
+
+def _encode_payload(dumps, payload):
+    """Serialize a payload to bytes."""
+    result = dumps(payload)
+
+    return result.encode('utf-8') if not isinstance(result, bytes) else result
+
+
+class MinifiedIndex(object):
+    """
+    A read-only index from minified names to payloads, such as instance records.
+
+    Addresses are held in a sorted array of unsigned, 32-bit integers, with a table of offsets into it for each of
+    the 65536 values of their upper sixteen bits. An exact lookup decodes the name and bisects a single bucket, which
+    for any realistic number of addresses is a handful of comparisons. Prefix and range queries become one or more
+    numeric ranges, each found with two bisections.
+
+    Indexes can be saved to and loaded from a file which is memory-mapped rather than read, so worker processes
+    loading the same file share a single copy of it through the page cache. Payloads are serialized with JSON by
+    default, and are only deserialized as they are read.
+    """
+
+    def __init__(self, pairs=(), alphabet=None, fixed_width=False):
+        """
+        Build an index from an iterable of (address, payload) pairs, where addresses are IPv4 instances or integers.
+        Later pairs replace earlier pairs with the same address.
+        """
+        self.codec = IPv4._resolve_alphabet(alphabet)
+        self.fixed_width = fixed_width
+
+        entries = {}
+
+        for address, payload in pairs:
+            entries[_address_value(address)] = payload
+
+        keys = sorted(entries)
+
+        self._keys = array(_U32_TYPECODE, keys)
+        self._buckets = self._bucket(self._keys)
+        self._payloads = [entries[key] for key in keys]
+
+        self._offsets, self._blob, self._loads, self._mmap = None, None, None, None
+
+    @classmethod
+    def load(cls, path, loads=json.loads):
+        """Load an index saved to a file by memory-mapping it, deserializing payloads with loads as they are read."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, flags, count, alphabet_length = _HEADER.unpack_from(mapped, 0)
+
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not an ipminify index file, or an unsupported version: {}".format(path))
+
+            offset = _HEADER.size
+            letters = mapped[offset:offset + alphabet_length].decode('utf-8')
+            offset += alphabet_length + _pad(_HEADER.size + alphabet_length)
+
+            index = object.__new__(cls)
+            index.codec = IPv4._resolve_alphabet(letters)
+            index.fixed_width = bool(flags & _FIXED_WIDTH)
+
+            index._buckets = _view(mapped, offset, _U32_TYPECODE, _BUCKET_COUNT + 1)
+            offset += 4 * (_BUCKET_COUNT + 1)
+
+            index._keys = _view(mapped, offset, _U32_TYPECODE, count)
+            offset += 4 * count
+            offset += _pad(offset)
+
+            index._offsets = _view(mapped, offset, 'Q', count + 1)
+            offset += 8 * (count + 1)
+
+            index._blob = memoryview(mapped)[offset:]
+            index._payloads, index._loads, index._mmap = None, loads, mapped
+        except Exception:
+            mapped.close()
+            raise
+
+        return index
+
+    def __contains__(self, name):
+        """Test whether a minified name is in this index."""
+        return self._find_name(name) >= 0
+
+    def __enter__(self):
+        """Use this index as a context manager which closes it on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close this index."""
+        self.close()
+
+    def __getitem__(self, name):
+        """Return the payload for a minified name, raising a KeyError if it is not in this index."""
+        position = self._find_name(name)
+
+        if position < 0:
+            raise KeyError(name)
+
+        return self._payload(position)
+
+    def __iter__(self):
+        """Iterate over the minified names in this index in address order."""
+        encode = self._encoder()
+
+        for value in self._keys:
+            yield encode(value)
+
+    def __len__(self):
+        """Return the number of addresses in this index."""
+        return len(self._keys)
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this index."""
+        return "MinifiedIndex({} addresses, {!r})".format(len(self), self.codec.letters)
+
+    def address(self, name):
+        """Return the IPv4 address for a minified name in this index, raising a KeyError if it is not present."""
+        position = self._find_name(name)
+
+        if position < 0:
+            raise KeyError(name)
+
+        return IPv4._unchecked(self._keys[position])
+
+    def close(self):
+        """Release the memory-mapped file of a loaded index; closing an index built in memory does nothing."""
+        if self._mmap is None:
+            return
+
+        for view in (self._buckets, self._keys, self._offsets, self._blob):
+            if isinstance(view, memoryview):
+                view.release()
+
+        self._mmap.close()
+        self._mmap = None
+
+    def get(self, name, default=None):
+        """Return the payload for a minified name, or a default if it is not in this index."""
+        position = self._find_name(name)
+
+        return self._payload(position) if position >= 0 else default
+
+    def items(self):
+        """Iterate over (minified name, payload) pairs in address order."""
+        return self._slice(0, len(self._keys))
+
+    def lookup(self, address):
+        """Return the payload for an IPv4 address or integer, raising a KeyError if it is not in this index."""
+        position = self._find(_address_value(address))
+
+        if position < 0:
+            raise KeyError(address)
+
+        return self._payload(position)
+
+    def prefix(self, prefix):
+        """
+        Iterate over the (minified name, payload) pairs whose names begin with a prefix, in address order.
+
+        The names beginning with a prefix form one numeric range for each possible name length, so the query costs
+        two bisections per length plus the matches themselves.
+        """
+        for low, high in self._prefix_ranges(prefix):
+            for item in self._slice(bisect_left(self._keys, low), bisect_right(self._keys, high)):
+                yield item
+
+    def range(self, start, stop):
+        """
+        Iterate over the (minified name, payload) pairs of addresses from start up to, not including, stop. As stop is
+        exclusive, it may be 2**32 to include 255.255.255.255.
+        """
+        start = _address_value(start)
+        stop = stop if isinstance(stop, integer_types) and stop == 0x100000000 else _address_value(stop)
+
+        return self._slice(bisect_left(self._keys, start), bisect_left(self._keys, stop))
+
+    def save(self, path, dumps=json.dumps):
+        """Save this index to a file which can be memory-mapped with load, serializing payloads with dumps."""
+        count = len(self._keys)
+        letters = self.codec.letters.encode('utf-8')
+
+        payloads = [_encode_payload(dumps, self._payload(position)) for position in range(count)]
+        offsets = array('Q', [0] * (count + 1))
+
+        for position, payload in enumerate(payloads):
+            offsets[position + 1] = offsets[position] + len(payload)
+
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, _FIXED_WIDTH if self.fixed_width else 0, count, len(letters)))
+            f.write(letters + b'\0' * _pad(_HEADER.size + len(letters)))
+            f.write(_little_endian(array(_U32_TYPECODE, self._buckets)))
+            f.write(_little_endian(array(_U32_TYPECODE, self._keys)))
+
+            # align the payload offsets within the file, which the bucket table alone leaves four bytes out
+            f.write(b'\0' * _pad(f.tell()))
+            f.write(_little_endian(offsets))
+
+            for payload in payloads:
+                f.write(payload)
+
+    @staticmethod
+    def _bucket(keys):
+        """Build the table of offsets into sorted keys at which each bucket begins, with a final end offset."""
+        counts = [0] * (_BUCKET_COUNT + 1)
+
+        for value in keys:
+            counts[(value >> _BUCKET_SHIFT) + 1] += 1
+
+        for bucket in range(1, _BUCKET_COUNT + 1):
+            counts[bucket] += counts[bucket - 1]
+
+        return array(_U32_TYPECODE, counts)
+
+    def _encoder(self):
+        """Return the function encoding addresses into this index's names."""
+        return self.codec._encode_fixed if self.fixed_width else self.codec._encode
+
+    def _find(self, value):
+        """Return the position of an address in the sorted keys, or -1 if it is not present."""
+        bucket = value >> _BUCKET_SHIFT
+        high = self._buckets[bucket + 1]
+        position = bisect_left(self._keys, value, self._buckets[bucket], high)
+
+        return position if position < high and self._keys[position] == value else -1
+
+    def _find_name(self, name):
+        """Return the position of a minified name's address, or -1 if it is not present or not a valid name."""
+        try:
+            return self._find(self.codec.decode(name))
+        except (TypeError, ValueError):
+            return -1
+
+    def _payload(self, position):
+        """Return the payload at a position, deserializing it from the mapped file if necessary."""
+        if self._payloads is not None:
+            return self._payloads[position]
+
+        return self._loads(self._blob[self._offsets[position]:self._offsets[position + 1]].tobytes())
+
+    def _prefix_ranges(self, prefix):
+        """Return the numeric ranges of addresses whose names begin with a prefix, in ascending order."""
+        codec = self.codec
+        base, width = codec.base, codec.width
+
+        if len(prefix) > width:
+            return []
+
+        value = codec._decode(prefix) if len(prefix) > 0 else 0
+
+        # a prefix of valid letters beyond the largest address begins no names
+        if value > 0xFFFFFFFF:
+            return []
+
+        lengths = [width] if self.fixed_width else range(max(len(prefix), 1), width + 1)
+        ranges = []
+
+        for length in lengths:
+            scale = base ** (length - len(prefix))
+
+            # names of this length hold the addresses from base ** (length - 1) unless padded to a fixed width
+            smallest = 0 if self.fixed_width or length == 1 else base ** (length - 1)
+
+            low = max(value * scale, smallest)
+            high = min((value + 1) * scale, base ** length, 0x100000000) - 1
+
+            if low <= high:
+                ranges.append((low, high))
+
+        return ranges
+
+    def _slice(self, start, stop):
+        """Iterate over the (minified name, payload) pairs at a range of positions."""
+        encode, keys = self._encoder(), self._keys
+
+        for position in range(start, stop):
+            yield encode(keys[position]), self._payload(position)
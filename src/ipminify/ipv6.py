@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4
+from ipminify._compat import integer_types, string_types
+from ipminify.alphabet import _fixed_encoder
+from ipminify.dotted import _OCTETS, _format as _format_dotted
+
+import struct
+
+
+# the largest 128-bit value
+_U128_MAX = (1 << 128) - 1
+
+# the mask of the low 64 bits of a 128-bit value
+_U64_MASK = (1 << 64) - 1
+
+# divisors are kept below 2 ** 30, a single CPython digit, so that each division takes the single-digit fast path
+_WORD_LIMIT = 1 << 30
+
+# a 128-bit value packed as two big-endian 64-bit halves
+_HALVES = struct.Struct('>QQ')
+
+_HEXDIGITS = frozenset('0123456789abcdefABCDEF')
+
+
+class _WideCodec(object):
+    """
+    A 128-bit codec for a compiled Alphabet.
+
+    Rather than dividing a 128-bit integer by the base once per letter, values are divided by the largest power of the
+    base below 2 ** 30, a word of letters at a time, and each word is encoded through the alphabet's chunk tables. The
+    compiled accelerator, when bound to the alphabet, encodes from the value's two 64-bit halves without creating
+    intermediate integers at all.
+    """
+
+    def __init__(self, codec):
+        """Compile a 128-bit codec for an Alphabet."""
+        self.codec = codec
+        self.letters = codec.letters
+
+        self._word_digits = 1
+
+        while codec.base ** (self._word_digits + 1) < _WORD_LIMIT:
+            self._word_digits += 1
+
+        self._word = codec.base ** self._word_digits
+
+        chunk_count = -(-self._word_digits // codec._chunk_digits)
+
+        self._encode_word = _fixed_encoder(codec._chunks, codec._chunk, chunk_count,
+            chunk_count * codec._chunk_digits - self._word_digits)
+
+        self.width = len(self._encode(_U128_MAX))
+
+        if codec._speedups is not None:
+            letters, width, encode = self.letters, self.width, codec._speedups.encode_wide
+
+            self._encode = lambda value: encode(value >> 64, value & _U64_MASK, letters, 0)
+            self._encode_fixed = lambda value: encode(value >> 64, value & _U64_MASK, letters, width)
+
+    def decode(self, value):
+        """Decode a minified string into an integer, raising a ValueError if it is not a valid u128 in this alphabet."""
+        if not isinstance(value, string_types):
+            raise TypeError("Value must be a string.")
+
+        if len(value) == 0:
+            raise ValueError("Value must contain at least one character.")
+
+        result = self.codec._decode(value)
+
+        if result > _U128_MAX:
+            raise ValueError("Unable to expand minified value, value is out of u128 bounds: {}".format(hex(result)))
+
+        return result
+
+    def decode_many(self, values):
+        """Decode a sequence of minified strings into a list of integers."""
+        decode = self.decode
+
+        return [decode(value) for value in values]
+
+    def encode_many(self, values, fixed_width=False):
+        """
+        Encode a sequence of unsigned, 128-bit integers into a list of minified strings, optionally left-padded to a
+        fixed width.
+
+        Accepts any iterable of integers or a bytes-like buffer of packed, big-endian (network byte order) addresses.
+        """
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            if len(values) % 16 != 0:
+                raise ValueError("Packed address buffer length is not a multiple of sixteen bytes: {}".format(
+                    len(values)))
+
+            if self.codec._speedups is not None:
+                return self.codec._speedups.encode_wide_many(values, self.letters, self.width if fixed_width else 0)
+
+            unpack = _HALVES.unpack_from
+            values = [(high << 64) | low for high, low in
+                (unpack(values, offset) for offset in range(0, len(values), 16))]
+        else:
+            values = [_check(value) for value in values]
+
+        encode = self._encode_fixed if fixed_width else self._encode
+
+        return [encode(value) for value in values]
+
+    def _encode(self, value):
+        """Encode a non-negative integer without validating its type or bounds."""
+        word = self._word
+
+        if value < word:
+            return self.codec._encode(value)
+
+        encode_word = self._encode_word
+        words = []
+
+        while value >= word:
+            value, rem = divmod(value, word)
+            words.append(encode_word(rem))
+
+        words.append(self.codec._encode(value))
+        words.reverse()
+
+        return ''.join(words)
+
+    def _encode_fixed(self, value):
+        """Encode a non-negative integer left-padded to this codec's width, without validating its type or bounds."""
+        return self._encode(value).rjust(self.width, self.letters[0])
+
+
+def _check(value):
+    """Validate an unsigned, 128-bit integer, returning it."""
+    if not isinstance(value, integer_types):
+        raise TypeError("Value must be an integer.")
+
+    if value < 0 or value > _U128_MAX:
+        raise ValueError("IPv6 address not in range (0-0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF): {}".format(hex(value)))
+
+    return value
+
+
+def _resolve_alphabet(alphabet):
+    """Resolve an optional alphabet, letters, or compiled Alphabet into its 128-bit codec, compiling it on first use."""
+    codec = IPv4._resolve_alphabet(alphabet)
+    wide = codec._wide
+
+    if wide is None:
+        wide = codec._wide = _WideCodec(codec)
+
+    return wide
+
+
+def _parse_embedded(group, value):
+    """
+    Parse an embedded dotted quad into its two hextets. Unlike IPv4 address strings, only canonical octets are accepted:
+    ASCII digits without whitespace, sign, or leading zeros.
+    """
+    octets = group.split('.')
+
+    if len(octets) != 4 or not all(octet in _OCTETS for octet in octets):
+        raise ValueError("Invalid embedded IPv4 address {} in IPv6 address string: {}".format(group, value))
+
+    return [(_OCTETS[octets[0]] << 8) | _OCTETS[octets[1]], (_OCTETS[octets[2]] << 8) | _OCTETS[octets[3]]]
+
+
+def _parse_hextets(groups, value, embedded=True):
+    """
+    Parse a list of hexadecimal groups into hextet integers. If embedded is set, the last group may be a dotted quad,
+    which counts as two hextets.
+    """
+    result = []
+
+    for index, group in enumerate(groups):
+        if embedded and index == len(groups) - 1 and '.' in group:
+            result.extend(_parse_embedded(group, value))
+            continue
+
+        if not 1 <= len(group) <= 4 or not _HEXDIGITS.issuperset(group):
+            raise ValueError("Invalid hextet {} in IPv6 address string: {}".format(group, value))
+
+        result.append(int(group, 16))
+
+    return result
+
+
+def _parse(value):
+    """Parse an IPv6 address string, with optional '::' compression and embedded dotted quad, into an integer."""
+    if not isinstance(value, string_types):
+        raise TypeError("Value {} is not a string.".format(value))
+
+    head, separator, tail = value.partition('::')
+
+    if separator:
+        if '::' in tail:
+            raise ValueError("Invalid IPv6 address string, '::' appears more than once: {}".format(value))
+
+        head = _parse_hextets(head.split(':'), value, False) if head else []
+        tail = _parse_hextets(tail.split(':'), value) if tail else []
+
+        if len(head) + len(tail) > 7:
+            raise ValueError("Invalid IPv6 address string, too many hextets: {}".format(value))
+
+        hextets = head + [0] * (8 - len(head) - len(tail)) + tail
+    else:
+        hextets = _parse_hextets(value.split(':'), value)
+
+        if len(hextets) != 8:
+            raise ValueError("Invalid IPv6 address string, expected 8 hextets: {}".format(value))
+
+    result = 0
+
+    for hextet in hextets:
+        result = (result << 16) | hextet
+
+    return result
+
+
+def _format(value):
+    """Format an unsigned, 128-bit integer in the canonical text representation of RFC 5952."""
+    if value >> 32 == 0xFFFF:
+        # IPv4-mapped addresses keep their dotted quad
+        return '::ffff:' + _format_dotted(value & 0xFFFFFFFF)
+
+    hextets = [(value >> shift) & 0xFFFF for shift in range(112, -16, -16)]
+
+    # the first of the longest runs of at least two zero hextets is compressed
+    best_start, best_length, start = -1, 1, -1
+
+    for index, hextet in enumerate(hextets + [1]):
+        if hextet == 0:
+            if start < 0:
+                start = index
+        elif start >= 0:
+            if index - start > best_length:
+                best_start, best_length = start, index - start
+
+            start = -1
+
+    groups = ['{:x}'.format(hextet) for hextet in hextets]
+
+    if best_start < 0:
+        return ':'.join(groups)
+
+    return ':'.join(groups[:best_start]) + '::' + ':'.join(groups[best_start + best_length:])
+
+
+class IPv6(object):
+    """An immutable IPv6 address utility class, mirroring IPv4."""
+
+    __slots__ = ('_value', '__weakref__')
+
+    @classmethod
+    def from_hextets(cls, *hextets):
+        """Construct an IPv6 address from eight 16-bit integers."""
+        if len(hextets) != 8:
+            raise ValueError("Expected 8 hextets, received {}".format(len(hextets)))
+
+        result = 0
+
+        for index, hextet in enumerate(hextets):
+            if not isinstance(hextet, int):
+                raise TypeError("Hextet {} is not an integer: {}".format(index, hextet))
+
+            if hextet < 0 or hextet > 0xFFFF:
+                raise ValueError("Hextet {} is out of bounds: {}".format(index, hextet))
+
+            result = (result << 16) | hextet
+
+        return IPv6._unchecked(result)
+
+    @classmethod
+    def from_minified(cls, value, alphabet=None):
+        """Convert a minified string representation into an IPv6 address, optionally with a user-supplied alphabet."""
+        if value is None:
+            raise ValueError("Unable to unmarshal minified value: value is None.")
+
+        return IPv6._unchecked(_resolve_alphabet(alphabet).decode(value))
+
+    @classmethod
+    def from_minified_many(cls, values, alphabet=None):
+        """Convert a sequence of minified strings into a list of integer addresses, optionally with a user-supplied alphabet."""
+        return _resolve_alphabet(alphabet).decode_many(values)
+
+    @classmethod
+    def from_str(cls, value):
+        """Construct an IPv6 address from a colon-delimited string, such as '2001:db8::1' or '::ffff:10.0.0.1'."""
+        return IPv6._unchecked(_parse(value))
+
+    @classmethod
+    def minify_many(cls, values, alphabet=None, fixed_width=False):
+        """
+        Convert a sequence of integer addresses into a list of minified strings, optionally with a user-supplied alphabet
+        and left-padded to the alphabet's fixed width.
+
+        Accepts any iterable of integers or a bytes-like buffer of packed, big-endian (network byte order) addresses.
+        No IPv6 instances are created.
+        """
+        return _resolve_alphabet(alphabet).encode_many(values, fixed_width)
+
+    @classmethod
+    def _unchecked(cls, value):
+        """Construct an IPv6 address from an integer already known to be an unsigned, 128-bit integer."""
+        address = object.__new__(IPv6)
+        object.__setattr__(address, '_value', value)
+
+        return address
+
+    def __init__(self, value):
+        """Construct an IPv6 address from an unsigned, 128-bit integer."""
+        object.__setattr__(self, '_value', _check(value))
+
+    def __delattr__(self, name):
+        """Prevent deleting attributes, as IPv6 addresses are immutable."""
+        raise AttributeError("IPv6 addresses are immutable.")
+
+    def __setattr__(self, name, value):
+        """Prevent setting attributes, as IPv6 addresses are immutable."""
+        raise AttributeError("IPv6 addresses are immutable.")
+
+    def __eq__(self, other):
+        """Test equality against another IPv6 address, an integer, or an IPv6 address string."""
+        if isinstance(other, IPv6):
+            return self._value == other._value
+        elif isinstance(other, integer_types):
+            return self._value == other
+        elif isinstance(other, string_types):
+            try:
+                return self._value == _parse(other)
+            except ValueError:
+                return False
+        else:
+            return False
+
+    def __hash__(self):
+        """Return a hash consistent with equality against integers."""
+        return hash(self._value)
+
+    def __ne__(self, other):
+        """Test inequality against another object."""
+        return not self == other
+
+    def __reduce__(self):
+        """Support pickling and copying, which cannot set attributes on immutable instances."""
+        return (IPv6, (self._value,))
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this IPv6 address."""
+        return "IPv6({})".format(self.to_str())
+
+    def __str__(self):
+        """Return a readable representation of this IPv6 address."""
+        return self.to_str()
+
+    def minify(self, alphabet=None, fixed_width=False):
+        """Minify this address with the default or a user-supplied alphabet, optionally left-padded to a fixed width."""
+        codec = _resolve_alphabet(alphabet)
+
+        if fixed_width:
+            return codec._encode_fixed(self._value)
+
+        return codec._encode(self._value)
+
+    def to_hextets(self):
+        """Convert to a tuple of eight 16-bit integers."""
+        return tuple((self._value >> shift) & 0xFFFF for shift in range(112, -16, -16))
+
+    def to_int(self):
+        """Convert to an unsigned, 128-bit integer."""
+        return self._value
+
+    def to_str(self):
+        """Convert to the canonical, compressed string representation of RFC 5952."""
+        return _format(self._value)
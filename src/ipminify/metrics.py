@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from functools import wraps
+from ipminify import IPv4
+
+import socket
+import threading
+import time
+
+
+# the IPv4 methods instrumented by default, and those among them whose results are batches
+OPERATIONS = ('from_minified', 'from_minified_many', 'from_str', 'minify', 'minify_many', 'to_str')
+BATCH_OPERATIONS = frozenset(['from_minified_many', 'minify_many'])
+
+# the upper bounds, in seconds, of the timing histogram buckets, followed by an unbounded bucket
+TIME_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+# the upper bounds of the batch size histogram buckets, followed by an unbounded bucket
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# error categories, chosen by the first fragment found in an error's message
+_CATEGORIES = (
+    ('not present in minifier alphabet', 'letter'),
+    ('at least one character', 'empty'),
+    ('value is None', 'empty'),
+    ('out of u32 bounds', 'range'),
+    ('not in range', 'range'),
+    ('out of bounds', 'range'),
+    ('Invalid IPv4 address string', 'format'),
+    ('Unable to convert octet', 'format'),
+    ('not a multiple of four bytes', 'format'),
+)
+
+# a monotonic clock with the finest available resolution
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+def category(error):
+    """Classify an error raised by a conversion as 'type', 'letter', 'empty', 'range', 'format', or 'value'."""
+    if isinstance(error, TypeError):
+        return 'type'
+
+    message = str(error)
+
+    for fragment, name in _CATEGORIES:
+        if fragment in message:
+            return name
+
+    return 'value'
+
+
+class _Operation(object):
+    """The running statistics of a single operation."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.errors = {}
+        self.times = [0] * (len(TIME_BUCKETS) + 1)
+        self.items = 0
+        self.max_batch_size = 0
+        self.sizes = [0] * (len(SIZE_BUCKETS) + 1)
+
+
+class Metrics(object):
+    """
+    Thread-safe counters, error counts by category, timing histograms, and batch sizes for each operation, with an
+    optional sink called with every event as it is recorded.
+    """
+
+    def __init__(self, sink=None):
+        """Create empty metrics, forwarding each event to sink(operation, seconds, size, error) if one is given."""
+        self.sink = sink
+
+        # the number of events the sink raised an exception for, which are dropped rather than failing the conversion
+        self.sink_errors = 0
+
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def record(self, operation, seconds, size=None, error=None):
+        """Record a call of an operation taking seconds, with the size of its batch and its error category, if any."""
+        with self._lock:
+            stats = self._operations.get(operation)
+
+            if stats is None:
+                stats = self._operations[operation] = _Operation()
+
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.times[bisect_left(TIME_BUCKETS, seconds)] += 1
+
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+            if size is not None:
+                stats.items += size
+                stats.max_batch_size = max(stats.max_batch_size, size)
+                stats.sizes[bisect_left(SIZE_BUCKETS, size)] += 1
+
+        if self.sink is not None:
+            try:
+                self.sink(operation, seconds, size, error)
+            except Exception:
+                with self._lock:
+                    self.sink_errors += 1
+
+    def reset(self):
+        """Discard everything recorded."""
+        with self._lock:
+            self._operations = {}
+            self.sink_errors = 0
+
+    def snapshot(self):
+        """
+        Return a dictionary of the statistics of each operation called so far, keyed by operation name.
+
+        Histograms are lists of counts for each bucket of TIME_BUCKETS or SIZE_BUCKETS, followed by the count above the
+        last bound. Batch statistics are only present for batch operations.
+        """
+        result = {}
+
+        with self._lock:
+            for operation, stats in self._operations.items():
+                entry = result[operation] = {
+                    'calls': stats.calls,
+                    'errors': dict(stats.errors),
+                    'seconds': stats.seconds,
+                    'time_histogram': list(stats.times),
+                }
+
+                if operation in BATCH_OPERATIONS:
+                    entry.update({
+                        'items': stats.items,
+                        'max_batch_size': stats.max_batch_size,
+                        'batch_size_histogram': list(stats.sizes),
+                    })
+
+        return result
+
+
+class StatsdSink(object):
+    """
+    A sink emitting each event in the statsd line protocol: a counter per call and per error, a timer in milliseconds,
+    and a histogram of batch sizes.
+
+    Lines are sent as UDP datagrams to a statsd daemon, or passed to a send function instead, such as a list's append
+    to capture them locally. Lines which fail to send, such as while the network is unreachable, are dropped and
+    counted in errors.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='ipminify', send=None):
+        """Create a sink sending to a statsd daemon, or to a send function taking each line."""
+        self.prefix = prefix
+        self._socket = None
+
+        if send is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            address = (host, port)
+
+            send = lambda line: self._socket.sendto(line.encode('utf-8'), address)
+
+        self.send = send
+        self.errors = 0
+
+    def __enter__(self):
+        """Use this sink as a context manager which closes it on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close this sink."""
+        self.close()
+
+    def __call__(self, operation, seconds, size, error):
+        """Emit the lines for an event."""
+        name = '{}.{}'.format(self.prefix, operation)
+        lines = ['{}.calls:1|c'.format(name), '{}.time:{:.6f}|ms'.format(name, seconds * 1000)]
+
+        if error is not None:
+            lines.append('{}.errors.{}:1|c'.format(name, error))
+
+        if size is not None:
+            lines.append('{}.batch_size:{}|h'.format(name, size))
+
+        for line in lines:
+            try:
+                self.send(line)
+            except (IOError, OSError):
+                self.errors += 1
+
+    def close(self):
+        """Close the UDP socket, if this sink opened one. Lines emitted afterwards fail to send and are counted."""
+        if self._socket is not None:
+            self._socket.close()
+
+
+def _instrument(recorder, operation, function, batch):
+    """Wrap a function to record each call in a Metrics as an operation, with the size of its result for batches."""
+    @wraps(function)
+    def instrumented(*args, **kwargs):
+        start = _clock()
+
+        try:
+            result = function(*args, **kwargs)
+        except (TypeError, ValueError) as e:
+            recorder.record(operation, _clock() - start, None, category(e))
+            raise
+
+        recorder.record(operation, _clock() - start, len(result) if batch else None)
+
+        return result
+
+    return instrumented
+
+
+# the metrics being recorded, if enabled
+metrics = None
+
+# the instrumented methods installed on IPv4, by name, with the methods they replaced
+_installed = {}
+
+
+def enable(sink=None, operations=OPERATIONS):
+    """
+    Instrument the IPv4 methods named in operations, returning the Metrics recording them. Events are also forwarded
+    to sink(operation, seconds, size, error) if one is given, such as a StatsdSink.
+
+    Instrumentation replaces the methods themselves, so while it is disabled the methods run exactly as they would
+    without this module.
+    """
+    global metrics
+
+    disable()
+
+    metrics = Metrics(sink)
+
+    for operation in operations:
+        original = IPv4.__dict__[operation]
+
+        if isinstance(original, classmethod):
+            replacement = classmethod(_instrument(metrics, operation, original.__func__, operation in BATCH_OPERATIONS))
+        else:
+            replacement = _instrument(metrics, operation, original, operation in BATCH_OPERATIONS)
+
+        setattr(IPv4, operation, replacement)
+        _installed[operation] = (replacement, original)
+
+    return metrics
+
+
+def disable():
+    """Restore the uninstrumented IPv4 methods, leaving any later replacement of a method in place."""
+    global metrics
+
+    for operation, (replacement, original) in _installed.items():
+        if IPv4.__dict__.get(operation) is replacement:
+            setattr(IPv4, operation, original)
+
+    _installed.clear()
+    metrics = None
+
+
+def enabled():
+    """Determine whether instrumentation is enabled."""
+    return metrics is not None
+
+
+def snapshot():
+    """Return a snapshot of the metrics being recorded, or an empty dictionary if instrumentation is disabled."""
+    return metrics.snapshot() if metrics is not None else {}
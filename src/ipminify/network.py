@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4
+from ipminify._compat import integer_types, range, string_types
+
+
+class IPv4Network(object):
+    """
+    An IPv4 network, a contiguous block of addresses sharing a prefix.
+
+    Addresses and their minified forms are computed on demand, so iterating even a /8 never materializes the whole
+    network.
+    """
+
+    __slots__ = ('_network', '_prefixlen')
+
+    @classmethod
+    def from_str(cls, value):
+        """Construct a network from a string in CIDR notation, such as '10.0.0.0/16'."""
+        if not isinstance(value, string_types):
+            raise TypeError("Value {} is not a string.".format(value))
+
+        address, separator, prefixlen = value.partition('/')
+
+        if not separator:
+            raise ValueError("Invalid IPv4 network string, missing prefix length: {}".format(value))
+
+        try:
+            prefixlen = int(prefixlen)
+        except ValueError as e:
+            raise ValueError("Unable to convert prefix length to an integer: {} ({})".format(prefixlen, e))
+
+        return IPv4Network(IPv4.from_str(address), prefixlen)
+
+    def __init__(self, address, prefixlen):
+        """Construct a network from its network address, as an IPv4 instance or integer, and prefix length."""
+        if not isinstance(prefixlen, int):
+            raise TypeError("Prefix length must be an integer.")
+
+        if prefixlen < 0 or prefixlen > 32:
+            raise ValueError("Prefix length not in range (0-32): {}".format(prefixlen))
+
+        network = address.to_int() if isinstance(address, IPv4) else IPv4(address).to_int()
+
+        if network & (0xFFFFFFFF >> prefixlen):
+            raise ValueError("Address has host bits set for a /{} network: {}".format(prefixlen, IPv4(network)))
+
+        self._network = network
+        self._prefixlen = prefixlen
+
+    def __contains__(self, value):
+        """Test whether an IPv4 instance or integer lies within this network."""
+        if isinstance(value, IPv4):
+            value = value.to_int()
+        elif not isinstance(value, integer_types):
+            return False
+
+        return self._network <= value <= self._network + len(self) - 1
+
+    def __eq__(self, other):
+        """Test equality against another network."""
+        return isinstance(other, IPv4Network) and (self._network, self._prefixlen) == (other._network, other._prefixlen)
+
+    def __getitem__(self, index):
+        """Return the address at an index into this network, counting from the end for negative indices."""
+        size = len(self)
+
+        if index < 0:
+            index += size
+
+        if index < 0 or index >= size:
+            raise IndexError("Network index out of range: {}".format(index))
+
+        return IPv4._unchecked(self._network + index)
+
+    def __hash__(self):
+        """Return a hash of this network's address and prefix length."""
+        return hash((self._network, self._prefixlen))
+
+    def __iter__(self):
+        """Iterate over every address in this network in numeric order."""
+        unchecked = IPv4._unchecked
+
+        for value in range(self._network, self._network + len(self)):
+            yield unchecked(value)
+
+    def __len__(self):
+        """Return the number of addresses in this network."""
+        return 1 << (32 - self._prefixlen)
+
+    def __ne__(self, other):
+        """Test inequality against another network."""
+        return not self == other
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this network."""
+        return "IPv4Network({})".format(self.to_str())
+
+    def __str__(self):
+        """Return a readable representation of this network."""
+        return self.to_str()
+
+    @property
+    def broadcast_address(self):
+        """The last address in this network."""
+        return IPv4._unchecked(self._network + len(self) - 1)
+
+    def minified(self, alphabet=None, fixed_width=False, start=0, stop=None):
+        """
+        Yield the minified form of every address in this network, or of a range of indices into it, in numeric order.
+
+        Each name is derived from the previous one: the digits above the least significant are kept in an array and
+        carried forward, so only one address in every alphabet-length run is encoded from scratch.
+        """
+        codec = IPv4._resolve_alphabet(alphabet)
+        size = len(self)
+        stop = size if stop is None else min(stop, size)
+
+        if start < 0 or stop < 0:
+            raise IndexError("Network index range out of range: {}-{}".format(start, stop))
+
+        value, end = self._network + start, self._network + stop
+
+        if value >= end:
+            return
+
+        letters, base = codec.letters, codec.base
+        high, low = divmod(value, base)
+
+        # the most significant digit is first; fixed-width names keep leading zero digits
+        digits = []
+
+        while high > 0:
+            high, rem = divmod(high, base)
+            digits.insert(0, rem)
+
+        if fixed_width:
+            digits[:0] = [0] * (codec.width - 1 - len(digits))
+
+        while True:
+            prefix = ''.join([letters[digit] for digit in digits])
+            count = min(base - low, end - value)
+
+            for letter in letters[low:low + count]:
+                yield prefix + letter
+
+            value += count
+
+            if value >= end:
+                return
+
+            # carry into the digit array
+            low, position = 0, len(digits) - 1
+
+            while position >= 0 and digits[position] == base - 1:
+                digits[position] = 0
+                position -= 1
+
+            if position >= 0:
+                digits[position] += 1
+            else:
+                digits.insert(0, 1)
+
+    @property
+    def network_address(self):
+        """The first address in this network."""
+        return IPv4._unchecked(self._network)
+
+    @property
+    def prefixlen(self):
+        """The length of this network's prefix in bits."""
+        return self._prefixlen
+
+    def to_str(self):
+        """Convert to CIDR notation."""
+        return "{}/{}".format(IPv4(self._network).to_str(), self._prefixlen)
+
+
+def prefix_for(network, alphabet=None):
+    """
+    Return the fixed-width minified prefix shared by every address in a network, given as an IPv4Network or a string
+    in CIDR notation.
+
+    The prefix may be empty, and may also be shared by addresses outside the network, since networks need not align
+    with the alphabet's digits.
+    """
+    if not isinstance(network, IPv4Network):
+        network = IPv4Network.from_str(network)
+
+    codec = IPv4._resolve_alphabet(alphabet)
+
+    first = network.network_address.minify(codec, fixed_width=True)
+    last = network.broadcast_address.minify(codec, fixed_width=True)
+
+    length = 0
+
+    while length < len(first) and first[length] == last[length]:
+        length += 1
+
+    return first[:length]
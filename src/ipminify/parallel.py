@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from ipminify import IPv4
+from ipminify.alphabet import _U32_TYPECODE, _to_u32_array, get_alphabet
+
+import os
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    # before Python 3.8, chunks are pickled to the workers instead
+    SharedMemory = None
+
+
+# the number of addresses or names handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 65536
+
+# inputs smaller than this are converted in the calling process, as starting a pool would cost more than it saves
+DEFAULT_THRESHOLD = 262144
+
+
+def _separator(codec):
+    """Return a character which is not a letter of an alphabet, to join names into a single string."""
+    code = 10
+
+    while chr(code) in codec.map:
+        code += 1
+
+    return chr(code)
+
+
+def _workers(workers):
+    """Resolve an optional number of worker processes, defaulting to the number of CPUs."""
+    if workers is None:
+        return os.cpu_count() or 1
+
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1: {}".format(workers))
+
+    return workers
+
+
+def _read(source):
+    """Return the data for a chunk, either as passed or copied out of a shared memory block by (name, start, stop)."""
+    if not isinstance(source, tuple):
+        return source
+
+    name, start, stop = source
+    memory = SharedMemory(name=name)
+
+    try:
+        with memory.buf[start:stop] as view:
+            return view.tobytes()
+    finally:
+        memory.close()
+
+
+def _encode_chunk(source, letters, fixed_width, separator):
+    """Encode a chunk of addresses in a worker, returning the names joined into a single string."""
+    data = _read(source)
+
+    if isinstance(data, bytes):
+        values = array(_U32_TYPECODE)
+        values.frombytes(data)
+    else:
+        values = data
+
+    return separator.join(get_alphabet(letters).encode_many(values, fixed_width))
+
+
+def _decode_chunk(source, count, letters, separator):
+    """
+    Decode a chunk of joined names in a worker, returning an array of addresses, or None if the chunk did not split
+    into the expected number of names because a name contained the separator.
+    """
+    data = _read(source)
+    names = (data.decode('utf-8') if isinstance(data, bytes) else data).split(separator)
+
+    if len(names) != count:
+        return None
+
+    return array(_U32_TYPECODE, get_alphabet(letters).decode_many(names))
+
+
+class _Pool(object):
+    """Submits chunks to a caller's executor or to one created for a single call, staging them in shared memory."""
+
+    def __init__(self, executor, workers):
+        """Use an executor, or create one with a number of worker processes if it is None."""
+        self.executor = executor if executor is not None else ProcessPoolExecutor(workers)
+        self.owned = executor is None
+        self.futures = []
+        self.memory = None
+
+    def __enter__(self):
+        """Use this pool as a context manager which releases its resources on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Cancel or wait for outstanding chunks, then release the shared memory and any executor created."""
+        for future in self.futures:
+            future.cancel()
+
+        wait(self.futures)
+
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+
+        if self.owned:
+            self.executor.shutdown()
+
+    def stage(self, data):
+        """Copy data into a shared memory block, returning a function building a chunk's source from its byte range."""
+        self.memory = SharedMemory(create=True, size=max(len(data), 1))
+        self.memory.buf[:len(data)] = data
+
+        name = self.memory.name
+
+        return lambda start, stop: (name, start, stop)
+
+    def submit(self, function, *args):
+        """Submit a chunk, returning its future."""
+        future = self.executor.submit(function, *args)
+        self.futures.append(future)
+
+        return future
+
+
+def minify_many(values, alphabet=None, fixed_width=False, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+        threshold=DEFAULT_THRESHOLD, executor=None):
+    """
+    Convert a sequence of integer addresses into a list of minified strings across worker processes, in input order,
+    accepting anything IPv4.minify_many does.
+
+    Addresses are copied once into shared memory, from which each worker reads its chunks, and each chunk of names
+    comes back as a single string. Inputs smaller than threshold, or with a single worker, are converted in this
+    process. An existing ProcessPoolExecutor can be given to avoid starting a pool on every call.
+    """
+    codec = IPv4._resolve_alphabet(alphabet)
+    values = _to_u32_array(values)
+    workers = _workers(workers)
+
+    if len(values) == 0 or len(values) < threshold or (workers == 1 and executor is None):
+        return codec.encode_many(values, fixed_width)
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1: {}".format(chunk_size))
+
+    separator = _separator(codec)
+
+    with _Pool(executor, workers) as pool:
+        if SharedMemory is None:
+            source = lambda start, stop: values[start:stop]
+        else:
+            stage = pool.stage(memoryview(values).cast('B'))
+            source = lambda start, stop: stage(4 * start, 4 * stop)
+
+        futures = [pool.submit(_encode_chunk, source(start, min(start + chunk_size, len(values))), codec.letters,
+            fixed_width, separator) for start in range(0, len(values), chunk_size)]
+
+        # joining the chunks and splitting once creates the names without growing a list chunk by chunk
+        return separator.join([future.result() for future in futures]).split(separator)
+
+
+def from_minified_many(values, alphabet=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+        threshold=DEFAULT_THRESHOLD, executor=None):
+    """
+    Convert a sequence of minified strings into a list of integer addresses across worker processes, in input order.
+
+    Names are joined and copied once into shared memory, from which each worker reads its chunks, and each chunk of
+    addresses comes back as a packed array. Inputs smaller than threshold, or with a single worker, are converted in
+    this process. An existing ProcessPoolExecutor can be given to avoid starting a pool on every call.
+    """
+    codec = IPv4._resolve_alphabet(alphabet)
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    workers = _workers(workers)
+
+    if len(values) == 0 or len(values) < threshold or (workers == 1 and executor is None):
+        return codec.decode_many(values)
+
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1: {}".format(chunk_size))
+
+    separator = _separator(codec)
+    chunks = [values[start:start + chunk_size] for start in range(0, len(values), chunk_size)]
+
+    try:
+        joined = [separator.join(chunk) for chunk in chunks]
+    except TypeError:
+        # report the first value which is not a string as the sequential implementation would
+        codec.decode_many(values)
+        raise
+
+    with _Pool(executor, workers) as pool:
+        if SharedMemory is None:
+            sources = joined
+        else:
+            encoded = [text.encode('utf-8') for text in joined]
+            offsets = [0]
+
+            for data in encoded:
+                offsets.append(offsets[-1] + len(data))
+
+            stage = pool.stage(b''.join(encoded))
+            sources = [stage(offsets[index], offsets[index + 1]) for index in range(len(encoded))]
+
+        futures = [pool.submit(_decode_chunk, source, len(chunk), codec.letters, separator)
+            for source, chunk in zip(sources, chunks)]
+
+        result = array(_U32_TYPECODE)
+
+        for future, chunk in zip(futures, chunks):
+            decoded = future.result()
+
+            # a name containing the separator is invalid, and decoding the chunk here reports it
+            result.extend(decoded if decoded is not None else array(_U32_TYPECODE, codec.decode_many(chunk)))
+
+    return result.tolist()
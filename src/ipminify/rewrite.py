@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4
+from ipminify.dotted import format_many, parse
+
+
+class LineRewriter(object):
+    """
+    Rewrites lines of addresses between dotted-quad (or integer) and minified form.
+
+    Either the whole stripped line is converted or, if a field index is given, only that field of each delimited line.
+    Blank lines are passed through. Instances are picklable so that chunks of lines can be rewritten in worker processes.
+    """
+
+    def __init__(self, expand=False, alphabet=None, field=None, delimiter='\t', ignore_errors=False):
+        """Create a rewriter which minifies, or expands if requested, addresses in lines."""
+        if field is not None and field < 0:
+            raise ValueError("Field index must not be negative: {}".format(field))
+
+        self.expand = expand
+        self.alphabet = alphabet
+        self.field = field
+        self.delimiter = delimiter
+        self.ignore_errors = ignore_errors
+
+    def rewrite(self, lines):
+        """Rewrite a chunk of lines, returning a list of rewritten lines terminated with newlines."""
+        if self.field is None:
+            tokens = [line.strip() for line in lines]
+            converted = self.convert(tokens)
+
+            return [(value if value is not None else token) + '\n' for token, value in zip(tokens, converted)]
+
+        rows = [line.rstrip('\r\n').split(self.delimiter) for line in lines]
+        field = self.field
+
+        tokens = [row[field] if len(row) > field else '' for row in rows]
+        converted = self.convert(tokens)
+
+        delimiter = self.delimiter
+        result = []
+
+        for row, value in zip(rows, converted):
+            if value is not None:
+                row[field] = value
+
+            result.append(delimiter.join(row) + '\n')
+
+        return result
+
+    def convert(self, tokens):
+        """
+        Convert a list of address tokens, returning a list of the same length.
+
+        Blank tokens, and invalid tokens if errors are ignored, are returned as None; otherwise invalid tokens raise
+        a ValueError or TypeError.
+        """
+        if self.expand:
+            return self._expand(tokens)
+
+        return self._minify(tokens)
+
+    def values(self, lines):
+        """
+        Parse a chunk of lines into a list of integer addresses, read as minified addresses if expanding and as
+        dotted-quad or integer addresses otherwise. Blank lines, and invalid addresses if errors are ignored, are
+        skipped.
+        """
+        if self.field is None:
+            tokens = [line.strip() for line in lines]
+        else:
+            field, delimiter = self.field, self.delimiter
+            rows = [line.rstrip('\r\n').split(delimiter) for line in lines]
+            tokens = [row[field] if len(row) > field else '' for row in rows]
+
+        values = self._decode(tokens) if self.expand else self._parse(tokens)
+
+        return [value for value in values if value is not None]
+
+    def _decode(self, tokens):
+        """Decode minified tokens into integers, with None for blank and ignored tokens."""
+        codec = IPv4._resolve_alphabet(self.alphabet)
+        result = []
+
+        for token in tokens:
+            if not token:
+                result.append(None)
+                continue
+
+            try:
+                result.append(codec.decode(token))
+            except ValueError:
+                if not self.ignore_errors:
+                    raise
+
+                result.append(None)
+
+        return result
+
+    def _expand(self, tokens):
+        """Expand minified tokens into dotted-quad strings, formatting all valid addresses in bulk."""
+        values = self._decode(tokens)
+
+        formatted = iter(format_many([value for value in values if value is not None]))
+
+        return [next(formatted) if value is not None else None for value in values]
+
+    def _minify(self, tokens):
+        """Minify dotted-quad or integer tokens, encoding all valid addresses in bulk."""
+        codec = IPv4._resolve_alphabet(self.alphabet)
+        values = self._parse(tokens)
+
+        encoded = iter(codec.encode_many([value for value in values if value is not None]))
+
+        return [next(encoded) if value is not None else None for value in values]
+
+    def _parse(self, tokens):
+        """Parse dotted-quad or integer tokens into integers, with None for blank and ignored tokens."""
+        values = []
+
+        for token in tokens:
+            if not token:
+                values.append(None)
+                continue
+
+            try:
+                value = int(token) if token.isdigit() else parse(token)
+
+                if value > 0xFFFFFFFF:
+                    raise ValueError("IPv4 address not in range (0x00000000-0xFFFFFFFF): {}".format(token))
+            except ValueError:
+                if not self.ignore_errors:
+                    raise
+
+                value = None
+
+            values.append(value)
+
+        return values
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from array import array
+from ipminify import IPv4
+from ipminify._compat import array_to_bytes, integer_types
+from ipminify.alphabet import _to_u32_array
+from ipminify.arrays import IPv4Array
+from ipminify.dotted import parse_buffer, parse_many
+
+import mmap
+import os
+import struct
+import sys
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
+
+# the magic number and format version at the start of an address store
+MAGIC = b'IPM4'
+VERSION = 1
+
+# the header: magic, version, flags, alphabet length, and address count, followed by the alphabet in UTF-8 and padding
+# to a four-byte boundary, then the addresses as packed, big-endian (network byte order) unsigned, 32-bit integers
+_HEADER = struct.Struct('>4sBBHQ')
+
+# the offset of the address count in the header, rewritten when a writer is closed
+_COUNT_OFFSET = 8
+
+# a single packed address
+_ADDRESS = struct.Struct('>I')
+
+# the default number of addresses converted at a time when iterating over a store
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _data_offset(alphabet_length):
+    """Return the offset of the addresses in a store whose alphabet is a given number of bytes long."""
+    return _HEADER.size + alphabet_length + (-alphabet_length % 4)
+
+
+class AddressStoreWriter(object):
+    """
+    Streams addresses into an address store file.
+
+    Addresses are appended as they are written, so a store of any size can be produced with bounded memory; the count
+    in the header is filled in when the writer is closed.
+    """
+
+    def __init__(self, path, alphabet=None):
+        """Create a store at a path, recording the default or a user-supplied alphabet for its minified names."""
+        letters = IPv4._resolve_alphabet(alphabet).letters.encode('utf-8')
+
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, len(letters), 0))
+        self._file.write(letters + b'\0' * (-len(letters) % 4))
+
+    def __enter__(self):
+        """Use this writer as a context manager which closes it on exit, or discards the store on an exception."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this writer, or discard the partially written store if an exception was raised."""
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+    def discard(self):
+        """Close the file without recording the address count, so that it cannot be opened, and remove it."""
+        if self._file.closed:
+            return
+
+        self._file.close()
+
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        """Record the address count in the header and close the file."""
+        if self._file.closed:
+            return
+
+        self._file.seek(_COUNT_OFFSET)
+        self._file.write(struct.pack('>Q', self.count))
+        self._file.close()
+
+    def write(self, values):
+        """
+        Append addresses, accepting any iterable of IPv4 instances or integers, an array('I'), a NumPy integer array,
+        an IPv4Array, or a bytes-like buffer of packed, big-endian addresses. A memoryview of wider items, such as of
+        an array('I'), holds integers rather than packed bytes.
+        """
+        if isinstance(values, memoryview) and values.itemsize != 1:
+            # a view of integers, such as of an array('I'), rather than of packed bytes
+            values = values.tolist()
+
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            # already in the store's byte order
+            if len(values) % 4 != 0:
+                raise ValueError("Packed address buffer length is not a multiple of four bytes: {}".format(len(values)))
+
+            self._file.write(values)
+            self.count += len(values) // 4
+
+            return
+
+        if isinstance(values, IPv4Array):
+            values = values.values
+        elif not isinstance(values, array) and type(values).__module__ != 'numpy':
+            values = [value.to_int() if isinstance(value, IPv4) else value for value in values]
+
+        values = _to_u32_array(values)
+
+        if sys.byteorder == 'little':
+            # copy before swapping, as the array may be the caller's
+            values = array(values.typecode, values)
+            values.byteswap()
+
+        self._file.write(array_to_bytes(values))
+        self.count += len(values)
+
+    def write_lines(self, lines):
+        """
+        Append dotted-quad addresses, one per line, from a bytes-like buffer or an iterable of lines, skipping blank
+        lines.
+        """
+        if isinstance(lines, (bytes, bytearray, memoryview)):
+            self.write(parse_buffer(lines))
+        else:
+            self.write(parse_many([line for line in lines if line.strip()]))
+
+
+class AddressStore(Sequence):
+    """
+    A read-only sequence of IPv4 addresses in a memory-mapped address store.
+
+    The file is mapped rather than read, so opening a store of any size is immediate. IPv4 instances and minified
+    names are computed on demand from slices of the mapping, a chunk at a time, so memory use stays bounded however
+    large the store.
+    """
+
+    def __init__(self, path):
+        """Open the address store at a path."""
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._mmap) < _HEADER.size:
+                raise ValueError("Not an address store: {}".format(path))
+
+            magic, version, _, alphabet_length, count = _HEADER.unpack_from(self._mmap, 0)
+
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not an address store, or an unsupported version: {}".format(path))
+
+            offset = _data_offset(alphabet_length)
+
+            if len(self._mmap) != offset + 4 * count:
+                raise ValueError("Address store is truncated or was not closed: {}".format(path))
+
+            self.codec = IPv4._resolve_alphabet(self._mmap[_HEADER.size:_HEADER.size + alphabet_length].decode('utf-8'))
+            self._count = count
+            self._data = memoryview(self._mmap)[offset:]
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __contains__(self, value):
+        """Test membership of an IPv4 instance or integer, scanning the store a chunk at a time."""
+        if isinstance(value, IPv4):
+            value = value.to_int()
+        elif not isinstance(value, integer_types):
+            return False
+
+        return any(value in chunk for chunk in self._chunks(0, self._count))
+
+    def __enter__(self):
+        """Use this store as a context manager which closes it on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close this store."""
+        self.close()
+
+    def __getitem__(self, index):
+        """Return the IPv4 address at an index, or an IPv4Array for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+
+            if step == 1:
+                return IPv4Array(self._data[4 * start:4 * max(start, stop)])
+
+            return IPv4Array([self[position] for position in range(start, stop, step)])
+
+        if index < 0:
+            index += self._count
+
+        if index < 0 or index >= self._count:
+            raise IndexError("Address store index out of range: {}".format(index))
+
+        return IPv4._unchecked(_ADDRESS.unpack_from(self._data, 4 * index)[0])
+
+    def __iter__(self):
+        """Iterate over the addresses in this store."""
+        unchecked = IPv4._unchecked
+
+        for chunk in self._chunks(0, self._count):
+            for value in chunk:
+                yield unchecked(value)
+
+    def __len__(self):
+        """Return the number of addresses in this store."""
+        return self._count
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this store."""
+        return "AddressStore({} addresses, {!r})".format(self._count, self.codec.letters)
+
+    def close(self):
+        """Release the memory-mapped file."""
+        if self._mmap is None:
+            return
+
+        self._data.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def minified(self, alphabet=None, fixed_width=False, start=0, stop=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield the minified name of every address in this store, or of a range of indices into it, with the store's
+        alphabet unless another is given.
+
+        Addresses are encoded in bulk, chunk_size at a time, straight from the mapped file.
+        """
+        codec = self.codec if alphabet is None else IPv4._resolve_alphabet(alphabet)
+
+        for chunk in self._chunks(start, stop, chunk_size):
+            for name in codec.encode_many(chunk, fixed_width):
+                yield name
+
+    @property
+    def alphabet(self):
+        """The letters of the alphabet recorded in this store."""
+        return self.codec.letters
+
+    def _chunks(self, start, stop, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield arrays of the addresses at a range of indices, chunk_size at a time."""
+        stop = self._count if stop is None else min(stop, self._count)
+
+        if start < 0 or stop < 0:
+            raise IndexError("Address store index range out of range: {}-{}".format(start, stop))
+
+        for offset in range(start, stop, chunk_size):
+            yield _to_u32_array(self._data[4 * offset:4 * min(offset + chunk_size, stop)])
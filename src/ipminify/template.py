@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from ipminify import IPv4
+from ipminify._compat import string_types
+
+
+# the placeholder replaced with the minified address, as in a Name tag such as 'envoy-TEMPLATE.prod.mycompany.com'
+PLACEHOLDER = 'TEMPLATE'
+
+# the maximum length of a single DNS label
+MAX_LABEL_LENGTH = 63
+
+# the maximum length of a hostname, excluding any trailing period
+MAX_HOSTNAME_LENGTH = 253
+
+# the letters, digits, and hyphen permitted in hostname labels
+_LDH = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-')
+
+
+class HostnameTemplate(object):
+    """
+    A hostname template compiled once into the text before and after its placeholder.
+
+    Compiling validates that every hostname the template can produce is a valid DNS name for the chosen alphabet, so
+    rendering is a single concatenation per address and parsing strips the affixes and decodes what remains. The
+    alphabet, or the default alphabet at the time of compilation, is bound to the template.
+    """
+
+    def __init__(self, template, alphabet=None, fixed_width=False, placeholder=PLACEHOLDER):
+        """Compile a template containing the placeholder exactly once, optionally with a user-supplied alphabet."""
+        if not isinstance(template, string_types):
+            raise TypeError("Template must be a string, received {}".format(type(template)))
+
+        if template.count(placeholder) != 1:
+            raise ValueError("Template must contain the placeholder {} exactly once: {}".format(placeholder, template))
+
+        self.template = template
+        self.codec = IPv4._resolve_alphabet(alphabet)
+        self.fixed_width = fixed_width
+
+        self.prefix, self.suffix = template.split(placeholder)
+
+        self._validate()
+
+        self._encode = self.codec._encode_fixed if fixed_width else self.codec._encode
+        self._prefix_length, self._suffix_length = len(self.prefix), len(self.suffix)
+        self._lower_prefix, self._lower_suffix = self.prefix.lower(), self.suffix.lower()
+
+        # the other case of each letter mapped to the letter, which validation guarantees is unambiguous
+        self._case_map = { letter.swapcase(): letter for letter in self.codec.letters if letter.swapcase() != letter }
+
+    def __repr__(self):
+        """Return an unambiguous string representation of this template."""
+        return "HostnameTemplate({!r}, {!r})".format(self.template, self.codec.letters)
+
+    def parse(self, hostname):
+        """Parse a hostname rendered from this template back into an IPv4 address."""
+        label = self._strip(hostname)
+
+        try:
+            return IPv4._unchecked(self.codec.decode(label))
+        except ValueError:
+            # hostnames are case-insensitive, so retry with the label in the alphabet's case
+            return IPv4._unchecked(self.codec.decode(self._fold_case(label)))
+
+    def parse_many(self, hostnames):
+        """Parse a sequence of hostnames rendered from this template into a list of integer addresses."""
+        strip = self._strip
+        labels = [strip(hostname) for hostname in hostnames]
+
+        try:
+            return self.codec.decode_many(labels)
+        except ValueError:
+            fold_case = self._fold_case
+
+            return self.codec.decode_many([fold_case(label) for label in labels])
+
+    def render(self, address):
+        """Render the hostname for an IPv4 address or unsigned, 32-bit integer."""
+        if isinstance(address, IPv4):
+            value = address._value
+        else:
+            value = IPv4(address)._value
+
+        return self.prefix + self._encode(value) + self.suffix
+
+    def render_many(self, values):
+        """
+        Render the hostnames for a sequence of unsigned, 32-bit integers, accepting anything IPv4.minify_many does.
+        """
+        prefix, suffix = self.prefix, self.suffix
+
+        return [prefix + name + suffix for name in self.codec.encode_many(values, self.fixed_width)]
+
+    def _strip(self, hostname):
+        """Strip the template's affixes from a hostname, ignoring case and a trailing period, returning the rest."""
+        if not isinstance(hostname, string_types):
+            raise TypeError("Hostname must be a string.")
+
+        if hostname.endswith('.') and not self.suffix.endswith('.'):
+            hostname = hostname[:-1]
+
+        prefix_length, suffix_length = self._prefix_length, self._suffix_length
+
+        if len(hostname) <= prefix_length + suffix_length \
+                or hostname[:prefix_length].lower() != self._lower_prefix \
+                or hostname[len(hostname) - suffix_length:].lower() != self._lower_suffix:
+            raise ValueError("Hostname does not match template {}: {}".format(self.template, hostname))
+
+        return hostname[prefix_length:len(hostname) - suffix_length]
+
+    def _fold_case(self, label):
+        """Return a label with letters in the other case replaced by the alphabet's letters."""
+        case_map = self._case_map
+
+        return ''.join([case_map.get(letter, letter) for letter in label])
+
+    def _validate(self):
+        """Validate the hostnames this template can render, raising a ValueError describing the first problem."""
+        letters, width = self.codec.letters, self.codec.width
+
+        invalid = [letter for letter in letters if letter not in _LDH]
+
+        if invalid:
+            raise ValueError("Alphabet contains letters not valid in hostnames: {}".format(''.join(invalid)))
+
+        if len(set(letters.lower())) != len(letters):
+            raise ValueError("Alphabet letters are ambiguous in case-insensitive hostnames: {}".format(letters))
+
+        # the longest hostname, with a placeholder of letters which are valid anywhere in a label
+        hostname = self.prefix + 'a' * width + self.suffix
+
+        if hostname.endswith('.'):
+            hostname = hostname[:-1]
+
+        if len(hostname) > MAX_HOSTNAME_LENGTH:
+            raise ValueError("Hostnames may be {} characters long, exceeding the limit of {}: {}".format(
+                len(hostname), MAX_HOSTNAME_LENGTH, self.template))
+
+        for label in hostname.split('.'):
+            if len(label) == 0:
+                raise ValueError("Template contains an empty label: {}".format(self.template))
+
+            if len(label) > MAX_LABEL_LENGTH:
+                raise ValueError("Labels may be {} characters long, exceeding the limit of {}: {}".format(
+                    len(label), MAX_LABEL_LENGTH, self.template))
+
+            if not _LDH.issuperset(label):
+                raise ValueError("Template label contains characters not valid in hostnames: {}".format(label))
+
+            if label.startswith('-') or label.endswith('-'):
+                raise ValueError("Template label begins or ends with a hyphen: {}".format(label))
+
+        # a minified address at the edge of its label must not be able to begin or end with a hyphen
+        if '-' in letters and (self.prefix == '' or self.prefix.endswith('.') or self.suffix == ''
+                or self.suffix.startswith('.')):
+            raise ValueError("Alphabet contains a hyphen, which could begin or end a label: {}".format(letters))
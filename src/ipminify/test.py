@@ -1,10 +1,50 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from ipminify import IPv4
+from array import array
+from ipminify import Alphabet, HostnameTemplate, IPv4, IPv4Array, IPv4Network, IPv6, prefix_for, using_alphabet
+from ipminify.alphabet import SORTABLE_ALPHABET, get_alphabet
+from ipminify import accelerator, benchmark, cache, metrics
+from ipminify.cache import MinifyCache
+from ipminify.cli import main
+from ipminify.dotted import format, format_buffer, format_many, parse, parse_buffer, parse_many
+from ipminify.index import MinifiedIndex
+from ipminify.rewrite import LineRewriter
+from ipminify.store import AddressStore, AddressStoreWriter
 
+import copy
+import gc
+import io
+import os
+import pickle
+import random
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if sys.version_info >= (3, 7):
+    # these use async syntax, which older versions cannot compile, and asyncio.run()
+    from ipminify._async_cases import StreamRewriterTestCase, minify_in_tasks
+
+    import asyncio
+else:
+    minify_in_tasks = None
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+    from ipminify import differential, parallel
+except ImportError:
+    ProcessPoolExecutor = None
+
 
 class IPv4TestCase(unittest.TestCase):
 
@@ -108,9 +148,7 @@ class IPv4TestCase(unittest.TestCase):
             pass
 
         # test decoding a value larger than a u32
-        addr = IPv4(0xFFFFFFFF)
-        addr._value += 1 # cause an overflow
-        expanded = addr.minify()
+        expanded = IPv4.MINIFIER_CODEC._encode(0xFFFFFFFF + 1) # cause an overflow
 
         try:
             IPv4.from_minified(expanded)
@@ -196,6 +234,91 @@ class IPv4TestCase(unittest.TestCase):
         self.assertEqual(2, IPv4.MINIFIER_ALPHABET_LEN)
         self.assertEqual({ '0': 0, '1': 1 }, IPv4.MINIFIER_ALPHABET_MAP)
 
+    def test_using_alphabet(self):
+        """Tests that using_alphabet overrides the default alphabet within a block only."""
+        address = IPv4(0x7f000001)
+
+        with using_alphabet('01') as codec:
+            self.assertEqual('01', codec.letters)
+            self.assertEqual('01', IPv4.MINIFIER_ALPHABET)
+            self.assertEqual({ '0': 0, '1': 1 }, IPv4.MINIFIER_ALPHABET_MAP)
+            self.assertEqual('1111111000000000000000000000001', address.minify())
+            self.assertEqual(address, IPv4.from_minified('1111111000000000000000000000001'))
+
+            with using_alphabet(None):
+                self.assertEqual('cpqe4kv', address.minify())
+
+            self.assertEqual(['1'], IPv4.minify_many([1]))
+
+        self.assertEqual('cpqe4kv', address.minify())
+        self.assertEqual(self.default_alphabet, IPv4.MINIFIER_ALPHABET)
+
+        with self.assertRaises(ValueError):
+            with using_alphabet('a'):
+                pass
+
+    def test_using_alphabet_threads(self):
+        """Tests that overrides in concurrent threads are isolated and never observed half-applied."""
+        alphabets = ['01', '0123456789', IPv4.MINIFIER_ALPHABET, SORTABLE_ALPHABET]
+        values = list(range(0, 0xFFFFFFFF, 0x01000193))
+        errors = []
+
+        def worker(letters):
+            expected = Alphabet(letters).encode_many(values)
+
+            with using_alphabet(letters):
+                for _ in range(20):
+                    if IPv4.minify_many(values) != expected or IPv4.MINIFIER_ALPHABET != letters:
+                        errors.append(letters)
+
+        threads = [threading.Thread(target=worker, args=(letters,)) for letters in alphabets * 2]
+
+        for thread in threads:
+            thread.start()
+
+        # swap the process-wide default underneath the workers
+        for letters in alphabets * 10:
+            IPv4.set_default_alphabet(letters)
+
+            codec = IPv4.MINIFIER_CODEC
+            self.assertEqual(len(codec.map), codec.base)
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def test_using_alphabet_tasks(self):
+        """Tests that overrides in concurrent asyncio tasks are isolated."""
+        if minify_in_tasks is None:
+            self.skipTest("asyncio.run() and contextvars require Python 3.7.")
+
+        self.assertEqual(['1111111000000000000000000000001', '2130706433', 'cpqe4kv'],
+            asyncio.run(minify_in_tasks(0x7f000001, ['01', '0123456789', IPv4.MINIFIER_ALPHABET])))
+
+    def test_lazy_default_alphabet_race(self):
+        """Tests that compiling the initial default alphabet never overwrites an alphabet set concurrently."""
+        import ipminify
+
+        original = ipminify.get_alphabet
+
+        def compile_and_race(letters):
+            # another thread sets the default while the initial alphabet compiles
+            ipminify.get_alphabet = original
+            IPv4.set_default_alphabet('0123456789')
+
+            return original(letters)
+
+        IPv4.MINIFIER_CODEC = ipminify._LazyDefaultAlphabet(self.default_alphabet)
+        ipminify.get_alphabet = compile_and_race
+
+        try:
+            self.assertEqual('0123456789', IPv4.MINIFIER_CODEC.letters)
+        finally:
+            ipminify.get_alphabet = original
+
+        self.assertEqual('0123456789', IPv4.MINIFIER_ALPHABET)
+
     def test_set_default_alphabet_errors(self):
         """Tests that setting the default alphabet throws appropriate errors."""
         try:
@@ -257,6 +380,42 @@ class IPv4TestCase(unittest.TestCase):
         self.assertEqual('1.2.3.4', IPv4(0x01020304))
         self.assertNotEqual('1.2.3.4', IPv4(0x02030405))
         self.assertNotEqual('1000.1.-1.2', IPv4(0x00000000))
+        self.assertEqual('001.2.3.+4', IPv4(0x01020304))
+        self.assertNotEqual('', IPv4(0x00000000))
+
+    def test___hash__(self):
+        """Test that addresses are hashable consistently with equality."""
+        self.assertEqual(hash(IPv4(0x01020304)), hash(IPv4(0x01020304)))
+        self.assertEqual(hash(0x01020304), hash(IPv4(0x01020304)))
+        self.assertEqual(1, len(set([IPv4(0x01020304), IPv4(0x01020304)])))
+        self.assertEqual('a', { IPv4(0x01020304): 'a' }[IPv4.from_str('1.2.3.4')])
+
+    def test_immutable(self):
+        """Test that addresses are slotted and cannot be modified."""
+        address = IPv4(0x01020304)
+
+        self.assertFalse(hasattr(address, '__dict__'))
+        self.assertRaises(AttributeError, setattr, address, '_value', 0)
+        self.assertRaises(AttributeError, setattr, address, 'other', 0)
+        self.assertRaises(AttributeError, delattr, address, '_value')
+        self.assertEqual(0x01020304, address.to_int())
+
+        self.assertEqual(address, pickle.loads(pickle.dumps(address, pickle.HIGHEST_PROTOCOL)))
+        self.assertEqual(address, copy.deepcopy(address))
+
+    def test_intern(self):
+        """Test that interning shares one instance per live address."""
+        address = IPv4.intern(0x01020304)
+
+        self.assertTrue(address is IPv4.intern(0x01020304))
+        self.assertTrue(address is IPv4.intern(IPv4(0x01020304)))
+        self.assertFalse(address is IPv4.intern(0x01020305))
+        self.assertRaises(ValueError, IPv4.intern, -1)
+
+        del address
+        gc.collect()
+
+        self.assertFalse(0x01020304 in IPv4._INTERNED)
 
     def test___repr__(self):
         """Tests that the unambiguous string representation of the type is as expected."""
@@ -286,6 +445,27 @@ class IPv4TestCase(unittest.TestCase):
         self.assertEqual('111', IPv4(0x00000007).minify(ALPHA))
         self.assertEqual('1000', IPv4(0x00000008).minify(ALPHA))
 
+    def test_minify_fixed_width(self):
+        """Tests fixed-width minification."""
+        self.assertEqual('aaaaaaa', IPv4(0x00000000).minify(fixed_width=True))
+        self.assertEqual('aavkvju', IPv4(0x01020304).minify(fixed_width=True))
+        self.assertEqual('e5aw83d', IPv4(0xFFFFFFFF).minify(fixed_width=True))
+        self.assertEqual('0' * 28 + '1000', IPv4(8).minify('01', fixed_width=True))
+        self.assertEqual(['aaaaaaa', 'aavkvju'], IPv4.minify_many([0, 0x01020304], fixed_width=True))
+
+        # padded values expand as usual
+        self.assertEqual(IPv4(0x01020304), IPv4.from_minified('aavkvju'))
+
+    def test_minify_fixed_width_order(self):
+        """Tests that fixed-width minification with a sortable alphabet sorts in address order."""
+        generator = random.Random(0)
+        values = sorted([generator.randint(0, 0xFFFFFFFF) for _ in range(2000)] + [0, 1, 30, 31, 0xFFFFFFFF])
+        encoded = IPv4.minify_many(values, SORTABLE_ALPHABET, fixed_width=True)
+
+        self.assertEqual(encoded, sorted(encoded))
+        self.assertEqual(set([7]), set(len(value) for value in encoded))
+        self.assertEqual(values, IPv4.from_minified_many(encoded, SORTABLE_ALPHABET))
+
     def test_minify_errors(self):
         """Tests error cases of minification."""
         try:
@@ -306,6 +486,59 @@ class IPv4TestCase(unittest.TestCase):
         except ValueError:
             pass
 
+    def test_minify_many(self):
+        """Tests bulk minification of integer sequences."""
+        values = [0x00000000, 0x01020304, 0x7f000001, 0xFFFFFFFF]
+        expected = ['a', 'vkvju', 'cpqe4kv', 'e5aw83d']
+
+        self.assertEqual(expected, IPv4.minify_many(values))
+        self.assertEqual(expected, IPv4.minify_many(iter(values)))
+        self.assertEqual(expected, IPv4.minify_many(array('I', values)))
+        self.assertEqual(expected, IPv4.minify_many(b'\x00\x00\x00\x00\x01\x02\x03\x04\x7f\x00\x00\x01\xff\xff\xff\xff'))
+        self.assertEqual(['0', '1', '10', '1000'], IPv4.minify_many([0, 1, 2, 8], '01'))
+        self.assertEqual([], IPv4.minify_many([]))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed.")
+    def test_minify_many_ndarray(self):
+        """Tests vectorized bulk minification of NumPy arrays."""
+        values = [0x00000000, 0x00000001, 0x01020304, 0x7f000001, 0xFFFFFFFF]
+
+        for alphabet in (None, '01', '0123456789abcdef'):
+            expected = [IPv4(value).minify(alphabet) for value in values]
+
+            self.assertEqual(expected, IPv4.minify_many(numpy.array(values, dtype=numpy.uint32), alphabet))
+            self.assertEqual(expected, IPv4.minify_many(numpy.array(values, dtype=numpy.int64), alphabet))
+            self.assertEqual([IPv4(value).minify(alphabet, fixed_width=True) for value in values],
+                IPv4.minify_many(numpy.array(values, dtype=numpy.uint32), alphabet, fixed_width=True))
+
+        self.assertRaises(ValueError, IPv4.minify_many, numpy.array([-1], dtype=numpy.int64))
+        self.assertRaises(ValueError, IPv4.minify_many, numpy.array([0x100000000], dtype=numpy.int64))
+        self.assertRaises(TypeError, IPv4.minify_many, numpy.array([1.0]))
+
+    def test_minify_many_errors(self):
+        """Tests error cases of bulk minification."""
+        self.assertRaises(ValueError, IPv4.minify_many, [0, -1])
+        self.assertRaises(ValueError, IPv4.minify_many, [0xFFFFFFFF + 1])
+        self.assertRaises(TypeError, IPv4.minify_many, ['1.2.3.4'])
+        self.assertRaises(ValueError, IPv4.minify_many, b'\x00\x00\x00')
+        self.assertRaises(TypeError, IPv4.minify_many, [0], {})
+        self.assertRaises(ValueError, IPv4.minify_many, [0], 'a')
+
+    def test_from_minified_many(self):
+        """Tests bulk hydration of minified values."""
+        self.assertEqual([0x00000000, 0x01020304, 0x7f000001, 0xFFFFFFFF],
+            IPv4.from_minified_many(['a', 'vkvju', 'cpqe4kv', 'e5aw83d']))
+        self.assertEqual([0, 1, 2, 8], IPv4.from_minified_many(['0', '1', '10', '1000'], '01'))
+        self.assertEqual([], IPv4.from_minified_many([]))
+
+    def test_from_minified_many_errors(self):
+        """Tests error cases of bulk hydration."""
+        self.assertRaises(TypeError, IPv4.from_minified_many, [None])
+        self.assertRaises(ValueError, IPv4.from_minified_many, ['a', ''])
+        self.assertRaises(ValueError, IPv4.from_minified_many, ['z'], 'abc')
+        self.assertRaises(ValueError, IPv4.from_minified_many, ['e5aw83e'])
+        self.assertRaises(TypeError, IPv4.from_minified_many, ['a'], {})
+
     def test_to_int(self):
         """Tests that to_int returns the integer representation of the IP address."""
         self.assertEqual(0xFF0102FE, IPv4(0xFF0102FE).to_int())
@@ -337,3 +570,1533 @@ class IPv4TestCase(unittest.TestCase):
         """Tests that minification is a consistent operation."""
         self.assertEqual(IPv4(0x00000000), IPv4.from_minified(IPv4(0x00000000).minify()))
         self.assertEqual(IPv4(0xFFFFFFFF), IPv4.from_minified(IPv4(0xFFFFFFFF).minify()))
+
+
+class AlphabetTestCase(unittest.TestCase):
+
+    def test_encode_decode(self):
+        """Tests that compiled alphabets encode and decode as the IPv4 methods do."""
+        alphabet = Alphabet(IPv4.MINIFIER_ALPHABET)
+
+        self.assertEqual('a', alphabet.encode(0x00000000))
+        self.assertEqual('cpqe4kv', alphabet.encode(0x7f000001))
+        self.assertEqual('e5aw83d', alphabet.encode(0xFFFFFFFF))
+        self.assertEqual(0x7f000001, alphabet.decode('cpqe4kv'))
+        self.assertEqual(0x7f000001, alphabet.decode('aacpqe4kv'))
+        self.assertEqual(['a', 'vkvju'], alphabet.encode_many([0, 0x01020304]))
+        self.assertEqual([0, 0x01020304], alphabet.decode_many(['a', 'vkvju']))
+
+    def test_alphabet_sizes(self):
+        """Tests encoding round trips across alphabet sizes, including those without a translate table."""
+        values = [0, 1, 2, 30, 31, 961, 0x01020304, 0x7f000001, 0xFFFFFFFE, 0xFFFFFFFF]
+        alphabets = ['01', '0123456789', IPv4.MINIFIER_ALPHABET,
+            'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_', u'\u03b1\u03b2\u03b3\u0100']
+
+        for letters in alphabets:
+            alphabet = Alphabet(letters)
+
+            for value in values:
+                encoded = alphabet.encode(value)
+
+                self.assertEqual(IPv4(value).minify(letters), encoded)
+                self.assertEqual(value, alphabet.decode(encoded))
+
+            self.assertEqual(len(alphabet.encode(0xFFFFFFFF)), alphabet.width)
+
+            for value in values:
+                self.assertEqual(alphabet.encode(value).rjust(alphabet.width, letters[0]), alphabet.encode(value, True))
+
+            self.assertEqual([alphabet.encode(value, True) for value in values], alphabet.encode_many(values, True))
+
+        self.assertEqual(32, Alphabet('01').width)
+        self.assertEqual(7, Alphabet(IPv4.MINIFIER_ALPHABET).width)
+        self.assertFalse(Alphabet(IPv4.MINIFIER_ALPHABET).sortable)
+        self.assertTrue(Alphabet(SORTABLE_ALPHABET).sortable)
+
+    def test_errors(self):
+        """Tests that compiled alphabets raise appropriate errors."""
+        self.assertRaises(TypeError, Alphabet, None)
+        self.assertRaises(ValueError, Alphabet, 'a')
+        self.assertRaises(ValueError, Alphabet, 'aab')
+        self.assertRaises(ValueError, Alphabet, 'abca')
+        self.assertRaises(ValueError, IPv4.set_default_alphabet, 'aa')
+
+        alphabet = Alphabet('abc')
+
+        self.assertRaises(TypeError, alphabet.decode, None)
+        self.assertRaises(ValueError, alphabet.decode, '')
+        self.assertRaises(ValueError, alphabet.decode, 'abz')
+        self.assertRaises(ValueError, alphabet.decode, 'a b')
+        self.assertRaises(ValueError, alphabet.decode, 'c' * 64)
+        self.assertRaises(ValueError, alphabet.encode, -1)
+        self.assertRaises(ValueError, alphabet.encode, 0xFFFFFFFF + 1)
+        self.assertRaises(TypeError, alphabet.encode, '1')
+
+        # digits and whitespace accepted by int() must not leak through the translate table
+        self.assertRaises(ValueError, Alphabet('ab').decode, '1')
+        self.assertRaises(ValueError, Alphabet('ab').decode, u'a\u0661')
+
+    def test_get_alphabet(self):
+        """Tests that compiled alphabets are cached and accepted by IPv4."""
+        alphabet = get_alphabet('01')
+
+        self.assertTrue(alphabet is get_alphabet('01'))
+        self.assertTrue(alphabet is get_alphabet(alphabet))
+        self.assertEqual(Alphabet('01'), alphabet)
+        self.assertRaises(TypeError, get_alphabet, {})
+
+        self.assertEqual('1000', IPv4(8).minify(alphabet))
+        self.assertEqual(IPv4(8), IPv4.from_minified('1000', alphabet))
+        self.assertEqual(['1000'], IPv4.minify_many([8], alphabet))
+
+
+class LineRewriterTestCase(unittest.TestCase):
+
+    def test_rewrite(self):
+        """Tests that whole lines are minified and expanded."""
+        self.assertEqual(['cpqe4kv\n', '\n', 'vkvju\n', 'vkvju\n'],
+            LineRewriter().rewrite(['127.0.0.1\n', '\n', ' 1.2.3.4\r\n', '16909060']))
+        self.assertEqual(['127.0.0.1\n', '1.2.3.4\n'], LineRewriter(expand=True).rewrite(['cpqe4kv\n', 'vkvju\n']))
+        self.assertEqual(['1000\n'], LineRewriter(alphabet='01').rewrite(['0.0.0.8\n']))
+
+    def test_rewrite_field(self):
+        """Tests that a single delimited field is rewritten."""
+        rewriter = LineRewriter(field=1)
+
+        self.assertEqual(['GET\tcpqe4kv\t200\n', 'short\n'], rewriter.rewrite(['GET\t127.0.0.1\t200\n', 'short\n']))
+        self.assertEqual(['a,vkvju\n'], LineRewriter(field=1, delimiter=',').rewrite(['a,1.2.3.4\n']))
+
+    def test_rewrite_errors(self):
+        """Tests that invalid addresses raise or, if requested, pass through."""
+        self.assertRaises(ValueError, LineRewriter().rewrite, ['1.2.3.999\n'])
+        self.assertRaises(ValueError, LineRewriter().rewrite, ['4294967296\n'])
+        self.assertRaises(ValueError, LineRewriter(expand=True).rewrite, ['!\n'])
+        self.assertRaises(ValueError, LineRewriter, field=-1)
+
+        self.assertEqual(['nope\n', 'vkvju\n'], LineRewriter(ignore_errors=True).rewrite(['nope\n', '1.2.3.4\n']))
+        self.assertEqual(['!\n', '1.2.3.4\n'], LineRewriter(expand=True, ignore_errors=True).rewrite(['!\n', 'vkvju\n']))
+
+    def test_values(self):
+        """Tests that lines are parsed into integers, skipping blank and ignored lines."""
+        self.assertEqual([0x7f000001, 0x01020304], LineRewriter().values(['127.0.0.1\n', '\n', '16909060\n']))
+        self.assertEqual([0x7f000001], LineRewriter(expand=True).values(['cpqe4kv\n']))
+        self.assertEqual([0x01020304], LineRewriter(field=1, ignore_errors=True).values(['a\tnope\n', 'b\t1.2.3.4\n']))
+        self.assertRaises(ValueError, LineRewriter().values, ['nope\n'])
+
+
+class CLITestCase(unittest.TestCase):
+
+    def run_cli(self, argv, text=''):
+        """Run the command with the given arguments and standard input, returning its status and output."""
+        stdout = io.StringIO()
+
+        return main(argv, stdin=io.StringIO(text), stdout=stdout), stdout.getvalue()
+
+    def test_stdin(self):
+        """Tests minifying and expanding standard input."""
+        self.assertEqual((0, 'cpqe4kv\nvkvju\n'), self.run_cli([], u'127.0.0.1\n1.2.3.4\n'))
+        self.assertEqual((0, '127.0.0.1\n'), self.run_cli(['--expand'], u'cpqe4kv\n'))
+        self.assertEqual((0, 'x\tvkvju\n'), self.run_cli(['-f', '2'], u'x\t1.2.3.4\n'))
+
+    def test_files(self):
+        """Tests reading files in chunks across worker processes."""
+        values = [index * 0x01010101 for index in range(64)]
+        fd, path = tempfile.mkstemp()
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.writelines(IPv4(value).to_str() + '\n' for value in values)
+
+            expected = ''.join(encoded + '\n' for encoded in IPv4.minify_many(values))
+
+            self.assertEqual((0, expected), self.run_cli(['--chunk-size', '5', path]))
+            self.assertEqual((0, expected), self.run_cli(['--chunk-size', '5', '--jobs', '2', path]))
+        finally:
+            os.remove(path)
+
+    def test_store(self):
+        """Tests packing addresses into an address store in chunks across worker processes."""
+        values = [index * 0x01010101 for index in range(64)]
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'addresses.ipm4')
+
+        try:
+            text = ''.join(IPv4(value).to_str() + '\n' for value in values)
+
+            for argv in ([], ['--chunk-size', '5', '--jobs', '2'], ['--alphabet', SORTABLE_ALPHABET]):
+                self.assertEqual((0, ''), self.run_cli(['--store', path] + argv, text))
+
+                with AddressStore(path) as store:
+                    self.assertEqual(values, [address.to_int() for address in store])
+
+            with AddressStore(path) as store:
+                self.assertEqual(SORTABLE_ALPHABET, store.alphabet)
+
+            self.assertEqual((0, ''), self.run_cli(['--store', path, '--ignore-errors'], u'nope\n1.2.3.4\n'))
+
+            with AddressStore(path) as store:
+                self.assertEqual([IPv4(0x01020304)], list(store))
+
+            # an invalid line after complete chunks fails the whole store rather than leaving a partial one
+            status, _ = self.run_cli(['--store', path, '--chunk-size', '2'], u'1.2.3.4\n5.6.7.8\nbad\n9.9.9.9\n')
+
+            self.assertEqual(1, status)
+            self.assertFalse(os.path.exists(path))
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+            os.rmdir(directory)
+
+    def test_errors(self):
+        """Tests that invalid input fails with a non-zero status."""
+        self.assertEqual(1, self.run_cli([], u'nope\n')[0])
+        self.assertEqual((0, 'nope\n'), self.run_cli(['--ignore-errors'], u'nope\n'))
+
+
+class DottedTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        """Tests that canonical and non-canonical dotted-quad strings and bytes parse as IPv4.from_str always has."""
+        self.assertEqual(0x7f000001, parse('127.0.0.1'))
+        self.assertEqual(0x7f000001, parse(b'127.0.0.1'))
+        self.assertEqual(0x7f000001, parse(bytearray(b'127.0.0.1')))
+        self.assertEqual(0xFFFFFFFF, parse('255.255.255.255'))
+        self.assertEqual(0x01020304, parse('01.002.3.+4'))
+        self.assertEqual(0x01020304, parse(' 1.2.3.4\n'))
+
+    def test_parse_errors(self):
+        """Tests that parsing rejects exactly what IPv4.from_str rejects."""
+        self.assertRaises(TypeError, parse, None)
+        self.assertRaises(TypeError, parse, 0x01020304)
+
+        for value in ('', 'NOPE', '1.2.3', '1.2.3.4.5', 'A.B.C.D', '1000.1.2.3', '1.2.3.256', '1.-1.2.3', '1..2.3',
+                b'1.2.3.256', b'1.2.3.x'):
+            self.assertRaises(ValueError, parse, value)
+
+    def test_parse_many(self):
+        """Tests bulk parsing of string and bytes lines."""
+        self.assertEqual([0x7f000001, 0x01020304, 0xa0a0a0a],
+            parse_many([b'127.0.0.1\n', '1.2.3.4\r\n', bytearray(b'10.10.10.10')]))
+        self.assertEqual([0x01020304], parse_many([memoryview(b'1.2.3.4\n')]))
+        self.assertEqual([0x01020304], parse_many(['001.2.3.4']))
+        self.assertEqual([], parse_many([]))
+
+        self.assertRaises(ValueError, parse_many, [b'1.2.3.4', b'1.2.3.256'])
+        self.assertRaises(TypeError, parse_many, [None])
+
+    def test_format(self):
+        """Tests formatting single addresses and sequences of addresses as dotted-quad strings."""
+        self.assertEqual('0.0.0.0', format(0))
+        self.assertEqual('10.0.0.1', format(0x0a000001))
+        self.assertEqual('255.255.255.255', format(0xFFFFFFFF))
+        self.assertEqual(['1.2.3.4', '127.0.0.1'], format_many([0x01020304, 0x7f000001]))
+        self.assertEqual(['1.2.3.4'], format_many(array('I', [0x01020304])))
+        self.assertEqual([], format_many([]))
+
+    def test_format_errors(self):
+        """Tests that addresses out of range or not integers are rejected."""
+        for value in (-1, 0x100000000):
+            self.assertRaises(ValueError, format, value)
+            self.assertRaises(ValueError, format_many, [value])
+
+        self.assertRaises(TypeError, format, '1')
+        self.assertRaises(TypeError, format_many, ['1'])
+
+    def test_format_buffer(self):
+        """Tests formatting addresses as lines into bytes or an output buffer."""
+        values = [0x01020304, 0x7f000001, 0xFFFFFFFF]
+        data = b'1.2.3.4\n127.0.0.1\n255.255.255.255\n'
+
+        self.assertEqual(data, format_buffer(values))
+        self.assertEqual(data, format_buffer(array('I', values)))
+        self.assertEqual(b'', format_buffer([]))
+        self.assertEqual(values, list(parse_buffer(format_buffer(values))))
+
+        out = bytearray(64)
+
+        self.assertEqual(len(data), format_buffer(values, out))
+        self.assertEqual(data + b'\x00' * (64 - len(data)), bytes(out))
+        self.assertEqual(0, format_buffer([], bytearray()))
+
+        self.assertRaises(ValueError, format_buffer, values, bytearray(len(data) - 1))
+        self.assertRaises(TypeError, format_buffer, values, bytes(64))
+        self.assertRaises(ValueError, format_buffer, [0xFFFFFFFF + 1])
+
+
+class IPv4ArrayTestCase(unittest.TestCase):
+
+    def test_construction(self):
+        """Tests creating arrays from the supported sources."""
+        expected = [IPv4(0x01020304), IPv4(0x7f000001)]
+
+        self.assertEqual(expected, list(IPv4Array(expected)))
+        self.assertEqual(expected, list(IPv4Array([0x01020304, 0x7f000001])))
+        self.assertEqual(expected, list(IPv4Array(array('I', [0x01020304, 0x7f000001]))))
+        self.assertEqual(expected, list(IPv4Array(b'\x01\x02\x03\x04\x7f\x00\x00\x01')))
+        self.assertEqual(expected, list(IPv4Array.from_str(['1.2.3.4\n', b'127.0.0.1\n'])))
+        self.assertEqual(expected, list(IPv4Array.from_minified(['vkvju', 'cpqe4kv'])))
+
+        self.assertRaises(ValueError, IPv4Array, [-1])
+        self.assertRaises(TypeError, IPv4Array, ['1.2.3.4'])
+
+    def test_sequence(self):
+        """Tests sequence access and mutation."""
+        addresses = IPv4Array([0x01020304, 0x7f000001])
+
+        self.assertEqual(2, len(addresses))
+        self.assertEqual(IPv4(0x7f000001), addresses[-1])
+        self.assertEqual(IPv4Array([0x7f000001]), addresses[1:])
+        self.assertTrue(IPv4(0x01020304) in addresses)
+        self.assertTrue(0x7f000001 in addresses)
+        self.assertFalse('1.2.3.4' in addresses)
+
+        addresses.append(IPv4(0xFFFFFFFF))
+        addresses.extend([0, 1])
+        addresses[0] = 0x0a0a0a0a
+        addresses.insert(0, 2)
+        del addresses[-1]
+
+        self.assertEqual([2, 0x0a0a0a0a, 0x7f000001, 0xFFFFFFFF, 0], list(addresses.values))
+        self.assertRaises(ValueError, addresses.append, 0xFFFFFFFF + 1)
+
+    def test_conversion(self):
+        """Tests minifying and packing arrays."""
+        addresses = IPv4Array([0x01020304, 0x7f000001])
+
+        self.assertEqual(['vkvju', 'cpqe4kv'], addresses.minify())
+        self.assertEqual(b'\x01\x02\x03\x04\x7f\x00\x00\x01', addresses.to_bytes())
+        self.assertEqual("IPv4Array([1.2.3.4, 127.0.0.1])", repr(addresses))
+
+
+class IPv4NetworkTestCase(unittest.TestCase):
+
+    def test_construction(self):
+        """Tests creating networks and their properties."""
+        network = IPv4Network.from_str('10.0.0.0/16')
+
+        self.assertEqual(IPv4Network(IPv4(0x0a000000), 16), network)
+        self.assertEqual(IPv4Network(0x0a000000, 16), network)
+        self.assertEqual(65536, len(network))
+        self.assertEqual(16, network.prefixlen)
+        self.assertEqual(IPv4(0x0a000000), network.network_address)
+        self.assertEqual(IPv4(0x0a00FFFF), network.broadcast_address)
+        self.assertEqual("IPv4Network(10.0.0.0/16)", repr(network))
+        self.assertEqual(2 ** 32, len(IPv4Network(0, 0)))
+        self.assertEqual(1, len(IPv4Network(0xFFFFFFFF, 32)))
+
+    def test_construction_errors(self):
+        """Tests that invalid networks raise appropriate errors."""
+        self.assertRaises(ValueError, IPv4Network.from_str, '10.0.0.0')
+        self.assertRaises(ValueError, IPv4Network.from_str, '10.0.0.0/x')
+        self.assertRaises(ValueError, IPv4Network.from_str, '10.0.0.1/16')
+        self.assertRaises(ValueError, IPv4Network.from_str, '10.0.0.0/33')
+        self.assertRaises(TypeError, IPv4Network.from_str, None)
+        self.assertRaises(TypeError, IPv4Network, 0, '8')
+
+    def test_sequence(self):
+        """Tests random access, membership, and iteration."""
+        network = IPv4Network.from_str('192.168.0.0/30')
+
+        self.assertEqual(IPv4(0xc0a80001), network[1])
+        self.assertEqual(IPv4(0xc0a80003), network[-1])
+        self.assertRaises(IndexError, network.__getitem__, 4)
+        self.assertRaises(IndexError, network.__getitem__, -5)
+        self.assertTrue(IPv4(0xc0a80002) in network)
+        self.assertTrue(0xc0a80003 in network)
+        self.assertFalse(0xc0a80004 in network)
+        self.assertEqual([0xc0a80000, 0xc0a80001, 0xc0a80002, 0xc0a80003], [address.to_int() for address in network])
+
+    def test_minified(self):
+        """Tests that incrementally minified names match minifying each address."""
+        for cidr in ('0.0.0.0/22', '10.0.0.0/20', '255.255.240.0/20', '127.0.0.0/31'):
+            network = IPv4Network.from_str(cidr)
+
+            for alphabet in (None, '01', SORTABLE_ALPHABET):
+                for fixed_width in (False, True):
+                    expected = IPv4.minify_many([address.to_int() for address in network], alphabet, fixed_width)
+
+                    self.assertEqual(expected, list(network.minified(alphabet, fixed_width)))
+                    self.assertEqual(expected[5:7], list(network.minified(alphabet, fixed_width, 5, 7)))
+
+        network = IPv4Network.from_str('10.0.0.0/8')
+
+        self.assertEqual([IPv4(0x0affffff).minify()], list(network.minified(start=len(network) - 1)))
+        self.assertEqual([], list(network.minified(start=3, stop=3)))
+        self.assertRaises(IndexError, list, network.minified(start=-1))
+
+    def test_prefix_for(self):
+        """Tests the shared fixed-width prefix of a network."""
+        network = IPv4Network.from_str('10.0.0.0/16')
+        prefix = prefix_for(network, SORTABLE_ALPHABET)
+
+        self.assertEqual(prefix, prefix_for('10.0.0.0/16', SORTABLE_ALPHABET))
+        self.assertTrue(all(name.startswith(prefix) for name in network.minified(SORTABLE_ALPHABET, True)))
+        self.assertEqual(IPv4(0x01020304).minify(fixed_width=True), prefix_for('1.2.3.4/32'))
+        self.assertEqual('', prefix_for('0.0.0.0/0'))
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_run(self):
+        """Tests that every benchmark runs and reports a rate."""
+        results = benchmark.run(size=10, repeat=1)
+
+        self.assertEqual(10, results['meta']['size'])
+        self.assertEqual(set(name for name, _, _ in benchmark.cases(10)), set(results['results']))
+
+        for result in results['results'].values():
+            self.assertTrue(result['ops_per_sec'] > 0)
+
+        self.assertEqual(['minify_many/base64', 'minify_many/binary'], sorted(benchmark.run(10, 1, 'minify_many/b')['results']))
+
+    def test_compare(self):
+        """Tests that regressions beyond the threshold are reported."""
+        baseline = { 'results': { 'a': { 'ops_per_sec': 100.0 }, 'b': { 'ops_per_sec': 100.0 } } }
+        current = { 'results': { 'a': { 'ops_per_sec': 85.0 }, 'b': { 'ops_per_sec': 75.0 }, 'c': { 'ops_per_sec': 1.0 } } }
+
+        self.assertEqual([('b', 75.0, 100.0)], benchmark.compare(current, baseline, 0.2))
+        self.assertEqual([], benchmark.compare(current, baseline, 0.5))
+
+
+class IPv6TestCase(unittest.TestCase):
+
+    def test_from_str(self):
+        """Tests parsing full, compressed, and dotted-quad forms."""
+        self.assertEqual(0x20010db8000000000000000000000001, IPv6.from_str('2001:db8::1').to_int())
+        self.assertEqual(0x20010db8000000000000000000000001, IPv6.from_str('2001:0DB8:0:0:0:0:0:0001').to_int())
+        self.assertEqual(0, IPv6.from_str('::').to_int())
+        self.assertEqual(1, IPv6.from_str('::1').to_int())
+        self.assertEqual(0xfe800000000000000000000000000000, IPv6.from_str('fe80::').to_int())
+        self.assertEqual(0xffff0a000001, IPv6.from_str('::ffff:10.0.0.1').to_int())
+        self.assertEqual(0x00010002000300040005000600070008, IPv6.from_str('1:2:3:4:5:6:7:8').to_int())
+        self.assertEqual(0x00010002000300040005000600000008, IPv6.from_str('1:2:3:4:5:6::8').to_int())
+
+    def test_from_str_errors(self):
+        """Tests that invalid address strings are rejected."""
+        self.assertRaises(TypeError, IPv6.from_str, None)
+        self.assertRaises(TypeError, IPv6.from_str, 1)
+
+        for value in ('', ':', ':::', '1::2::3', '1:2:3:4:5:6:7', '1:2:3:4:5:6:7:8:9', '1:2:3:4:5:6:7::8', '12345::',
+                'g::', '::1%eth0', '+1::', '1.2.3.4::', '::1.2.3.256', ' ::1'):
+            self.assertRaises(ValueError, IPv6.from_str, value)
+
+        # embedded dotted quads must be canonical, even where int() would accept an octet
+        for value in ('::ffff: 1.2.3.4', '::ffff:1.2.3.4 ', '::ffff:01.2.3.4', '::ffff:+1.2.3.4', '::ffff:1.2.3.-0',
+                '::ffff:1.2.3.1_0', u'::ffff:1.2.3.\u0661', '::ffff:1.2.3', '::ffff:1.2.3.4.5'):
+            self.assertRaises(ValueError, IPv6.from_str, value)
+
+    def test_to_str(self):
+        """Tests canonical RFC 5952 formatting."""
+        self.assertEqual('2001:db8::1', IPv6(0x20010db8000000000000000000000001).to_str())
+        self.assertEqual('::', IPv6(0).to_str())
+        self.assertEqual('::1', IPv6(1).to_str())
+        self.assertEqual('2001:db8:0:1:1:1:1:1', IPv6.from_str('2001:db8:0:1:1:1:1:1').to_str())
+        self.assertEqual('2001:0:0:1::1', IPv6.from_str('2001:0:0:1:0:0:0:1').to_str())
+        self.assertEqual('2001:db8::1:0:0:1', IPv6.from_str('2001:db8:0:0:1:0:0:1').to_str())
+        self.assertEqual('::ffff:10.0.0.1', IPv6.from_str('::ffff:a00:1').to_str())
+        self.assertEqual('IPv6(::1)', repr(IPv6(1)))
+
+        try:
+            import ipaddress
+        except ImportError:
+            return
+
+        generator = random.Random(0)
+
+        for _ in range(1000):
+            hextets = [generator.choice([0, 0, generator.randint(0, 0xFFFF)]) for _ in range(8)]
+            value = IPv6.from_hextets(*hextets).to_int()
+
+            if value >> 32 != 0xFFFF:
+                self.assertEqual(str(ipaddress.IPv6Address(value)), IPv6(value).to_str())
+
+    def test_minify(self):
+        """Tests minification against plain base conversion, with default and user-supplied alphabets."""
+        generator = random.Random(0)
+        values = [0, 1, 30, 31, (1 << 128) - 1] + [generator.getrandbits(128) for _ in range(200)]
+
+        for letters in (IPv4.MINIFIER_ALPHABET, '01', '0123456789abcdef', SORTABLE_ALPHABET):
+            codec = Alphabet(letters)
+
+            for value in values:
+                expected, remaining = '', value
+
+                while True:
+                    remaining, rem = divmod(remaining, codec.base)
+                    expected = letters[rem] + expected
+
+                    if remaining == 0:
+                        break
+
+                address = IPv6(value)
+
+                self.assertEqual(expected, address.minify(letters))
+                self.assertEqual(address, IPv6.from_minified(expected, letters))
+                self.assertEqual(address, IPv6.from_minified(address.minify(letters, True), letters))
+
+            self.assertEqual(128, len(IPv6(1).minify('01', fixed_width=True)))
+
+        self.assertEqual('b', IPv6(1).minify())
+        self.assertEqual(26, len(IPv6(1).minify(fixed_width=True)))
+
+    def test_many(self):
+        """Tests the bulk conversion methods, including packed buffers."""
+        values = [0, 1, 0x20010db8000000000000000000000001, (1 << 128) - 1]
+        packed = b''.join(struct.pack('>QQ', value >> 64, value & 0xFFFFFFFFFFFFFFFF) for value in values)
+
+        minified = [IPv6(value).minify() for value in values]
+
+        self.assertEqual(minified, IPv6.minify_many(values))
+        self.assertEqual(minified, IPv6.minify_many(packed))
+        self.assertEqual(minified, IPv6.minify_many(memoryview(packed)))
+        self.assertEqual([IPv6(value).minify('01', True) for value in values], IPv6.minify_many(packed, '01', True))
+        self.assertEqual(values, IPv6.from_minified_many(minified))
+
+        self.assertRaises(ValueError, IPv6.minify_many, packed[:-1])
+        self.assertRaises(ValueError, IPv6.minify_many, [1 << 128])
+        self.assertRaises(TypeError, IPv6.minify_many, ['1'])
+
+    def test_errors(self):
+        """Tests that invalid values and minified strings are rejected."""
+        self.assertRaises(TypeError, IPv6, '1')
+        self.assertRaises(ValueError, IPv6, -1)
+        self.assertRaises(ValueError, IPv6, 1 << 128)
+        self.assertRaises(ValueError, IPv6.from_minified, None)
+        self.assertRaises(ValueError, IPv6.from_minified, '')
+        self.assertRaises(ValueError, IPv6.from_minified, 'i')
+        self.assertRaises(ValueError, IPv6.from_minified, '1' * 129, '01')
+        self.assertRaises(TypeError, IPv6.from_minified, 1)
+        self.assertRaises(ValueError, IPv6.from_hextets, 1, 2, 3)
+        self.assertRaises(ValueError, IPv6.from_hextets, 0, 0, 0, 0, 0, 0, 0, 0x10000)
+
+    def test_value_semantics(self):
+        """Tests equality, hashing, immutability, and pickling."""
+        address = IPv6.from_str('2001:db8::1')
+
+        self.assertEqual(address, IPv6(0x20010db8000000000000000000000001))
+        self.assertEqual(address, 0x20010db8000000000000000000000001)
+        self.assertEqual(address, '2001:DB8:0::1')
+        self.assertNotEqual(address, 'nope')
+        self.assertNotEqual(address, None)
+        self.assertEqual(hash(address), hash(IPv6(address.to_int())))
+        self.assertEqual(address, pickle.loads(pickle.dumps(address)))
+        self.assertEqual((0x2001, 0xdb8, 0, 0, 0, 0, 0, 1), address.to_hextets())
+
+        with self.assertRaises(AttributeError):
+            address._value = 1
+
+    def test_using_alphabet(self):
+        """Tests that IPv6 shares the default alphabet and its overrides with IPv4."""
+        with using_alphabet('01'):
+            self.assertEqual('101', IPv6(5).minify())
+
+
+class HostnameTemplateTestCase(unittest.TestCase):
+
+    def test_render_parse(self):
+        """Tests rendering hostnames and parsing them back."""
+        template = HostnameTemplate('envoy-TEMPLATE.prod.mycompany.com')
+
+        self.assertEqual('envoy-cpqe4kv.prod.mycompany.com', template.render(IPv4(0x7f000001)))
+        self.assertEqual('envoy-cpqe4kv.prod.mycompany.com', template.render(0x7f000001))
+        self.assertEqual(IPv4(0x7f000001), template.parse('envoy-cpqe4kv.prod.mycompany.com'))
+        self.assertEqual(IPv4(0x7f000001), template.parse('ENVOY-cpqe4kv.Prod.MyCompany.com.'))
+
+        # the minified label is case-insensitive too, in whichever case the alphabet's letters are
+        self.assertEqual(IPv4(0x7f000001), template.parse('envoy-CPQE4KV.prod.mycompany.com'))
+        self.assertEqual(IPv4(0x7f000001), template.parse('ENVOY-CpQe4Kv.PROD.MYCOMPANY.COM'))
+
+        upper = HostnameTemplate('node-TEMPLATE', 'ABCDEFGHJKMNPQRSTUVWXYZ23456789')
+
+        self.assertEqual('node-CPQE4KV', upper.render(0x7f000001))
+        self.assertEqual(IPv4(0x7f000001), upper.parse('node-cpqe4kv'))
+
+        fixed = HostnameTemplate('TEMPLATE.nodes.example.com.', SORTABLE_ALPHABET, fixed_width=True)
+
+        self.assertEqual('2222223.nodes.example.com.', fixed.render(1))
+        self.assertEqual(IPv4(1), fixed.parse('2222223.nodes.example.com.'))
+
+        custom = HostnameTemplate('node-{}'.format('XX'), placeholder='XX')
+
+        self.assertEqual('node-b', custom.render(1))
+
+    def test_many(self):
+        """Tests rendering and parsing batches."""
+        template = HostnameTemplate('envoy-TEMPLATE.prod.mycompany.com')
+        values = [0, 1, 0x7f000001, 0xFFFFFFFF]
+        hostnames = [template.render(value) for value in values]
+
+        self.assertEqual(hostnames, template.render_many(values))
+        self.assertEqual(hostnames, template.render_many(array('I', values)))
+        self.assertEqual(values, template.parse_many(hostnames))
+        self.assertEqual(values, template.parse_many([hostname.upper() for hostname in hostnames]))
+        self.assertEqual([], template.render_many([]))
+
+    def test_parse_errors(self):
+        """Tests that hostnames not rendered from the template are rejected."""
+        template = HostnameTemplate('envoy-TEMPLATE.prod.mycompany.com')
+
+        for hostname in ('envoy-.prod.mycompany.com', 'proxy-cpqe4kv.prod.mycompany.com', 'envoy-cpqe4kv.dev.mycompany.com',
+                'envoy-cpqi4kv.prod.mycompany.com', 'envoy-e5aw83e.prod.mycompany.com'):
+            self.assertRaises(ValueError, template.parse, hostname)
+
+        self.assertRaises(TypeError, template.parse, None)
+        self.assertRaises(ValueError, template.parse_many, ['envoy-b.prod.mycompany.com', 'nope'])
+
+    def test_validation(self):
+        """Tests that templates which could render invalid hostnames are rejected when compiled."""
+        self.assertRaises(TypeError, HostnameTemplate, None)
+
+        for template in ('envoy.prod.mycompany.com', 'TEMPLATE-TEMPLATE', 'envoy_TEMPLATE.com', 'envoy..TEMPLATE.com',
+                '-TEMPLATE.com', '{}TEMPLATE.com'.format('a' * 57), '{}.TEMPLATE'.format('.'.join(['a' * 63] * 4))):
+            self.assertRaises(ValueError, HostnameTemplate, template)
+
+        # the label is within 63 characters only with the default alphabet's width of 7
+        HostnameTemplate('{}TEMPLATE.com'.format('a' * 56))
+        self.assertRaises(ValueError, HostnameTemplate, '{}TEMPLATE.com'.format('a' * 56), '0123456789')
+
+        # alphabets must be valid and unambiguous in case-insensitive hostnames
+        self.assertRaises(ValueError, HostnameTemplate, 'TEMPLATE.com', 'abc_')
+        self.assertRaises(ValueError, HostnameTemplate, 'TEMPLATE.com', 'abcABC')
+        self.assertRaises(ValueError, HostnameTemplate, 'TEMPLATE.com', 'abc-')
+        HostnameTemplate('a-TEMPLATE-a.com', 'abc-')
+
+
+class ImportTestCase(unittest.TestCase):
+
+    # modules the package must not import until they are used
+    DEFERRED = ['six', 'numpy', 'argparse', 'asyncio', 'multiprocessing', 'ipminify._speedups', 'ipminify.aio',
+        'ipminify.arrays', 'ipminify.benchmark', 'ipminify.cache', 'ipminify.cli', 'ipminify.differential',
+        'ipminify.index', 'ipminify.ipv6', 'ipminify.metrics', 'ipminify.network', 'ipminify.parallel',
+        'ipminify.rewrite', 'ipminify.store', 'ipminify.template']
+
+    # a generous bound on the cumulative import time of the package, in microseconds, to catch gross regressions
+    BUDGET = 200000
+
+    def import_times(self, code='import ipminify'):
+        """Run code in a fresh interpreter with -X importtime, returning the cumulative import time of each module."""
+        environment = dict(os.environ)
+        environment['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code], env=environment,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, stderr = process.communicate()
+
+        self.assertEqual(0, process.returncode, stderr)
+
+        result = {}
+
+        for line in stderr.decode('utf-8').splitlines():
+            fields = line.split('|')
+
+            if line.startswith('import time:') and fields[1].strip().isdigit():
+                result[fields[2].strip()] = int(fields[1])
+
+        return result
+
+    def test_import_time(self):
+        """Tests that importing the package defers optional modules and stays within its time budget."""
+        if sys.version_info < (3, 7):
+            self.skipTest("-X importtime and module __getattr__ require Python 3.7.")
+
+        times = self.import_times()
+
+        self.assertIn('ipminify', times)
+        self.assertEqual([], [module for module in self.DEFERRED if module in times])
+        self.assertTrue(times['ipminify'] < self.BUDGET, "ipminify took {}us to import.".format(times['ipminify']))
+
+    def test_lazy_names(self):
+        """Tests that lazily loaded names import their modules on first use."""
+        if sys.version_info < (3, 7):
+            self.skipTest("module __getattr__ requires Python 3.7.")
+
+        times = self.import_times('import ipminify; ipminify.IPv6; ipminify.IPv4(1).minify()')
+
+        self.assertIn('ipminify.ipv6', times)
+        self.assertNotIn('ipminify.cli', times)
+
+        import ipminify
+
+        self.assertIs(IPv6, ipminify.IPv6)
+        self.assertIs(main, ipminify.cli.main)
+        self.assertIn('IPv4Network', dir(ipminify))
+        self.assertEqual([], [name for name in ipminify._EAGER if name not in ipminify._LAZY])
+        self.assertRaises(AttributeError, getattr, ipminify, 'nope')
+
+
+class MinifiedIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(0)
+
+        self.values = sorted(set([0, 1, 30, 31, 961, 0x7f000001, 0xFFFFFFFF] +
+            [generator.randint(0, 0xFFFFFFFF) for _ in range(2000)] +
+            [0x0a000000 + generator.randint(0, 0xFFFF) for _ in range(500)]))
+        self.pairs = [(IPv4(value), { 'id': index }) for index, value in enumerate(self.values)]
+
+    def assertPrefixes(self, index, fixed_width=False):
+        """Assert that prefix queries match filtering every name, in address order."""
+        names = [IPv4(value).minify(index.codec, fixed_width) for value in self.values]
+
+        for prefix in ('', 'a', 'b', 'aa', 'ab', 'cp', 'cpqe4kv', 'e5aw83d', 'e5aw83da', 'e5aw83e', 'zzzzzzz', 'aaaaaab', 'e6',
+                'z'):
+            expected = [(name, { 'id': position }) for position, name in enumerate(names) if name.startswith(prefix)]
+
+            self.assertEqual(expected, list(index.prefix(prefix)), prefix)
+
+    def test_lookup(self):
+        """Tests exact lookups by minified name and by address."""
+        index = MinifiedIndex(self.pairs)
+
+        self.assertEqual(len(self.values), len(index))
+        self.assertEqual({ 'id': self.values.index(0x7f000001) }, index['cpqe4kv'])
+        self.assertEqual(index['cpqe4kv'], index.lookup(IPv4(0x7f000001)))
+        self.assertEqual(index['cpqe4kv'], index.lookup(0x7f000001))
+        self.assertEqual(IPv4(0x7f000001), index.address('cpqe4kv'))
+        self.assertTrue('cpqe4kv' in index)
+        self.assertFalse('cpqe4kw' in index)
+        self.assertFalse('nope!' in index)
+        self.assertIsNone(index.get('cpqe4kw'))
+        self.assertRaises(KeyError, index.__getitem__, 'cpqe4kw')
+        self.assertRaises(KeyError, index.lookup, 0x7f000002)
+
+        for position, value in enumerate(self.values):
+            self.assertEqual({ 'id': position }, index[IPv4(value).minify()])
+
+        self.assertEqual([IPv4(value).minify() for value in self.values], list(index))
+
+    def test_duplicates(self):
+        """Tests that later pairs replace earlier pairs for the same address."""
+        index = MinifiedIndex([(1, 'first'), (IPv4(1), 'second'), (2, 'other')])
+
+        self.assertEqual(2, len(index))
+        self.assertEqual('second', index['b'])
+
+    def test_prefix_range(self):
+        """Tests prefix and range queries with variable and fixed-width names."""
+        self.assertPrefixes(MinifiedIndex(self.pairs))
+        self.assertPrefixes(MinifiedIndex(self.pairs, fixed_width=True), True)
+
+        index = MinifiedIndex(self.pairs)
+        network = IPv4Network.from_str('10.0.0.0/16')
+        expected = [(IPv4(value).minify(), { 'id': position }) for position, value in enumerate(self.values)
+            if value in network]
+
+        self.assertEqual(expected, list(index.range(network.network_address, network.broadcast_address.to_int() + 1)))
+        self.assertEqual([], list(index.range(5, 5)))
+
+        # stop is exclusive, so one past the last address includes the top of the address space
+        top = [(IPv4(value).minify(), { 'id': position }) for position, value in enumerate(self.values)
+            if value >= 0x7f000001]
+
+        self.assertEqual(top, list(index.range(0x7f000001, 0x100000000)))
+        self.assertEqual(top[-1:], list(index.range(IPv4(0xFFFFFFFF), 0x100000000)))
+        self.assertRaises(ValueError, index.range, 0, 0x100000001)
+        self.assertRaises(ValueError, index.range, 0x100000000, 0x100000000)
+        self.assertRaises(ValueError, list, index.prefix('i'))
+
+    def test_save_load(self):
+        """Tests that a saved index memory-maps back with the same contents."""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'index.ipmx')
+
+        try:
+            source = MinifiedIndex(self.pairs, SORTABLE_ALPHABET)
+            source.save(path)
+
+            with MinifiedIndex.load(path) as index:
+                self.assertEqual(len(source), len(index))
+                self.assertEqual(SORTABLE_ALPHABET, index.codec.letters)
+                self.assertEqual(list(source.items()), list(index.items()))
+                self.assertEqual(list(source.prefix('5')), list(index.prefix('5')))
+                self.assertEqual(source[IPv4(0x7f000001).minify(SORTABLE_ALPHABET)],
+                    index[IPv4(0x7f000001).minify(SORTABLE_ALPHABET)])
+
+            # the payload offset table sits before the payloads, eight-byte aligned in the file for any count
+            for pairs in (self.pairs, self.pairs[1:]):
+                MinifiedIndex(pairs).save(path)
+
+                with MinifiedIndex.load(path) as index:
+                    position = os.path.getsize(path) - index._offsets[-1] - 8 * (len(pairs) + 1)
+
+                self.assertEqual(0, position % 8)
+
+            empty = MinifiedIndex([], fixed_width=True)
+            empty.save(path)
+
+            with MinifiedIndex.load(path) as index:
+                self.assertEqual(0, len(index))
+                self.assertTrue(index.fixed_width)
+                self.assertEqual([], list(index.prefix('')))
+
+            with open(path, 'wb') as f:
+                f.write(b'NOPE' + b'\0' * 64)
+
+            self.assertRaises(ValueError, MinifiedIndex.load, path)
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+
+
+class AddressStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(0)
+
+        self.values = [0, 1, 0x7f000001, 0xFFFFFFFF] + [generator.randint(0, 0xFFFFFFFF) for _ in range(1000)]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'addresses.ipm4')
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        os.rmdir(self.directory)
+
+    def write(self, *batches, **kwargs):
+        """Write batches of addresses to a store, returning it opened."""
+        with AddressStoreWriter(self.path, **kwargs) as writer:
+            for batch in batches:
+                writer.write(batch)
+
+        return AddressStore(self.path)
+
+    def test_roundtrip(self):
+        """Tests that addresses written in any supported form read back in order."""
+        packed = struct.pack('>{}I'.format(len(self.values)), *self.values)
+        batches = [
+            (self.values,),
+            ([IPv4(value) for value in self.values[:10]], self.values[10:]),
+            (array('I', self.values[:500]), IPv4Array(self.values[500:])),
+            (packed[:400], bytearray(packed[400:])),
+            (memoryview(packed[:400]), memoryview(array('I', self.values[100:]))),
+        ]
+
+        for batch in batches:
+            with self.write(*batch) as store:
+                self.assertEqual(len(self.values), len(store))
+                self.assertEqual(self.values, [address.to_int() for address in store])
+
+        self.assertRaises(ValueError, self.write, b'\0\0\0')
+        self.assertRaises(ValueError, self.write, memoryview(b'\0\0\0'))
+        self.assertRaises(ValueError, self.write, [0x100000000])
+
+    def test_write_lines(self):
+        """Tests writing dotted-quad lines from text and from a bytes buffer."""
+        text = ''.join(IPv4(value).to_str() + '\n' for value in self.values)
+
+        with AddressStoreWriter(self.path) as writer:
+            writer.write_lines(text.splitlines(True) + ['\n'])
+            writer.write_lines(text.encode('ascii'))
+
+        with AddressStore(self.path) as store:
+            self.assertEqual(self.values * 2, [address.to_int() for address in store])
+
+    def test_sequence(self):
+        """Tests indexing, slicing, and membership."""
+        with self.write(self.values) as store:
+            self.assertEqual(IPv4(0x7f000001), store[2])
+            self.assertEqual(IPv4(self.values[-1]), store[-1])
+            self.assertRaises(IndexError, store.__getitem__, len(self.values))
+            self.assertRaises(IndexError, store.__getitem__, -len(self.values) - 1)
+
+            self.assertEqual(self.values[1:5], list(store[1:5].values))
+            self.assertEqual(self.values[::-7], list(store[::-7].values))
+            self.assertEqual([], list(store[5:1].values))
+
+            self.assertTrue(IPv4(0x7f000001) in store)
+            self.assertTrue(0xFFFFFFFF in store)
+            self.assertFalse('127.0.0.1' in store)
+            self.assertTrue(repr(store).startswith('AddressStore(1004 addresses'))
+
+    def test_minified(self):
+        """Tests minifying a store, or a range of it, with its own and other alphabets."""
+        with self.write(self.values, alphabet=SORTABLE_ALPHABET) as store:
+            self.assertEqual(SORTABLE_ALPHABET, store.alphabet)
+            self.assertEqual(IPv4.minify_many(self.values, SORTABLE_ALPHABET), list(store.minified(chunk_size=7)))
+            self.assertEqual(IPv4.minify_many(self.values, fixed_width=True),
+                list(store.minified(IPv4.MINIFIER_ALPHABET, True)))
+            self.assertEqual(IPv4.minify_many(self.values[3:900], SORTABLE_ALPHABET),
+                list(store.minified(start=3, stop=900, chunk_size=100)))
+            self.assertEqual([], list(store.minified(start=5000)))
+
+    def test_invalid(self):
+        """Tests that files which are not complete address stores are rejected."""
+        self.write(self.values).close()
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        for content in (b'NOPE' + data[4:], data[:-1], data[:10], b''):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+
+            self.assertRaises(ValueError, AddressStore, self.path)
+
+    def test_discard(self):
+        """Tests that a store whose writer raised is removed rather than left with a partial count."""
+        try:
+            with AddressStoreWriter(self.path) as writer:
+                writer.write(self.values)
+                writer.write([0xFFFFFFFF + 1])
+        except ValueError:
+            pass
+
+        self.assertFalse(os.path.exists(self.path))
+
+        writer.discard()
+
+
+class MinifyCacheTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        cache.disable()
+        IPv4.set_default_alphabet('abcdefghjkmnpqrstuvwxyz23456789')
+
+    def assertStats(self, expected, cache):
+        """Assert that a cache's hits, misses, evictions, and size are as expected."""
+        stats = cache.stats()
+
+        self.assertEqual(expected, (stats['hits'], stats['misses'], stats['evictions'], stats['size']))
+
+    def test_cache(self):
+        """Tests that each direction populates the other."""
+        minified = MinifyCache()
+
+        self.assertEqual('cpqe4kv', minified.encode(IPv4(0x7f000001)))
+        self.assertStats((0, 1, 0, 2), minified)
+
+        self.assertEqual(IPv4(0x7f000001), minified.decode('cpqe4kv'))
+        self.assertIs(minified.decode('cpqe4kv'), minified.decode('cpqe4kv'))
+        self.assertEqual('cpqe4kv', minified.encode(0x7f000001, fixed_width=True))
+        self.assertStats((3, 2, 0, 3), minified)
+
+        self.assertEqual(IPv4(0x01020304), minified.decode('aavkvju'))
+        self.assertEqual('aavkvju', minified.encode(0x01020304, fixed_width=True))
+        self.assertEqual('vkvju', minified.encode(0x01020304))
+        self.assertStats((4, 4, 0, 7), minified)
+
+        # a name with leading padding short of the fixed width decodes, but is not cached as an encoding
+        self.assertEqual(IPv4(1), minified.decode('ab'))
+        self.assertEqual('b', minified.encode(1))
+        self.assertEqual(0.4, minified.stats()['hit_rate'])
+
+        minified.clear()
+        self.assertStats((0, 0, 0, 0), minified)
+        self.assertEqual(0.0, minified.stats()['hit_rate'])
+
+    def test_eviction(self):
+        """Tests that the least recently used entries are evicted beyond the bound."""
+        minified = MinifyCache(4)
+
+        minified.encode(1)
+        minified.encode(2)
+        minified.encode(1)
+        self.assertStats((1, 2, 0, 4), minified)
+
+        # encoding 3 evicts the least recently used entries, the decoding of 'b' and the encoding of 2
+        minified.encode(3)
+        self.assertStats((1, 3, 2, 4), minified)
+
+        minified.encode(1)
+        self.assertStats((2, 3, 2, 4), minified)
+
+        minified.decode('b')
+        self.assertStats((2, 4, 3, 4), minified)
+
+        minified.encode(2)
+        self.assertStats((2, 5, 5, 4), minified)
+        self.assertRaises(ValueError, MinifyCache, 0)
+
+    def test_alphabets(self):
+        """Tests that entries for one alphabet are never returned for another."""
+        minified = MinifyCache()
+
+        self.assertEqual('cpqe4kv', minified.encode(0x7f000001))
+        self.assertEqual('1000', minified.encode(8, '01'))
+
+        with using_alphabet(SORTABLE_ALPHABET):
+            self.assertEqual(IPv4(0x7f000001).minify(SORTABLE_ALPHABET), minified.encode(0x7f000001))
+
+        IPv4.set_default_alphabet('01')
+
+        self.assertEqual('1111111000000000000000000000001', minified.encode(0x7f000001))
+        self.assertEqual(IPv4(8), minified.decode('1000'))
+        self.assertRaises(ValueError, minified.decode, 'cpqe4kv')
+
+    def test_errors(self):
+        """Tests that invalid values raise as without the cache and are not cached."""
+        minified = MinifyCache()
+
+        self.assertRaises(ValueError, minified.decode, None)
+        self.assertRaises(ValueError, minified.decode, '!')
+        self.assertRaises(ValueError, minified.decode, '')
+        self.assertRaises(TypeError, minified.decode, 1)
+        self.assertRaises(ValueError, minified.encode, -1)
+        self.assertRaises(TypeError, minified.encode, '1')
+        self.assertEqual(0, len(minified))
+
+    def test_threads(self):
+        """Tests that concurrent threads get correct results and consistent counters."""
+        minified = MinifyCache(64)
+        values = [index * 0x01010101 for index in range(256)]
+        errors = []
+
+        def worker(seed):
+            generator = random.Random(seed)
+
+            for _ in range(2000):
+                value = generator.choice(values)
+
+                if minified.decode(minified.encode(value)) != value:
+                    errors.append(value)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        stats = minified.stats()
+
+        self.assertEqual([], errors)
+        self.assertEqual(4 * 2000 * 2, stats['hits'] + stats['misses'])
+        self.assertTrue(stats['size'] <= 64)
+
+    def test_enable(self):
+        """Tests routing IPv4 methods through the cache and restoring them."""
+        minify, from_minified = IPv4.__dict__['minify'], IPv4.__dict__['from_minified']
+
+        minified = cache.enable(16)
+
+        self.assertTrue(cache.enabled())
+        self.assertIs(minify, IPv4.__dict__['minify'])
+        self.assertEqual(IPv4(0x7f000001), IPv4.from_minified('cpqe4kv'))
+        self.assertIs(IPv4.from_minified('cpqe4kv'), IPv4.from_minified('cpqe4kv'))
+        self.assertStats((2, 1, 0, 3), minified)
+        self.assertRaises(ValueError, IPv4.from_minified, None)
+
+        minified = cache.enable(16, minify=True)
+
+        self.assertEqual('cpqe4kv', IPv4(0x7f000001).minify())
+        self.assertEqual('1000', IPv4(8).minify('01'))
+        self.assertEqual(IPv4(8), IPv4.from_minified('1000', '01'))
+        self.assertStats((1, 2, 0, 4), minified)
+
+        cache.disable()
+        cache.disable()
+
+        self.assertFalse(cache.enabled())
+        self.assertIs(minify, IPv4.__dict__['minify'])
+        self.assertIs(from_minified, IPv4.__dict__['from_minified'])
+
+    def test_encode_errors(self):
+        """Tests that invalid addresses are rejected as the codec would, even when an equal key is cached."""
+        minified = MinifyCache()
+
+        self.assertEqual('b', minified.encode(1))
+        self.assertRaises(TypeError, minified.encode, 1.0)
+        self.assertRaises(TypeError, minified.encode, '1')
+        self.assertRaises(ValueError, minified.encode, -1)
+        self.assertRaises(ValueError, minified.encode, 0xFFFFFFFF + 1)
+
+    def test_disable_layered(self):
+        """Tests that disabling the cache leaves a later replacement, such as instrumentation, in place and working."""
+        minify, from_minified = IPv4.__dict__['minify'], IPv4.__dict__['from_minified']
+
+        cache.enable(16, minify=True)
+        recorded = metrics.enable(operations=['from_minified', 'minify'])
+
+        try:
+            cache.disable()
+
+            self.assertFalse(cache.enabled())
+            self.assertTrue(metrics.enabled())
+            self.assertEqual(IPv4(0x7f000001), IPv4.from_minified('cpqe4kv'))
+            self.assertEqual('cpqe4kv', IPv4(0x7f000001).minify())
+            self.assertEqual(1, recorded.snapshot()['from_minified']['calls'])
+            self.assertEqual(1, recorded.snapshot()['minify']['calls'])
+        finally:
+            metrics.disable()
+
+        # the disabled cache's method, restored beneath instrumentation, calls the method it replaced
+        self.assertEqual(IPv4(0x7f000001), IPv4.from_minified('cpqe4kv'))
+        self.assertEqual(IPv4(8), IPv4.from_minified('1000', '01'))
+
+        # enabling the cache again replaces the methods left behind, so disabling it restores the originals
+        cache.enable(16, minify=True)
+        cache.disable()
+
+        self.assertIs(minify, IPv4.__dict__['minify'])
+        self.assertIs(from_minified, IPv4.__dict__['from_minified'])
+
+
+class CachedIPv4TestCase(IPv4TestCase):
+    """Runs the IPv4 test case with IPv4.minify and IPv4.from_minified routed through a small cache."""
+
+    def setUp(self):
+        cache.enable(8, minify=True)
+
+        super(CachedIPv4TestCase, self).setUp()
+
+    def tearDown(self):
+        super(CachedIPv4TestCase, self).tearDown()
+
+        cache.disable()
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+        cache.disable()
+
+    def test_snapshot(self):
+        """Tests that calls, timings, and batch sizes are recorded per operation."""
+        recorded = metrics.enable()
+
+        self.assertTrue(metrics.enabled())
+        self.assertEqual('cpqe4kv', IPv4.from_str('127.0.0.1').minify())
+        self.assertEqual('127.0.0.1', IPv4.from_minified('cpqe4kv').to_str())
+        self.assertEqual(['b', 'c'], IPv4.minify_many([1, 2]))
+        self.assertEqual([1] * 200, IPv4.from_minified_many(['b'] * 200))
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(set(metrics.OPERATIONS), set(snapshot))
+
+        for operation, entry in snapshot.items():
+            self.assertEqual(1, entry['calls'], operation)
+            self.assertEqual({}, entry['errors'])
+            self.assertEqual(1, sum(entry['time_histogram']))
+            self.assertEqual(len(metrics.TIME_BUCKETS) + 1, len(entry['time_histogram']))
+            self.assertTrue(entry['seconds'] >= 0)
+
+        self.assertNotIn('items', snapshot['minify'])
+        self.assertEqual((2, 2, 1), (snapshot['minify_many']['items'], snapshot['minify_many']['max_batch_size'],
+            snapshot['minify_many']['batch_size_histogram'][1]))
+        self.assertEqual((200, 200, 1), (snapshot['from_minified_many']['items'],
+            snapshot['from_minified_many']['max_batch_size'], snapshot['from_minified_many']['batch_size_histogram'][3]))
+
+        recorded.reset()
+        self.assertEqual({}, recorded.snapshot())
+
+    def test_errors(self):
+        """Tests that errors are counted by category and still raised."""
+        metrics.enable()
+
+        for function, value in ((IPv4.from_minified, '!'), (IPv4.from_minified, ''), (IPv4.from_minified, None),
+                (IPv4.from_minified, 'zzzzzzzz'), (IPv4.from_str, '1.2.3'), (IPv4.from_str, '1.2.3.999')):
+            self.assertRaises(ValueError, function, value)
+
+        self.assertRaises(TypeError, IPv4.from_minified, 1)
+        self.assertRaises(ValueError, IPv4.minify_many, [0x100000000])
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual({ 'letter': 1, 'empty': 2, 'range': 1, 'type': 1 }, snapshot['from_minified']['errors'])
+        self.assertEqual({ 'format': 1, 'range': 1 }, snapshot['from_str']['errors'])
+        self.assertEqual({ 'range': 1 }, snapshot['minify_many']['errors'])
+        self.assertEqual(0, snapshot['minify_many']['items'])
+        self.assertEqual('value', metrics.category(ValueError("other")))
+
+    def test_sink_errors(self):
+        """Tests that a failing sink is counted without failing the conversion it records."""
+        def failing(*event):
+            raise OSError("network is unreachable")
+
+        recorded = metrics.enable(failing, operations=['minify', 'from_str'])
+
+        self.assertEqual('vkvju', IPv4(0x01020304).minify())
+        self.assertEqual(IPv4(0x01020304), IPv4.from_str('1.2.3.4'))
+        self.assertEqual(2, recorded.sink_errors)
+        self.assertEqual(1, recorded.snapshot()['minify']['calls'])
+
+        def unreachable(line):
+            raise socket.error("network is unreachable")
+
+        sink = metrics.StatsdSink(send=unreachable)
+        sink('minify_many', 0.0015, 10, 'range')
+
+        self.assertEqual(4, sink.errors)
+
+    def test_sinks(self):
+        """Tests forwarding events to a callback and in the statsd line protocol."""
+        events = []
+        metrics.enable(lambda *event: events.append(event), operations=['from_minified'])
+
+        IPv4.from_minified('b')
+        self.assertRaises(ValueError, IPv4.from_minified, '!')
+        IPv4.minify_many([1])
+
+        self.assertEqual([('from_minified', None, None), ('from_minified', None, 'letter')],
+            [(operation, size, error) for operation, _, size, error in events])
+
+        lines = []
+        sink = metrics.StatsdSink(prefix='app.ipminify', send=lines.append)
+        sink('minify_many', 0.0015, 10, 'range')
+
+        self.assertEqual(['app.ipminify.minify_many.calls:1|c', 'app.ipminify.minify_many.time:1.500000|ms',
+            'app.ipminify.minify_many.errors.range:1|c', 'app.ipminify.minify_many.batch_size:10|h'], lines)
+
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        try:
+            receiver.bind(('127.0.0.1', 0))
+            receiver.settimeout(5)
+
+            with metrics.StatsdSink(port=receiver.getsockname()[1]) as sink:
+                sink('minify', 0.0, None, None)
+
+            self.assertEqual(b'ipminify.minify.calls:1|c', receiver.recv(1024))
+
+            # a closed sink drops and counts its lines
+            sink('minify', 0.0, None, None)
+            self.assertEqual(2, sink.errors)
+        finally:
+            receiver.close()
+
+    def test_disable(self):
+        """Tests that disabling restores the original methods, leaving later replacements in place."""
+        originals = dict((operation, IPv4.__dict__[operation]) for operation in metrics.OPERATIONS)
+
+        metrics.enable()
+
+        self.assertNotEqual(originals['minify'], IPv4.__dict__['minify'])
+
+        metrics.disable()
+        metrics.disable()
+
+        self.assertFalse(metrics.enabled())
+        self.assertEqual({}, metrics.snapshot())
+        self.assertEqual(originals, dict((operation, IPv4.__dict__[operation]) for operation in metrics.OPERATIONS))
+
+        recorded = metrics.enable()
+        cache.enable(minify=True)
+        metrics.disable()
+
+        self.assertIsNot(originals['from_str'], IPv4.__dict__['minify'])
+        self.assertIs(originals['from_str'], IPv4.__dict__['from_str'])
+
+        cache.disable()
+
+        # the instrumented method the cache replaced is restored, and still records into its own metrics
+        try:
+            IPv4(1).minify()
+            self.assertEqual(1, recorded.snapshot()['minify']['calls'])
+        finally:
+            IPv4.minify = originals['minify']
+
+
+class InstrumentedIPv4TestCase(IPv4TestCase):
+    """Runs the IPv4 test case with every operation instrumented."""
+
+    def setUp(self):
+        metrics.enable()
+
+        super(InstrumentedIPv4TestCase, self).setUp()
+
+    def tearDown(self):
+        super(InstrumentedIPv4TestCase, self).tearDown()
+
+        metrics.disable()
+
+
+@unittest.skipIf(ProcessPoolExecutor is None, "concurrent.futures is not available.")
+class ParallelTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        generator = random.Random(0)
+
+        self.values = [0, 1, 0x7f000001, 0xFFFFFFFF] + [generator.randint(0, 0xFFFFFFFF) for _ in range(996)]
+        self.names = IPv4.minify_many(self.values)
+
+    def parallel(self, function, values, **kwargs):
+        """Run a parallel function with small chunks and no threshold on the shared executor."""
+        return function(values, chunk_size=64, threshold=0, executor=self.executor, **kwargs)
+
+    def test_minify_many(self):
+        """Tests that addresses are minified across workers in input order."""
+        packed = struct.pack('>{}I'.format(len(self.values)), *self.values)
+
+        for values in (self.values, array('I', self.values), packed):
+            self.assertEqual(self.names, self.parallel(parallel.minify_many, values))
+
+        self.assertEqual(IPv4.minify_many(self.values, SORTABLE_ALPHABET, True),
+            self.parallel(parallel.minify_many, self.values, alphabet=SORTABLE_ALPHABET, fixed_width=True))
+        self.assertEqual(IPv4.minify_many(self.values, '\n\x0b'),
+            self.parallel(parallel.minify_many, self.values, alphabet='\n\x0b'))
+
+        with using_alphabet(SORTABLE_ALPHABET):
+            self.assertEqual(IPv4.minify_many(self.values), self.parallel(parallel.minify_many, self.values))
+
+        self.assertEqual([], self.parallel(parallel.minify_many, []))
+        self.assertEqual(self.names, parallel.minify_many(self.values, workers=2, chunk_size=300, threshold=0))
+        self.assertRaises(ValueError, self.parallel, parallel.minify_many, [0x100000000])
+
+    def test_from_minified_many(self):
+        """Tests that names are expanded across workers in input order."""
+        self.assertEqual(self.values, self.parallel(parallel.from_minified_many, self.names))
+        self.assertEqual(self.values, self.parallel(parallel.from_minified_many, iter(self.names)))
+        self.assertEqual(self.values, self.parallel(parallel.from_minified_many,
+            IPv4.minify_many(self.values, SORTABLE_ALPHABET), alphabet=SORTABLE_ALPHABET))
+        self.assertEqual([], self.parallel(parallel.from_minified_many, []))
+
+        self.assertRaises(ValueError, self.parallel, parallel.from_minified_many, self.names + ['!'])
+        self.assertRaises(ValueError, self.parallel, parallel.from_minified_many, self.names + ['a\nb'])
+        self.assertRaises(ValueError, self.parallel, parallel.from_minified_many, self.names + [''])
+        self.assertRaises(TypeError, self.parallel, parallel.from_minified_many, self.names + [None])
+
+    def test_sequential(self):
+        """Tests that small inputs and single workers are converted without a pool."""
+        self.assertEqual(self.names, parallel.minify_many(self.values))
+        self.assertEqual(self.values, parallel.from_minified_many(self.names, workers=1, threshold=0))
+        self.assertRaises(ValueError, parallel.minify_many, self.values, workers=0)
+        self.assertRaises(ValueError, parallel.minify_many, self.values, chunk_size=0, threshold=0,
+            executor=self.executor)
+
+    def test_pickled(self):
+        """Tests that chunks are pickled to the workers when shared memory is unavailable."""
+        shared_memory, parallel.SharedMemory = parallel.SharedMemory, None
+
+        try:
+            self.assertEqual(self.names, self.parallel(parallel.minify_many, self.values))
+            self.assertEqual(self.values, self.parallel(parallel.from_minified_many, self.names))
+        finally:
+            parallel.SharedMemory = shared_memory
+
+
+@unittest.skipIf(ProcessPoolExecutor is None, "concurrent.futures is not available.")
+class DifferentialTestCase(unittest.TestCase):
+
+    def test_available(self):
+        """Tests that implementations are only offered where they can run."""
+        implementations = differential.available()
+
+        self.assertEqual(['reference', 'pure', 'pure/single'], implementations[:3])
+        self.assertEqual(accelerator.available(), 'compiled' in implementations)
+        self.assertFalse('compiled' in differential.available(u'\u03b1\u03b2'))
+
+    def test_sampled(self):
+        """Tests that every implementation agrees on a sample of the whole space for each alphabet."""
+        result = differential.sweep(chunk_size=1 << 28, samples=32, workers=1)
+
+        self.assertEqual(0, result['mismatch_count'], result['mismatches'])
+        self.assertTrue(result['values'] >= 16 * 32 * len(differential.ALPHABETS))
+
+    def test_exhaustive(self):
+        """Tests that every implementation agrees on every value at both ends of the space, across workers."""
+        progress = []
+
+        with ProcessPoolExecutor(2) as executor:
+            for start, stop in ((0, 4096), (differential.SPACE - 4096, differential.SPACE)):
+                result = differential.sweep(['01', SORTABLE_ALPHABET], start=start, stop=stop, chunk_size=1024,
+                    executor=executor, progress=lambda *args: progress.append(args))
+
+                self.assertEqual(0, result['mismatch_count'], result['mismatches'])
+                self.assertEqual(2 * 4096, result['values'])
+
+        self.assertEqual(16, len(progress))
+        self.assertEqual(1.0, progress[-1][1])
+
+    def test_mismatches(self):
+        """Tests that implementations disagreeing with the first selected are counted and reported."""
+        reference_encode = differential._reference_encode
+
+        differential._reference_encode = lambda letters, value: 'x' if value == 5 else reference_encode(letters, value)
+
+        try:
+            result = differential.sweep(['01'], ['reference', 'pure'], stop=16, workers=1)
+        finally:
+            differential._reference_encode = reference_encode
+
+        # pure encodes 5 differently in both widths, and neither decoder accepts the reference's names for it
+        self.assertEqual(6, result['mismatch_count'])
+        self.assertEqual({'alphabet': '01', 'implementation': 'pure', 'operation': 'encode', 'input': 5,
+            'expected': 'x', 'actual': '101'}, result['mismatches'][0])
+
+    def test_dotted_mismatches(self):
+        """Tests that dotted-quad formatters and parsers disagreeing with the first selected are reported once."""
+        reference_format = differential._reference_format
+
+        differential._reference_format = lambda value: 'x' if value == 5 else reference_format(value)
+
+        try:
+            result = differential.sweep(['01', SORTABLE_ALPHABET], ['reference', 'pure'], stop=16, workers=1)
+        finally:
+            differential._reference_format = reference_format
+
+        # pure formats 5 differently, and neither parser accepts the reference's string for it, as text or bytes
+        self.assertEqual(5, result['mismatch_count'])
+        self.assertEqual({'alphabet': None, 'implementation': 'pure', 'operation': 'format', 'input': 5,
+            'expected': 'x', 'actual': '0.0.0.5'}, result['mismatches'][0])
+
+    def test_exhaustive_implementations(self):
+        """Tests that exhaustive sweeps compare only the bulk implementations unless others are selected."""
+        reference_encode = differential._reference_encode
+
+        differential._reference_encode = lambda letters, value: 'x'
+
+        try:
+            self.assertEqual(0, differential.sweep(['01'], stop=16, workers=1)['mismatch_count'])
+            self.assertNotEqual(0, differential.sweep(['01'], stop=16, samples=4, workers=1)['mismatch_count'])
+        finally:
+            differential._reference_encode = reference_encode
+
+    def test_unhandled_alphabet(self):
+        """Tests that alphabets which none of the selected implementations handle are skipped."""
+        result = differential.sweep([u'\u03b1\u03b2', '01'], ['compiled'], stop=256, workers=1)
+
+        self.assertEqual(0, result['mismatch_count'], result['mismatches'])
+        self.assertEqual(256 if accelerator.available() else 0, result['values'])
+
+    def test_errors(self):
+        """Tests that invalid sweeps are rejected."""
+        self.assertRaises(ValueError, differential.sweep, implementations=['nope'])
+        self.assertRaises(ValueError, differential.sweep, start=10, stop=10)
+        self.assertRaises(ValueError, differential.sweep, stop=differential.SPACE + 1)
+        self.assertRaises(ValueError, differential.sweep, chunk_size=0)
+
+
+class SpeedupsTestCase(unittest.TestCase):
+
+    ALPHABETS = [IPv4.MINIFIER_ALPHABET, SORTABLE_ALPHABET, '01', '0123456789abcdef',
+        'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_']
+
+    def setUp(self):
+        if not accelerator.available():
+            self.skipTest("The compiled accelerator has not been built.")
+
+        self.enabled = accelerator.enabled()
+
+        generator = random.Random(0)
+        self.values = [0, 1, 0xFFFFFFFF] + [generator.randint(0, 0xFFFFFFFF) for _ in range(500)]
+
+    def tearDown(self):
+        accelerator.enable(self.enabled)
+
+    def both(self, function, *args):
+        """Call a function with the accelerator enabled and then disabled, returning both results."""
+        accelerator.enable(True)
+        compiled = function(*args)
+
+        accelerator.enable(False)
+        pure = function(*args)
+
+        return compiled, pure
+
+    def assertSameErrors(self, function, *args):
+        """Assert that a function raises the same error with and without the accelerator."""
+        errors = []
+
+        for enabled in (True, False):
+            accelerator.enable(enabled)
+
+            with self.assertRaises((TypeError, ValueError)) as context:
+                function(*args)
+
+            errors.append((type(context.exception), str(context.exception)))
+
+        self.assertEqual(errors[0], errors[1])
+
+    def test_encode_decode(self):
+        """Tests that the accelerator encodes and decodes exactly as the pure-Python implementation does."""
+        for letters in self.ALPHABETS:
+            for fixed_width in (False, True):
+                compiled, pure = self.both(lambda: get_alphabet(letters).encode_many(self.values, fixed_width))
+                self.assertEqual(pure, compiled)
+
+                compiled, pure = self.both(lambda: [get_alphabet(letters).encode(value, fixed_width)
+                    for value in self.values])
+                self.assertEqual(pure, compiled)
+
+            encoded = get_alphabet(letters).encode_many(self.values)
+
+            self.assertEqual(self.both(lambda: get_alphabet(letters).decode_many(encoded)), (self.values, self.values))
+            self.assertEqual(self.both(lambda: [get_alphabet(letters).decode(value) for value in encoded]),
+                (self.values, self.values))
+
+    def test_decode_errors(self):
+        """Tests that invalid minified values raise the same errors with and without the accelerator."""
+        overflow = IPv4.MINIFIER_CODEC._encode(0xFFFFFFFF + 1)
+
+        for value in ('', 'i', 'a1', u'a\u00e9', overflow, None, 1):
+            self.assertSameErrors(lambda: IPv4.from_minified(value))
+            self.assertSameErrors(lambda: IPv4.from_minified_many(['b', value]))
+
+    def test_parse_format(self):
+        """Tests that the accelerator parses and formats exactly as the pure-Python implementation does."""
+        strings = [IPv4(value).to_str() for value in self.values]
+        lines = [b' 01.2.3.4\r\n', '1.2.3.+4', u'\u0661.2.3.4', '1.2.3.4 ', b'255.255.255.255']
+
+        self.assertEqual(self.both(lambda: [IPv4(value).to_str() for value in self.values]), (strings, strings))
+        self.assertEqual(self.both(lambda: format_many(self.values)), (strings, strings))
+        self.assertEqual(*self.both(lambda: format_buffer(self.values)))
+        self.assertEqual(self.both(lambda: parse_many(strings)), (self.values, self.values))
+        self.assertEqual(*self.both(lambda: parse_many(lines)))
+        self.assertEqual(*self.both(lambda: [parse(line) for line in lines]))
+
+        for value in ('', '1.2.3', '1.2.3.4.5', '1..2.3', '256.1.2.3', '1.2.3.4x', b'1.2.3.x', None):
+            self.assertSameErrors(lambda: parse(value))
+            self.assertSameErrors(lambda: parse_many(['1.2.3.4', value]))
+
+        for value in (-1, 0x100000000, 1 << 64, 1.0, '1', None):
+            self.assertSameErrors(lambda: format(value))
+            self.assertSameErrors(lambda: format_many([1, value]))
+            self.assertSameErrors(lambda: format_buffer([1, value]))
+
+        # packed buffers hold big-endian addresses
+        self.assertEqual(self.both(lambda: format_many(b'\x01\x02\x03\x04')), (['1.2.3.4'], ['1.2.3.4']))
+
+    def test_parse_buffer(self):
+        """Tests that the accelerator parses buffers exactly as the pure-Python implementation does."""
+        data = '\n'.join(IPv4(value).to_str() for value in self.values).encode('ascii')
+
+        for buffer in (data, data + b'\n\n  \n', bytearray(b'1.2.3.4\r\n\n 010.0.0.1 \n'), memoryview(b'')):
+            compiled, pure = self.both(lambda: parse_buffer(buffer))
+            self.assertEqual(list(pure), list(compiled))
+
+        self.assertEqual(self.values, list(parse_buffer(data)))
+        self.assertSameErrors(lambda: parse_buffer(b'1.2.3.4\n1.2.3.256\n'))
+
+
+class PureMixin(object):
+    """Runs a test case against the pure-Python implementation, whether or not the accelerator has been built."""
+
+    def setUp(self):
+        self.accelerated = accelerator.enabled()
+        accelerator.enable(False)
+
+        super(PureMixin, self).setUp()
+
+    def tearDown(self):
+        super(PureMixin, self).tearDown()
+
+        accelerator.enable(self.accelerated)
+
+
+class PureIPv4TestCase(PureMixin, IPv4TestCase):
+    pass
+
+
+class PureAlphabetTestCase(PureMixin, AlphabetTestCase):
+    pass
+
+
+class PureDottedTestCase(PureMixin, DottedTestCase):
+    pass
+
+
+class PureIPv6TestCase(PureMixin, IPv6TestCase):
+    pass